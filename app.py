@@ -4,10 +4,18 @@ load_dotenv()
 from flask import Flask, render_template, request, send_file, make_response, redirect, jsonify
 import pandas as pd
 from io import BytesIO
-from flask import Response
-from scraper_logic import scrape_jobs
+from flask import Response, stream_with_context
+from scraper_registry import resolve_sources, scrape_jobs as scrape_source_jobs, source_label
+from scheduled_runner import run_batch, run_with_retries
+from scheduled_digest import DIGEST_FILE_NAME, DigestCollector, digest_mode, merge_sections, sheet_names
+from email_delivery import Mailer, SmtpPool
+from task_queue import TaskQueue, run_worker
+from schedule_slots import TICK_MINUTES as SCHEDULER_TICK_MINUTES, coalescing_horizon, due_groups, next_run_after, realigned_run_at
+from result_store import get_result_store
+from db_engine import get_engine
+from scrape_scheduler import SCHEDULED, get_scrape_scheduler
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 import glob
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -18,7 +26,7 @@ from zipfile import ZipFile
 from openpyxl import Workbook
 import os
 import psycopg2
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 import json
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask import session
@@ -27,6 +35,8 @@ import sys
 from flask_limiter import Limiter
 import threading
 import uuid
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # In-memory store for long-running background jobs (single-process Railway deployment)
 # job_id -> {'status': pending|done|error, 'created_at': float, ...}
@@ -38,6 +48,23 @@ _export_jobs = {}
 _export_lock = threading.Lock()
 _EXPORT_JOB_TTL = 3600
 
+# Job searches submitted from /app run on a bounded pool instead of inside the request.
+# The worker running a search keeps it here and mirrors it to the result store, so
+# status and stream requests that land on another gunicorn worker can still answer
+_search_jobs = {}
+_search_lock = threading.Lock()
+_search_updated = threading.Condition(_search_lock)  # notified whenever a search job changes
+_SEARCH_JOB_TTL = 3600
+_SEARCH_JOB_PUBLISH_SECONDS = 1.0  # progress is mirrored at most this often; status changes always
+_SEARCH_JOB_POLL_SECONDS = float(os.environ.get('SEARCH_JOB_POLL_SECONDS', '1'))
+# An open stream ties up a whole sync (gunicorn "sync"/"gthread") worker thread, so it is
+# cut off after this long and the page carries on by polling; async workers (gevent) can
+# raise it freely
+_SEARCH_STREAM_MAX_SECONDS = float(os.environ.get('SEARCH_STREAM_MAX_SECONDS', '60'))
+_SEARCH_WORKERS = int(os.environ.get('SEARCH_WORKERS', '3'))
+_SEARCH_QUEUE_LIMIT = int(os.environ.get('SEARCH_QUEUE_LIMIT', '10'))
+_search_executor = ThreadPoolExecutor(max_workers=_SEARCH_WORKERS, thread_name_prefix='search')
+
 # Configure logging to show in Railway
 logging.basicConfig(
     level=logging.INFO,
@@ -53,15 +80,9 @@ APP_DOMAIN = "findmeajob.xyz"  # Production domain
 APP_URL = f"https://{APP_DOMAIN}"
 
 # Database setup
-_db_engine = None
-
 def get_db_connection():
-    global _db_engine
-    if _db_engine is None:
-        database_url = os.environ.get('DATABASE_URL')
-        if database_url:
-            _db_engine = create_engine(database_url)
-    return _db_engine
+    # Shared with job_cache and result_store
+    return get_engine()
 
 def init_database():
     engine = get_db_connection()
@@ -98,6 +119,12 @@ def init_users_table():
                 ALTER TABLE users 
                 ADD COLUMN IF NOT EXISTS email VARCHAR(255) UNIQUE
             """))
+
+            # One combined scheduled email per run instead of one per search ('off', 'sheets' or 'merged')
+            conn.execute(text("""
+                ALTER TABLE users 
+                ADD COLUMN IF NOT EXISTS email_digest VARCHAR(20) DEFAULT 'off'
+            """))
             
             # Add user_id columns to saved_searches table
             conn.execute(text("""
@@ -128,6 +155,152 @@ def init_files_table():
 
 init_files_table()
 
+def init_seen_jobs_table():
+    engine = get_db_connection()
+    if engine:
+        with engine.connect() as conn:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS saved_search_seen_jobs (
+                    search_id INTEGER NOT NULL REFERENCES saved_searches(id) ON DELETE CASCADE,
+                    job_key TEXT NOT NULL,
+                    first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (search_id, job_key)
+                )
+            """))
+            # For prune_seen_jobs
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_seen_jobs_first_seen_at ON saved_search_seen_jobs (first_seen_at)
+            """))
+            conn.commit()
+
+init_seen_jobs_table()
+
+def init_jobs_table():
+    engine = get_db_connection()
+    if engine:
+        with engine.connect() as conn:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id SERIAL PRIMARY KEY,
+                    job_key TEXT UNIQUE NOT NULL,
+                    source VARCHAR(50),
+                    url TEXT NOT NULL,
+                    title TEXT,
+                    company TEXT,
+                    location TEXT,
+                    description TEXT,
+                    first_seen TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+                    last_seen TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+                    search_vector tsvector GENERATED ALWAYS AS (
+                        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                        setweight(to_tsvector('english', coalesce(company, '')), 'B') ||
+                        setweight(to_tsvector('english', coalesce(location, '')), 'B') ||
+                        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+                    ) STORED
+                )
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_jobs_search_vector ON jobs USING GIN (search_vector)
+            """))
+            # Older tables used plain TIMESTAMP columns, filled in the session's time zone
+            for column in ("first_seen", "last_seen"):
+                column_type = conn.execute(text("""
+                    SELECT data_type FROM information_schema.columns
+                    WHERE table_name = 'jobs' AND column_name = :column
+                """), {"column": column}).scalar()
+                if column_type == "timestamp without time zone":
+                    conn.execute(text(f"""
+                        ALTER TABLE jobs ALTER COLUMN {column} TYPE TIMESTAMPTZ
+                        USING {column} AT TIME ZONE current_setting('TimeZone')
+                    """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_jobs_last_seen ON jobs (last_seen DESC)
+            """))
+            conn.commit()
+
+init_jobs_table()
+
+def schedule_next_run(engine, search_id, user_id, schedule, after=None, slot_at=None):
+    """Store the next staggered run slot for one saved search (NULL when unscheduled); slots are per user"""
+    after = after or datetime.now().astimezone()
+    with engine.connect() as conn:
+        conn.execute(text("""
+            UPDATE saved_searches SET next_run_at = :next_run_at WHERE id = :id
+        """), {"next_run_at": next_run_after(user_id, schedule, after, slot_at), "id": search_id})
+        conn.commit()
+
+def init_schedule_columns():
+    """Typed run timestamps for the scheduler, backfilled from the legacy last_run_date strings.
+
+    Every worker runs this at startup, so it holds an advisory lock for the whole
+    transaction and writes each kind of change with one set-based UPDATE; a worker
+    that waited for the lock finds nothing left to do.
+    """
+    engine = get_db_connection()
+    if engine:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('init_schedule_columns'))"))
+            conn.execute(text("""
+                ALTER TABLE saved_searches ADD COLUMN IF NOT EXISTS next_run_at TIMESTAMPTZ
+            """))
+            conn.execute(text("""
+                ALTER TABLE saved_searches ADD COLUMN IF NOT EXISTS last_run_at TIMESTAMPTZ
+            """))
+            # last_run_date holds strings like "21 June 2025 07:03"
+            backfilled = conn.execute(text("""
+                UPDATE saved_searches
+                SET last_run_at = to_timestamp(last_run_date, 'DD FMMonth YYYY HH24:MI')
+                WHERE last_run_at IS NULL AND last_run_date ~ '^[0-9]{1,2} [A-Za-z]+ [0-9]{4} [0-9]{1,2}:[0-9]{2}$'
+            """)).rowcount
+            # Only scheduled rows are ever scanned for due runs
+            conn.execute(text("""
+                DROP INDEX IF EXISTS idx_saved_searches_next_run_at
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_saved_searches_due ON saved_searches (next_run_at)
+                WHERE schedule != 'none' AND user_id IS NOT NULL
+            """))
+
+            # Slots are a hash computed here, so the new values are built in Python and
+            # applied in one statement per kind of change
+            now = datetime.now().astimezone()
+            unassigned, moved = [], []
+            rows = conn.execute(text("""
+                SELECT id, user_id, schedule, last_run_at, next_run_at FROM saved_searches
+                WHERE schedule != 'none' AND user_id IS NOT NULL
+            """)).fetchall()
+            for search_id, user_id, schedule, last_run_at, current in rows:
+                if current is None:
+                    # Next slot after the day of the last run, so nothing runs twice in one day
+                    after = now
+                    if last_run_at:
+                        after = max(now, last_run_at.astimezone(now.tzinfo).replace(hour=23, minute=59, second=59))
+                    unassigned.append((search_id, next_run_after(user_id, schedule, after)))
+                else:
+                    # Slots used to be per search; move them onto their user's slot on the same day
+                    current = current.astimezone(now.tzinfo)
+                    aligned = realigned_run_at(user_id, schedule, current)
+                    if aligned is not None and aligned != current:
+                        moved.append((search_id, aligned))
+            for changes, guard in ((unassigned, "s.next_run_at IS NULL"), (moved, "s.next_run_at IS NOT NULL")):
+                if changes:
+                    conn.execute(text(f"""
+                        UPDATE saved_searches AS s SET next_run_at = v.next_run_at
+                        FROM (SELECT unnest(CAST(:ids AS INTEGER[])) AS id,
+                                     unnest(CAST(:next_run_ats AS TIMESTAMPTZ[])) AS next_run_at) AS v
+                        WHERE s.id = v.id AND {guard}
+                    """), {"ids": [search_id for search_id, _ in changes],
+                           "next_run_ats": [next_run_at for _, next_run_at in changes]})
+            conn.commit()
+        if backfilled:
+            print(f"🗓️ Backfilled last_run_at for {backfilled} saved search(es)")
+        if unassigned:
+            print(f"🗓️ Assigned run slots to {len(unassigned)} scheduled search(es)")
+        if moved:
+            print(f"🗓️ Moved {len(moved)} scheduled search(es) onto their user's run slot")
+
+init_schedule_columns()
+
 
 def init_password_reset_table():
     engine = get_db_connection()
@@ -3369,9 +3542,48 @@ def log_user_activity(action_type, details=None):
 
 HISTORY_FILE = "search_history.json"
 
-# Define global results variable
-last_results = []
-last_search_name = "Job_Search"
+def store_search_results(jobs, name, meta=None):
+    """Keep this user's results server-side and remember them as their latest search.
+
+    Returns None if the store could not write them; the page still shows them,
+    but /download must not fall back to the previous search's results.
+    """
+    search_id = get_result_store().save(get_current_user_id(), jobs, name or "Job_Search", meta=meta)
+    if search_id is None:
+        session.pop('last_search_id', None)
+    else:
+        session['last_search_id'] = search_id
+    return search_id
+
+def format_jobs_for_display(jobs, source):
+    """Fill in missing companies, build formatted_description and tag each job's source"""
+    import html
+    for job in jobs:
+        if not job.get("company"):
+            job["company"] = "[Not Found]"
+
+        # Clean and decode HTML entities in description
+        raw_description = job.get("description", "Description not available")
+        decoded_description = html.unescape(raw_description)
+        cleaned_description = (
+            decoded_description.replace("<u>", "")
+                              .replace("</u>", "")
+                              .replace("<strong>", "")
+                              .replace("</strong>", "")
+                              .replace("<b>", "")
+                              .replace("</b>", "")
+        )
+        job["formatted_description"] = cleaned_description
+        # Add source field
+        job["source"] = job.get("source") or source_label(source)
+    return jobs
+
+def load_search_results(search_id=None):
+    """Result record for search_id (or the user's latest search), or None"""
+    search_id = search_id or session.get('last_search_id')
+    if not search_id:
+        return None
+    return get_result_store().get(get_current_user_id(), search_id)
 
 
 def load_config():
@@ -3421,11 +3633,13 @@ def check_excel_files_for_searches(searches):
         if schedule != "none" and engine:
             try:
                 with engine.connect() as conn:
+                    # Digest users' results live in their one combined workbook
                     result = conn.execute(text("""
                         SELECT COUNT(*) FROM scheduled_files 
-                        WHERE search_name = :search_name AND user_id = :user_id
+                        WHERE search_name IN (:search_name, :digest_name) AND user_id = :user_id
                     """), {
                         "search_name": search["name"],
+                        "digest_name": DIGEST_FILE_NAME,
                         "user_id": get_current_user_id()
                     })
                     count = result.fetchone()[0]
@@ -3621,17 +3835,47 @@ def save_results_for_search(name, results):
 
 from datetime import datetime
 
-def save_results_to_excel(search_name, results):
+def save_results_to_excel(search_name, results, output_dir="scheduled_results"):
     import pandas as pd
     from io import BytesIO
     import os
     from datetime import datetime
 
-    os.makedirs("scheduled_results", exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
 
     safe_name = search_name.replace(" ", "_")
     date_str = datetime.now().strftime("%d_%B_%Y")
-    filename = f"scheduled_results/{safe_name}_{date_str}.xlsx"
+    filename = os.path.join(output_dir, f"{safe_name}_{date_str}.xlsx")
+
+    with pd.ExcelWriter(filename, engine='xlsxwriter') as writer:
+        write_jobs_sheet(writer, results)
+
+    print(f"💾 Saved results to: {filename}")
+    return filename
+
+def save_digest_to_excel(user_id, sections, mode, output_dir="scheduled_results"):
+    """One workbook for all of a user's scheduled results: a sheet per search, or one merged sheet"""
+    import pandas as pd
+
+    output_dir = os.path.join(output_dir, str(user_id))
+    os.makedirs(output_dir, exist_ok=True)
+    date_str = datetime.now().strftime("%d_%B_%Y")
+    # Timestamped so a rerun never overwrites an attachment still waiting in the outbox
+    filename = os.path.join(output_dir, f"{DIGEST_FILE_NAME.replace(' ', '_')}_{date_str}_{datetime.now().strftime('%H%M%S')}.xlsx")
+
+    with pd.ExcelWriter(filename, engine='xlsxwriter') as writer:
+        if mode == "merged":
+            write_jobs_sheet(writer, merge_sections(sections))
+        else:
+            names = sheet_names(search["name"] for search, _ in sections)
+            for name, (_, jobs) in zip(names, sections):
+                write_jobs_sheet(writer, jobs, sheet_name=name)
+
+    print(f"💾 Saved digest for user {user_id} to: {filename}")
+    return filename
+
+def write_jobs_sheet(writer, results, sheet_name='Jobs'):
+    import pandas as pd
 
     df = pd.DataFrame(results)
     df["description"] = df["description"].apply(clean_description_for_excel)
@@ -3646,98 +3890,94 @@ def save_results_to_excel(search_name, results):
 
     df.insert(0, '#', range(1, len(df) + 1))
 
-    with pd.ExcelWriter(filename, engine='xlsxwriter') as writer:
-        temp_df = df.drop(columns=["link"])
-        temp_df.to_excel(writer, index=False, sheet_name='Jobs', startcol=0)
-
-        workbook = writer.book
-        worksheet = writer.sheets['Jobs']
-
-        header_format = workbook.add_format({
-            'bold': True,
-            'font_name': 'Calibri',
-            'font_size': 12,
-            'text_wrap': True,
-            'align': 'center',
-            'valign': 'vcenter'
-        })
-
-        default_format = workbook.add_format({
-            'text_wrap': True,
-            'align': 'left',
-            'valign': 'vcenter'
-        })
-
-        description_format = workbook.add_format({
-            'text_wrap': True,
-            'align': 'left',
-            'valign': 'top'
-        })
+    temp_df = df.drop(columns=["link"])
+    temp_df.to_excel(writer, index=False, sheet_name=sheet_name, startcol=0)
 
-        number_format = workbook.add_format({
-            'align': 'center',
-            'valign': 'vcenter'
-        })
+    workbook = writer.book
+    worksheet = writer.sheets[sheet_name]
 
-        # ADD THIS NEW FORMAT:
-        source_format = workbook.add_format({
-            'text_wrap': True,
-            'align': 'center',        # Horizontal center
-            'valign': 'vcenter',      # Vertical middle
-            'font_name': 'Calibri'
-        })
+    header_format = workbook.add_format({
+        'bold': True,
+        'font_name': 'Calibri',
+        'font_size': 12,
+        'text_wrap': True,
+        'align': 'center',
+        'valign': 'vcenter'
+    })
 
-        source_col_index = None
-        
-        for col_num, value in enumerate(df.drop(columns=["link"]).columns.values):
-            formatted_value = str(value).replace("_", " ").title()
-            worksheet.write(0, col_num, formatted_value, header_format)
+    default_format = workbook.add_format({
+        'text_wrap': True,
+        'align': 'left',
+        'valign': 'vcenter'
+    })
 
-            if value == "#":
-                worksheet.set_column(col_num, col_num, 5, number_format)
-            elif value.lower() == "source":
-                source_col_index = col_num
-                worksheet.set_column(col_num, col_num, 10, source_format)  # CENTER ALIGN SOURCE
-            elif value.lower() in ["title", "company", "location"]:
-                worksheet.set_column(col_num, col_num, 23, default_format)
-            elif value.lower() == "description":
-                worksheet.set_column(col_num, col_num, 80, description_format)
+    description_format = workbook.add_format({
+        'text_wrap': True,
+        'align': 'left',
+        'valign': 'top'
+    })
 
-        # EXPLICITLY format each Source column cell
-        if source_col_index is not None:
-            for row_num in range(len(df)):
-                source_value = df.iloc[row_num]["source"] if "source" in df.columns else "EFC"
-                worksheet.write(row_num + 1, source_col_index, source_value, source_format)
-        
-        link_col_index = df.columns.get_loc("link") + 1
-        worksheet.write(0, link_col_index, "Link", header_format)
-        worksheet.set_column(link_col_index, link_col_index, 55, default_format)
+    number_format = workbook.add_format({
+        'align': 'center',
+        'valign': 'vcenter'
+    })
 
-        link_format = workbook.add_format({
-            'text_wrap': True,
-            'align': 'left',
-            'valign': 'vcenter',
-            'font_color': 'blue',
-            'underline': 1
-        })
+    # ADD THIS NEW FORMAT:
+    source_format = workbook.add_format({
+        'text_wrap': True,
+        'align': 'center',        # Horizontal center
+        'valign': 'vcenter',      # Vertical middle
+        'font_name': 'Calibri'
+    })
 
+    source_col_index = None
+    
+    for col_num, value in enumerate(df.drop(columns=["link"]).columns.values):
+        formatted_value = str(value).replace("_", " ").title()
+        worksheet.write(0, col_num, formatted_value, header_format)
+
+        if value == "#":
+            worksheet.set_column(col_num, col_num, 5, number_format)
+        elif value.lower() == "source":
+            source_col_index = col_num
+            worksheet.set_column(col_num, col_num, 10, source_format)  # CENTER ALIGN SOURCE
+        elif value.lower() in ["title", "company", "location"]:
+            worksheet.set_column(col_num, col_num, 23, default_format)
+        elif value.lower() == "description":
+            worksheet.set_column(col_num, col_num, 80, description_format)
+
+    # EXPLICITLY format each Source column cell
+    if source_col_index is not None:
         for row_num in range(len(df)):
-            url = df.iloc[row_num]["link"]
-            if isinstance(url, str) and url.startswith("http"):
-                worksheet.write_url(row_num + 1, link_col_index, url, link_format, url)
-            else:
-                worksheet.write(row_num + 1, link_col_index, url, link_format)
-
-        worksheet.set_row(0, 25)
-        for row_num in range(1, len(df) + 1):
-            worksheet.set_row(row_num, 130)
-        worksheet.autofilter(0, 0, len(df), len(df.columns))
+            source_value = df.iloc[row_num]["source"] if "source" in df.columns else "EFC"
+            worksheet.write(row_num + 1, source_col_index, source_value, source_format)
+    
+    link_col_index = df.columns.get_loc("link") + 1
+    worksheet.write(0, link_col_index, "Link", header_format)
+    worksheet.set_column(link_col_index, link_col_index, 55, default_format)
+
+    link_format = workbook.add_format({
+        'text_wrap': True,
+        'align': 'left',
+        'valign': 'vcenter',
+        'font_color': 'blue',
+        'underline': 1
+    })
 
+    for row_num in range(len(df)):
+        url = df.iloc[row_num]["link"]
+        if isinstance(url, str) and url.startswith("http"):
+            worksheet.write_url(row_num + 1, link_col_index, url, link_format, url)
+        else:
+            worksheet.write(row_num + 1, link_col_index, url, link_format)
 
-    print(f"💾 Saved results to: {filename}")
+    worksheet.set_row(0, 25)
+    for row_num in range(1, len(df) + 1):
+        worksheet.set_row(row_num, 130)
+    worksheet.autofilter(0, 0, len(df), len(df.columns))
 
-def store_excel_in_database(search_name, file_path,user_id):
-    """Store Excel file in database for scheduled searches"""
+def store_excel_in_database(search_name, file_path,user_id, replaces=()):
+    """Store Excel file in database for scheduled searches (replaces: other rows this file supersedes)"""
     engine = get_db_connection()
     if not engine:
         print("❌ No database connection for file storage")
@@ -3754,8 +3994,8 @@ def store_excel_in_database(search_name, file_path,user_id):
             # Delete old file if exists, then insert new one
             conn.execute(text("""
                 DELETE FROM scheduled_files 
-                WHERE search_name = :search_name AND user_id = :user_id
-            """), {"search_name": search_name, "user_id": user_id})
+                WHERE search_name = ANY(:search_names) AND user_id = :user_id
+            """), {"search_names": [search_name, *replaces], "user_id": user_id})
             
             # Insert new file
             conn.execute(text("""
@@ -3774,118 +4014,473 @@ def store_excel_in_database(search_name, file_path,user_id):
     except Exception as e:
         print(f"❌ Error storing file in database: {e}")
 
-def run_scheduled_searches():
-    logger.info("🕓 Checking scheduled searches...")
-    logger.info(f"🕓 DEBUG: Today's date string = '{datetime.now().strftime('%d %B %Y')}'")
-
-    search_history = []
+def load_seen_job_keys(search_id):
+    """job_key values of every posting a saved search has already delivered"""
     engine = get_db_connection()
-    if not engine:
-        logger.info("❌ No database connection in scheduler")
-        return
+    if not engine or search_id is None:
+        return set()
     try:
         with engine.connect() as conn:
             result = conn.execute(text("""
-                SELECT s.name, s.timestamp, s.criteria, s.schedule, s.last_run_date, s.user_id, u.email
-                FROM saved_searches s
-                JOIN users u ON s.user_id = u.id
-                WHERE s.schedule != 'none' AND s.user_id IS NOT NULL
-                ORDER BY s.id DESC
-            """))
-        
-            for row in result:
-                search = {
-                    "name": row[0],
-                    "timestamp": row[1], 
-                    "criteria": row[2],
-                    "schedule": row[3] or "none",
-                    "last_run_date": row[4] or "",
-                    "user_id": row[5],
-                    "user_email": row[6]
-                }
-                search_history.append(search)
+                SELECT job_key FROM saved_search_seen_jobs WHERE search_id = :search_id
+            """), {"search_id": search_id})
+            return {row[0] for row in result}
     except Exception as e:
-        logger.info(f"❌ Database error in scheduler: {e}")
+        logger.info(f"❌ Error loading seen jobs for search {search_id}: {e}")
+        return set()
+
+def record_seen_jobs(search_id, jobs):
+    """Remember the postings a saved search just delivered so later runs skip them"""
+    from job_dedup import job_key
+    keys = {job_key(job.get("link")) for job in jobs if not job.get("error_type")}
+    keys.discard(None)
+    engine = get_db_connection()
+    if not engine or search_id is None or not keys:
         return
-    today_str = datetime.now().strftime("%d %B %Y")
-    weekday = datetime.now().weekday()
-    day = datetime.now().day
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("""
+                INSERT INTO saved_search_seen_jobs (search_id, job_key)
+                VALUES (:search_id, :job_key)
+                ON CONFLICT (search_id, job_key) DO NOTHING
+            """), [{"search_id": search_id, "job_key": key} for key in keys])
+            conn.commit()
+    except Exception as e:
+        logger.info(f"❌ Error recording seen jobs for search {search_id}: {e}")
 
-    updated = False
+# Postings a saved search delivered are remembered this long; older ones could be sent
+# again only if the site still lists them
+SEEN_JOBS_RETENTION_DAYS = int(os.environ.get('SEEN_JOBS_RETENTION_DAYS', '90'))
+_last_seen_jobs_prune = 0
 
-    for index, search in enumerate(search_history):
-        schedule = search.get("schedule", "none")
-        last_run_raw = search.get("last_run_date", "") #e.g., 21 June 2025 07:03
-        last_run_date_only = " ".join(last_run_raw.split(" ")[:3]) # 21 June 2025
+def prune_seen_jobs(engine):
+    """Drop seen-job rows past SEEN_JOBS_RETENTION_DAYS; runs at most once an hour from the scheduler tick"""
+    global _last_seen_jobs_prune
+    if SEEN_JOBS_RETENTION_DAYS <= 0 or time.time() - _last_seen_jobs_prune < 3600:
+        return
+    _last_seen_jobs_prune = time.time()
+    try:
+        with engine.connect() as conn:
+            result = conn.execute(text("""
+                DELETE FROM saved_search_seen_jobs
+                WHERE first_seen_at < CURRENT_TIMESTAMP - make_interval(days => :days)
+            """), {"days": SEEN_JOBS_RETENTION_DAYS})
+            conn.commit()
+        if result.rowcount:
+            logger.info(f"🧹 SCHEDULER: Pruned {result.rowcount} seen-job rows older than {SEEN_JOBS_RETENTION_DAYS} days")
+    except Exception as e:
+        logger.info(f"❌ Error pruning seen jobs: {e}")
+
+def persist_scraped_jobs(jobs):
+    """Upsert scraped postings into the jobs table so they can be searched later"""
+    from job_cache import canonical_job_url
+    from job_dedup import job_key
+    rows = {}
+    for job in jobs or []:
+        if job.get("error_type") or job.get("no_results"):
+            continue
+        key = job_key(job.get("link"))
+        if not key or job.get("title") in (None, "", "[Not Found]"):
+            continue
+        rows[key] = {
+            "job_key": key,
+            "source": job.get("source"),
+            "url": canonical_job_url(job["link"]),
+            "title": job.get("title"),
+            "company": job.get("company"),
+            "location": job.get("location"),
+            "description": job.get("description"),
+        }
+    engine = get_db_connection()
+    if not engine or not rows:
+        return 0
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("""
+                INSERT INTO jobs (job_key, source, url, title, company, location, description)
+                VALUES (:job_key, :source, :url, :title, :company, :location, :description)
+                ON CONFLICT (job_key) DO UPDATE SET
+                    source = COALESCE(EXCLUDED.source, jobs.source),
+                    url = EXCLUDED.url,
+                    title = EXCLUDED.title,
+                    company = EXCLUDED.company,
+                    location = EXCLUDED.location,
+                    description = CASE
+                        WHEN length(coalesce(EXCLUDED.description, '')) >= length(coalesce(jobs.description, ''))
+                        THEN EXCLUDED.description ELSE jobs.description END,
+                    last_seen = CURRENT_TIMESTAMP
+            """), list(rows.values()))
+            conn.commit()
+        logger.info(f"🗄️ Stored {len(rows)} scraped jobs in jobs table")
+        return len(rows)
+    except Exception as e:
+        logger.info(f"❌ Error storing scraped jobs: {e}")
+        return 0
 
-        logger.info(f"🕓 DEBUG: Search '{search['name']}' - schedule: {schedule}")
-        logger.info(f"🕓 DEBUG: Last run raw: '{last_run_raw}'")
-        logger.info(f"🕓 DEBUG: Last run date only: '{last_run_date_only}'")
-        logger.info(f"🕓 DEBUG: Should skip? {last_run_date_only == today_str}")
+class ScheduledSearchError(Exception):
+    """A scheduled scrape came back with an error placeholder instead of jobs"""
 
-        # skip if already ran today
-        if last_run_date_only ==today_str:
+def load_scheduled_searches(engine, due_before, search_ids=None):
+    """Scheduled searches whose next run slot is at or before due_before (one scan of idx_saved_searches_due)"""
+    search_history = []
+    with engine.connect() as conn:
+        result = conn.execute(text("""
+            SELECT s.name, s.timestamp, s.criteria, s.schedule, s.last_run_date, s.user_id, u.email, s.id,
+                   s.next_run_at, u.email_digest
+            FROM saved_searches s
+            JOIN users u ON s.user_id = u.id
+            WHERE s.next_run_at <= :due_before AND s.schedule != 'none' AND s.user_id IS NOT NULL
+              AND (CAST(:search_ids AS INTEGER[]) IS NULL OR s.id = ANY(CAST(:search_ids AS INTEGER[])))
+            ORDER BY s.next_run_at
+        """), {"due_before": due_before,
+               "search_ids": list(search_ids) if search_ids is not None else None})
+    
+        for row in result:
+            search = {
+                "name": row[0],
+                "timestamp": row[1], 
+                "criteria": row[2],
+                "schedule": row[3] or "none",
+                "last_run_date": row[4] or "",
+                "user_id": row[5],
+                "user_email": row[6],
+                "id": row[7],
+                "next_run_at": row[8],
+                "email_digest": digest_mode(row[9])
+            }
+            search_history.append(search)
+    return search_history
+
+def due_query_groups(searches, now):
+    """Coalesced query groups to run now (see schedule_slots.due_groups).
+
+    Subscribers to the same query whose slot comes up within the coalescing
+    horizon (a few ticks) are served by the same scrape; later slots wait
+    for their own tick so the load stays spread over the window.
+    """
+    return due_groups(group_scheduled_searches(searches), now)
+
+def scheduled_query_key(criteria):
+    """Searches with equal keys scrape exactly the same thing, whoever saved them"""
+    def norm(value):
+        return " ".join(str(value or "").lower().split())
+    return (
+        norm(criteria.get("title")),
+        norm(criteria.get("location")),
+        tuple(resolve_sources(criteria.get("source", "efinancialcareers"))),
+        norm(criteria.get("seniority"))
+    )
+
+def group_scheduled_searches(searches):
+    """Due searches grouped by scheduled_query_key, in first-seen order"""
+    groups = {}
+    for search in searches:
+        groups.setdefault(scheduled_query_key(search.get("criteria", {})), []).append(search)
+    return list(groups.values())
+
+# A search whose email is waiting in the in-memory outbox is held this long; if the
+# process restarts before the email goes out, the search runs again once it expires
+SCHEDULED_EMAIL_LEASE = timedelta(minutes=int(os.environ.get('SCHEDULED_EMAIL_LEASE_MINUTES', '120')))
+
+def record_scheduled_run(engine, search, ran_at=None):
+    """Store a finished run of a saved search and move it on to its next slot"""
+    ran_at = ran_at or datetime.now().astimezone()
+    with engine.connect() as conn:
+        # last_run_date stays as the display string; the scheduler only uses the timestamps
+        conn.execute(text("""
+            UPDATE saved_searches 
+            SET last_run_date = :last_run_date, last_run_at = :last_run_at, next_run_at = :next_run_at
+            WHERE id = :id
+        """), {
+            "last_run_date": ran_at.strftime("%d %B %Y %H:%M"),
+            "last_run_at": ran_at,
+            # Coalesced subscribers run before their own slot; that slot is done for today too
+            "next_run_at": next_run_after(search["user_id"], search.get("schedule"), ran_at, search.get("next_run_at")),
+            "id": search["id"]
+        })
+        conn.commit()
+
+def hold_scheduled_search(engine, search):
+    """Keep a search whose email is still queued from coming due until SCHEDULED_EMAIL_LEASE runs out"""
+    with engine.connect() as conn:
+        conn.execute(text("UPDATE saved_searches SET next_run_at = :next_run_at WHERE id = :id"),
+                     {"next_run_at": datetime.now().astimezone() + SCHEDULED_EMAIL_LEASE, "id": search["id"]})
+        conn.commit()
+
+def deliver_scheduled_search(search, results, seen_keys, engine, email_batch=None, digest=None):
+    """Export, store and email one subscriber's new postings from a shared scrape.
+
+    With an email_batch the email goes to the background outbox (merged with the
+    user's other results from this run); otherwise it is sent straight away.
+    Users who chose a digest have their postings handed to digest instead and
+    get one workbook for the whole run from send_scheduled_digests. A search
+    whose email is left to the outbox only moves on to its next slot once the
+    outbox has sent it (or given up); until then it is held on a lease.
+    """
+    from job_dedup import job_key
+    schedule = search.get("schedule", "none")
+    max_jobs = int(search.get("criteria", {}).get("max_jobs", 10))
+    new_jobs = [job for job in results if job_key(job.get("link")) not in seen_keys][:max_jobs]
+    new_summary = f"{len(new_jobs)} new since last run" if seen_keys else f"{len(new_jobs)} found"
+    logger.info(f"🆕 SCHEDULER: '{search['name']}': {new_summary}")
+
+    status = "no_new"
+    if new_jobs and digest is not None and digest.wants(search):
+        digest.add(search, new_jobs)
+        status = "digest"
+    elif new_jobs:
+        # Per-user folder: searches now run in parallel and names are only unique per user
+        output_path = save_results_to_excel(search["name"], new_jobs,
+                                            output_dir=os.path.join("scheduled_results", str(search["user_id"])))
+        store_excel_in_database(search["name"], output_path, search["user_id"])
+
+        # 📧 Email the file if jobs exist
+        subject = f"Scheduled Results for {search['name']} ({schedule}): {new_summary}"
+        body = f"Attached are the latest job search results for '{search['name']}' scheduled to run {schedule}: {new_summary}."
+
+        if email_batch is not None:
+            # Only postings that actually reached the user count as delivered
+            def on_sent():
+                record_seen_jobs(search.get("id"), new_jobs)
+                record_scheduled_run(engine, search)
+            email_batch.add(search["user_email"], subject, body, [output_path], on_sent=on_sent,
+                            on_failed=lambda: record_scheduled_run(engine, search))
+            # Not "sent" yet: the outbox reports the outcome in the batch's outcomes
+            status = "queued"
+        else:
+            def send():
+                if not send_email_with_attachment(subject, body, output_path, config, search["user_email"]):
+                    raise RuntimeError(f"email to {search['user_email']} failed")
+            try:
+                run_with_retries(send, label=f"Email for '{search['name']}'")
+                record_seen_jobs(search.get("id"), new_jobs)
+                status = "sent"
+            except Exception as e:
+                logger.info(f"❌ SCHEDULER: {e}")
+                status = "email_failed"
+    else:
+        logger.info(f"📭 SCHEDULER: No new postings for '{search['name']}', skipping Excel and email")
+
+    if status in ("queued", "digest"):
+        # The outbox is in memory: advancing now would lose this email on a restart
+        hold_scheduled_search(engine, search)
+    else:
+        record_scheduled_run(engine, search)
+    logger.info(f"💾 Saved {len(new_jobs)} results to Excel for {search['name']}")
+    return status
+
+def run_scheduled_group(searches, engine, email_batch=None, digest=None):
+    """Scrape one unique query once and fan the results out to every subscriber. Raises to be retried."""
+    criteria = searches[0].get("criteria", {})
+    title = criteria.get("title", "")
+    location = criteria.get("location", "")
+    source = criteria.get("source", "efinancialcareers")
+    seniority = criteria.get("seniority", "")
+    max_jobs = max(int(search.get("criteria", {}).get("max_jobs", 10)) for search in searches)
+    names = ", ".join(f"'{search['name']}'" for search in searches)
+    logger.info(f"🔁 SCHEDULER: Running {source_label(source)} query '{title}' in '{location}' once for {len(searches)} search(es): {names}")
+
+    # Skip only postings every subscriber has already had; the rest is filtered per subscriber
+    seen = {search["id"]: load_seen_job_keys(search.get("id")) for search in searches}
+    exclude_links = set.intersection(*(set(keys) for keys in seen.values()))
+    logger.info(f"🔍 SCHEDULER: {len(exclude_links)} postings already seen by every subscriber")
+
+    # Call the scraper(s) registered for the saved source
+    results = scrape_source_jobs(source, title, location, max_jobs, seniority=seniority, region="US",
+                                 exclude_links=exclude_links, priority=SCHEDULED)
+    logger.info(f"🔍 SCHEDULER: Called {source_label(source)} scraper, got {len(results)} results")
+    if len(results) == 1 and results[0].get("error_type"):
+        raise ScheduledSearchError(results[0].get("description", results[0]["error_type"]))
+
+    results = [job for job in results if not job.get("error_type") and not job.get("no_results")]
+    persist_scraped_jobs(results)
+
+    outcomes = {}
+    for search in searches:
+        try:
+            status = deliver_scheduled_search(search, results, seen[search["id"]], engine, email_batch, digest)
+        except Exception as e:
+            # One subscriber's export or email problem must not re-scrape for everyone
+            logger.info(f"❌ SCHEDULER: Delivery failed for '{search['name']}': {e}")
+            status = "failed"
+        outcomes[status] = outcomes.get(status, 0) + 1
+
+    if outcomes.get("sent"):
+        overall = "sent"
+    elif outcomes.get("queued") or outcomes.get("digest"):
+        overall = "queued"
+    else:
+        overall = max(outcomes, key=outcomes.get)
+    return {"status": overall, "detail": f"{len(results)} scraped for {len(searches)} search(es): {outcomes}"}
+
+def send_scheduled_digests(digest, email_batch, engine):
+    """One workbook, one stored file and one email per digest user for everything this run found.
+
+    The searches a digest covers move on to their next slot once it is sent or given up on.
+    """
+    sent = 0
+    for user in digest.users():
+        sections = user["sections"]
+        names = [search["name"] for search, _ in sections]
+
+        def finish(sections=sections):
+            for search, _ in sections:
+                record_scheduled_run(engine, search)
+        try:
+            output_path = save_digest_to_excel(user["user_id"], sections, user["mode"])
+            # The digest row supersedes the per-search files of the searches it covers
+            store_excel_in_database(DIGEST_FILE_NAME, output_path, user["user_id"], replaces=names)
+        except Exception as e:
+            logger.info(f"❌ SCHEDULER: Digest for user {user['user_id']} failed: {e}")
+            finish()
             continue
 
-        criteria = search.get("criteria", {})
-        title = criteria.get("title", "")
-        location = criteria.get("location", "")
-        max_jobs = int(criteria.get("max_jobs", 10))
+        total = sum(len(jobs) for _, jobs in sections)
+        subject = f"Your scheduled job searches: {total} new postings from {len(sections)} search(es)"
+        body = "Attached are the latest results for your scheduled searches:\n\n" + "\n".join(
+            f"- {search['name']} ({search.get('schedule', 'none')}): {len(jobs)} new" for search, jobs in sections)
+
+        def on_sent(sections=sections, finish=finish):
+            for search, jobs in sections:
+                record_seen_jobs(search.get("id"), jobs)
+            finish()
+        email_batch.add(user["email"], subject, body, [output_path], on_sent=on_sent, on_failed=finish)
+        sent += 1
+        logger.info(f"📦 SCHEDULER: Digest for {user['email']}: {total} postings from {len(sections)} search(es)")
+    return sent
+
+# Report of the most recent scheduled run, shown by /debug_scheduler_report
+_last_scheduler_report = None
+
+# "inline" runs due searches in this process; "queue" hands them to task_queue workers
+SCHEDULER_MODE = os.environ.get('SCHEDULER_MODE', 'inline').lower()
+_task_queue = None
+
+def get_task_queue():
+    global _task_queue
+    if _task_queue is None and get_db_connection():
+        _task_queue = TaskQueue(get_db_connection())
+    return _task_queue
+
+def enqueue_scheduled_searches(search_history, now):
+    """One durable task per unique due query; re-enqueueing the same run is a no-op"""
+    import hashlib
+    groups = due_query_groups(search_history, now)
+    # Retries load subscribers against this fixed horizon, not a later sliding one
+    due_before = coalescing_horizon(now).isoformat()
+    # A digest is built by one task, so each digest user's searches get a task of their own
+    tasks, digest_users = [], {}
+    for group in groups:
+        shared = [search for search in group if search.get("email_digest") == "off"]
+        for search in group:
+            if search.get("email_digest") != "off":
+                digest_users.setdefault(search["user_id"], []).append(search)
+        if shared:
+            tasks.append(("scheduled_search", shared))
+    tasks.extend((f"scheduled_digest:{user_id}", searches) for user_id, searches in digest_users.items())
+
+    queued = 0
+    for prefix, searches in tasks:
+        search_ids = sorted(search["id"] for search in searches)
+        digest = hashlib.sha1(repr((scheduled_query_key(searches[0].get("criteria", {})), search_ids)).encode()).hexdigest()
+        task_id = get_task_queue().enqueue("scheduled_search", {"search_ids": search_ids, "due_before": due_before},
+                                           run_key=f"{prefix}:{now.strftime('%Y-%m-%d')}:{digest}")
+        if task_id:
+            queued += 1
+    logger.info(f"📤 SCHEDULER: {len(groups)} due queries, {len(digest_users)} digest user(s), {queued} new queue task(s)")
+    return queued
+
+def run_scheduled_task(payload):
+    """task_queue handler: runs the searches still due, one scrape per unique query"""
+    engine = get_db_connection()
+    if not engine:
+        raise RuntimeError("No database connection")
+    # A retried task skips subscribers an earlier attempt already delivered to: delivery (or the
+    # lease held while their email is queued) moves their next_run_at beyond the task's horizon
+    if payload.get("due_before"):
+        due_before = datetime.fromisoformat(payload["due_before"])
+    else:
+        due_before = coalescing_horizon(datetime.now().astimezone())
+    due = load_scheduled_searches(engine, due_before, payload["search_ids"])
+    if not due:
+        return {"status": "skipped", "detail": "already delivered"}
+    # A digest user's searches all arrive in one task (see enqueue_scheduled_searches)
+    digest = DigestCollector()
+    outcomes, error = [], None
+    with get_mailer(config).batch() as email_batch:
+        for group in group_scheduled_searches(due):
+            try:
+                outcomes.append(run_scheduled_group(group, engine, email_batch, digest))
+            except Exception as e:
+                # The retry reruns only this query; what was delivered still goes out
+                error = error or e
+        send_scheduled_digests(digest, email_batch, engine)
+    if error:
+        raise error
+    statuses = [outcome["status"] for outcome in outcomes]
+    status = next((wanted for wanted in ("sent", "queued") if wanted in statuses), statuses[0])
+    return {"status": status, "detail": "; ".join(outcome["detail"] for outcome in outcomes),
+            "emails": email_batch.outcomes}
+
+def run_task_worker(stop_event=None):
+    """Consume queued scheduled searches until stop_event is set (see scheduled_worker.py)"""
+    run_worker(get_task_queue(), {"scheduled_search": run_scheduled_task}, stop_event=stop_event)
 
-        should_run = (
-            (schedule == "daily") or
-            (schedule == "weekly" and weekday == 0) or
-            (schedule == "monthly" and day == 1)
-        )
+def run_scheduled_searches():
+    """Run every due saved search on a bounded worker pool and log a run report"""
+    global _last_scheduler_report
+    logger.info("🕓 Checking scheduled searches...")
+    logger.info(f"🕓 DEBUG: Today's date string = '{datetime.now().strftime('%d %B %Y')}'")
 
-      
-        if should_run:
-            logger.info(f"🔁 Running {schedule} search: {search['name']}")
-            
-            # Get the source from saved criteria and add seniority
-            source = criteria.get("source", "efinancialcareers")
-            seniority = criteria.get("seniority", "")
-            logger.info(f"🔍 SCHEDULER: Using source '{source}' for search '{search['name']}'")
-            
-            # Call appropriate scraper based on saved source
-            if source == "careerjet":
-                from careerjet_api import scrape_jobs as scrape_careerjet_jobs
-                results = scrape_careerjet_jobs(title, location, max_jobs, seniority=seniority, region="US")
-                logger.info(f"🔍 SCHEDULER: Called CareerJet scraper, got {len(results)} results")
-            else:
-                results = scrape_jobs(title, location, max_jobs, seniority=seniority, region="US")
-                logger.info(f"🔍 SCHEDULER: Called eFinancialCareers scraper, got {len(results)} results")
-            
-            save_results_to_excel(search["name"], results)
-            
-            # Build the same filename used in save_results_to_excel()
-            safe_name = search["name"].replace(" ", "_")
-            date_str = datetime.now().strftime("%d_%B_%Y")
-            output_path = os.path.join("scheduled_results", f"{safe_name}_{date_str}.xlsx")
-            store_excel_in_database(search["name"], output_path, search["user_id"])
-
-            # 📧 Email the file if jobs exist
-            subject = f"Scheduled Results for {search['name']} ({schedule})"
-            body = f"Attached are the latest job search results for '{search['name']}' scheduled to run {schedule}."
-            send_email_with_attachment(subject, body, output_path, config, search["user_email"])
-            
+    engine = get_db_connection()
+    if not engine:
+        logger.info("❌ No database connection in scheduler")
+        return
+    prune_seen_jobs(engine)
+    now = datetime.now().astimezone()
+    try:
+        search_history = load_scheduled_searches(engine, coalescing_horizon(now))
+    except Exception as e:
+        logger.info(f"❌ Database error in scheduler: {e}")
+        return
 
-            search["last_run_date"] = datetime.now().strftime("%d %B %Y %H:%M")
-            updated = True
-            logger.info(f"💾 Saved {len(results)} results to Excel for {search['name']}")
+    if SCHEDULER_MODE == 'queue':
+        return enqueue_scheduled_searches(search_history, now)
 
-            # Update database immediately for this search
-            with engine.connect() as conn:
-                conn.execute(text("""
-                    UPDATE saved_searches 
-                    SET last_run_date = :last_run_date 
-                    WHERE name = :name AND user_id = :user_id
-                """), {
-                    "last_run_date": search["last_run_date"],
-                    "name": search["name"],
-                    "user_id": search["user_id"]
-                })
-                conn.commit()
+    # Identical queries from different users are scraped once
+    groups = due_query_groups(search_history, now)
+    due = [search for group in groups for search in group]
+    logger.info(f"🕓 SCHEDULER: {len(due)} due searches coalesce into {len(groups)} unique queries")
+    if not groups:
+        return
+
+    # Emails are queued as the run goes and merged per recipient once it ends;
+    # digest users get a single combined workbook built after every query has run
+    digest = DigestCollector()
+    with get_mailer(config).batch() as email_batch:
+        report = run_batch(
+            groups,
+            lambda group: run_scheduled_group(group, engine, email_batch, digest),
+            sources_for=lambda group: resolve_sources(group[0].get("criteria", {}).get("source")),
+            label_for=lambda group: f"'{group[0].get('criteria', {}).get('title', '')}' in "
+                                    f"'{group[0].get('criteria', {}).get('location', '')}' "
+                                    f"({', '.join(search['name'] for search in group)})",
+        )
+        report["digests"] = send_scheduled_digests(digest, email_batch, engine)
+    # Filled in by the outbox as emails are actually sent or given up on
+    report["emails"] = email_batch.outcomes
+    report["due_searches"] = len(due)
+    _last_scheduler_report = report
+    logger.info(f"📊 SCHEDULER REPORT: {report['total']} queries for {len(due)} searches in {report['seconds']}s: {report['counts']}")
+    for group, entry in zip(groups, report["searches"]):
+        if entry["status"] not in ("sent", "queued", "no_new"):
+            logger.info(f"📊   {entry['search']}: {entry['status']} after {entry['attempts']} attempt(s) - {entry['detail']}")
+        if entry["status"] == "failed":
+            # Give up until the next slot rather than retrying on every tick
+            for search in group:
+                schedule_next_run(engine, search["id"], search["user_id"], search.get("schedule"),
+                                  slot_at=search.get("next_run_at"))
+    return report
 
 # Add scheduler initialization right after the function
 print("🚀 SCHEDULER DEBUG: About to initialize scheduler...")
@@ -3898,7 +4493,8 @@ if os.environ.get('ENABLE_SCHEDULER', 'false').lower() == 'true':
         print("🚀 SCHEDULER DEBUG: BackgroundScheduler created")
         def test_scheduler():
             print("🧪 TEST: Scheduler called a function!")
-        scheduler.add_job(func=run_scheduled_searches, trigger="cron", hour=5, minute=0, max_instances=1, coalesce=True, misfire_grace_time=3600) # Runs daily at 5am
+        # Each user has their own slot in the daily window; the tick picks up whatever is due
+        scheduler.add_job(func=run_scheduled_searches, trigger="interval", minutes=SCHEDULER_TICK_MINUTES, max_instances=1, coalesce=True)
         scheduler.add_job(func=cleanup_old_records, trigger="cron", hour=3, minute=0, max_instances=1, coalesce=True, misfire_grace_time=3600) # Cleanup old DB records daily at 3am
         print("🚀 SCHEDULER DEBUG: Job added to scheduler")
         scheduler.start()
@@ -3912,6 +4508,12 @@ if os.environ.get('ENABLE_SCHEDULER', 'false').lower() == 'true':
 else:
     print("🚀 SCHEDULER DEBUG: ENABLE_SCHEDULER not set to true, skipping scheduler initialization")
 
+# Optional in-process queue consumers; separate nodes run scheduled_worker.py instead
+if os.environ.get('ENABLE_TASK_WORKER', 'false').lower() == 'true' and get_db_connection():
+    for _ in range(int(os.environ.get('TASK_WORKER_THREADS', '1'))):
+        threading.Thread(target=run_task_worker, name="task-worker", daemon=True).start()
+    print("👷 Task queue worker thread(s) started")
+
 
 def format_description(desc):
     import re
@@ -3953,33 +4555,28 @@ def clean_description_for_excel(html):
     )
     return re.sub(r"\n{3,}", "\n\n", cleaned).strip()
 
+_mailer = None
+_mailer_lock = threading.Lock()
+
+def get_mailer(config):
+    """Process-wide mailer over a pool of logged-in SMTP connections"""
+    global _mailer
+    if _mailer is None:
+        with _mailer_lock:
+            if _mailer is None:
+                settings = config["email_settings"]
+                pool = SmtpPool(settings["smtp_server"], settings["smtp_port"],
+                                settings["sender_email"], settings["sender_password"])
+                _mailer = Mailer(pool, "Find Me A Job <fmaj.app@gmail.com>")
+                # Give queued scheduled emails a chance to go out on shutdown
+                atexit.register(lambda: (_mailer.flush(timeout=30), pool.close()))
+    return _mailer
+
 def send_email_with_attachment(subject, body, attachment_path, config, user_email=None):
     try:
-        smtp_server = config["email_settings"]["smtp_server"]
-        smtp_port = config["email_settings"]["smtp_port"]
-        sender_email = config["email_settings"]["sender_email"]
-        sender_password = config["email_settings"]["sender_password"]
         recipients = [user_email] if user_email else []
-        logger.info(f"🔍 EMAIL DEBUG: Attempting SMTP connection to {smtp_server}:{smtp_port}")  # ADD THIS LINE HERE
-
-        msg = EmailMessage()
-        msg["Subject"] = subject
-        msg["From"] = "Find Me A Job <fmaj.app@gmail.com>"
-        msg["To"] = ", ".join(recipients)
-        msg.set_content(body)
-
-        # Attach the Excel file
-        with open(attachment_path, "rb") as f:
-            file_data = f.read()
-            file_name = os.path.basename(attachment_path)
-        msg.add_attachment(file_data, maintype="application", subtype="octet-stream", filename=file_name)
-
-        with smtplib.SMTP(smtp_server, smtp_port) as smtp:
-            smtp.starttls()
-            smtp.login(sender_email, sender_password)
-            smtp.send_message(msg)
-
-        logger.info(f"✅ Email sent to {recipients} with: {file_name}")  # ADD THIS LINE HERE
+        get_mailer(config).send_now(", ".join(recipients), subject, body, [attachment_path])
+        logger.info(f"✅ Email sent to {recipients} with: {os.path.basename(attachment_path)}")
         return True
 
     except Exception as e:
@@ -4029,6 +4626,9 @@ def check_feature_access(feature_name):
         print(f"Error checking feature access: {e}")
         return False
 
+# Searches a free user may run per day; beta/paid users are unlimited
+FREE_DAILY_SEARCH_LIMIT = int(os.environ.get('FREE_DAILY_SEARCH_LIMIT', '3'))
+
 def check_daily_search_limit():
     """Check if user has exceeded daily search limit (for free users)"""
     if check_feature_access('unlimited_searches'):
@@ -4056,7 +4656,7 @@ def check_daily_search_limit():
             row = result.fetchone()
             current_count = row[0] if row else 0
             
-            return current_count < 3  # Allow if under 3 searches
+            return current_count < FREE_DAILY_SEARCH_LIMIT
             
     except Exception as e:
         print(f"Error checking search limit: {e}")
@@ -4092,6 +4692,52 @@ def increment_search_count():
     except Exception as e:
         print(f"Error incrementing search count: {e}")
 
+def reserve_daily_search():
+    """Check the daily limit and count the search in one step, for searches that finish later.
+
+    Returns (allowed, reserved); give a reservation back with release_daily_search
+    if the search does not succeed.
+    """
+    if check_feature_access('unlimited_searches'):
+        return True, False
+    user_id = get_current_user_id()
+    if not user_id:
+        return False, False
+    engine = get_db_connection()
+    if not engine:
+        return True, False  # If DB fails, allow search
+    try:
+        with engine.connect() as conn:
+            # Concurrent starts cannot both take the last search: the row is locked by the upsert
+            row = conn.execute(text("""
+                INSERT INTO daily_search_limits (user_id, search_date, search_count)
+                VALUES (:user_id, :today, 1)
+                ON CONFLICT (user_id, search_date)
+                DO UPDATE SET search_count = daily_search_limits.search_count + 1
+                WHERE daily_search_limits.search_count < :limit
+                RETURNING search_count
+            """), {"user_id": user_id, "today": datetime.now().date(), "limit": FREE_DAILY_SEARCH_LIMIT}).fetchone()
+            conn.commit()
+        return (True, True) if row else (False, False)
+    except Exception as e:
+        print(f"Error reserving search: {e}")
+        return True, False  # If error, allow search
+
+def release_daily_search(user_id, search_date):
+    """Give back a reservation from reserve_daily_search (no request context needed)"""
+    engine = get_db_connection()
+    if not engine:
+        return
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("""
+                UPDATE daily_search_limits SET search_count = GREATEST(search_count - 1, 0)
+                WHERE user_id = :user_id AND search_date = :search_date
+            """), {"user_id": user_id, "search_date": search_date})
+            conn.commit()
+    except Exception as e:
+        print(f"Error releasing search count: {e}")
+
 def render_template_with_admin(template_name, **kwargs):
     """
     Helper function to automatically include admin status in all template renders
@@ -4127,7 +4773,6 @@ def index():
     if login_redirect:
         return login_redirect
         
-    global last_results
     jobs = []
     if request.method == "POST":
         print("🚨 POST METHOD DETECTED - Starting debug")
@@ -4140,7 +4785,7 @@ def index():
             # Get current search count for display
             user_id = get_current_user_id()
             engine = get_db_connection()
-            current_count = 3  # Default to max
+            current_count = FREE_DAILY_SEARCH_LIMIT  # Default to max
         
             if engine:
                 try:
@@ -4159,7 +4804,8 @@ def index():
                                  feature="unlimited searches",
                                  current_plan="free",
                                  search_limit_reached=True,
-                                 searches_used=current_count)
+                                 searches_used=current_count,
+                                 search_limit=FREE_DAILY_SEARCH_LIMIT)
         title = request.form.get("title", "")
         location = request.form.get("location", "")
         seniority = request.form.get("seniority", "")
@@ -4208,7 +4854,7 @@ def index():
                 print(f"🔍 SAVE DEBUG: Source from form = '{source_from_form}'")
 
                 # Convert source to display name - THIS MUST BE HERE
-                source_display = "EFC" if source_from_form == "efinancialcareers" else "CareerJet"
+                source_display = source_label(source_from_form)
                 
                 criteria = {
                     "title": request.form.get("title", ""),
@@ -4218,8 +4864,6 @@ def index():
                     "source": source_from_form if source_from_form != "DEFAULT_NOT_FOUND" else "efinancialcareers"
                 }
                 print(f"🔍 SAVE DEBUG: Final criteria = {criteria}")
-                # Add source abbreviation to saved search name
-                source_abbrev = "EFC" if source_from_form == "efinancialcareers" else "CareerJet"
         
                 # Build the formatted name: "User Input - Location - Source"
         
@@ -4231,41 +4875,19 @@ def index():
                 info = f"✅ Search saved as: {formatted_name}"
             
             saved_searches = check_excel_files_for_searches(load_saved_searches())
-            return render_template("index.html", info=info, jobs=last_results, title=title, location=location, max_jobs=max_jobs, seniority=seniority, has_scheduling_access=check_feature_access('scheduling'), saved_searches=saved_searches)
+            stored = load_search_results(request.form.get("search_id"))
+            stored_jobs = stored["results"] if stored else []
+            stored_id = stored["search_id"] if stored else None
+            return render_template("index.html", info=info, jobs=stored_jobs, search_id=stored_id, title=title, location=location, max_jobs=max_jobs, seniority=seniority, has_scheduling_access=check_feature_access('scheduling'), saved_searches=saved_searches)
             
        
         print(f"🔍 FLASK DEBUG: About to call scraper with seniority='{seniority}', type={type(seniority)}")
         
         try:
-            # Choose scraper based on source
-   
-            if source == "careerjet":
-                print(f"🚨 APP.PY DEBUG: About to call CareerJet API - VERSION 2.0")  # ADD THIS
-                print(f"🔍 DEBUG: Running CareerJet API for admin user")
-                try:
-                    # Debug region detection  
-                    region = detect_user_region(request)
-                    print(f"🔍 DEBUG: Detected region = '{region}'")
-
-                    from careerjet_api import scrape_jobs as scrape_careerjet_jobs
-                    jobs = scrape_careerjet_jobs(title, location, max_jobs, seniority=seniority, region=region)
-
-                except Exception as e: 
-                    print(f"❌ JobSpy Indeed failed: {e}")
-                    jobs = [{
-                        "title": "CareerJet API Error",
-                        "company": "System Info",
-                        "location": location,
-                        "link": "#",
-                        "description": f"CareerJet API error: {str(e)}. Please try eFinancialCareers for now.",
-                        "formatted_description": f"CareerJet API error: {str(e)}. Please try eFinancialCareers for now."                        
-                    }]
-                    
-           
-            else:
-                # Regular efinancialcareers scraper
-                region = detect_user_region(request)
-                jobs = scrape_jobs(title, location, max_jobs, seniority=seniority, region=region)
+            # Choose scraper(s) based on source; "both"/"all" fan out concurrently
+            region = detect_user_region(request)
+            print(f"🔍 DEBUG: Detected region = '{region}'")
+            jobs = scrape_source_jobs(source, title, location, max_jobs, seniority=seniority, region=region)
             
             # Check if this is a special "no results" message
             if jobs and len(jobs) == 1 and jobs[0].get("no_results"):
@@ -4295,25 +4917,7 @@ def index():
                                      special_message=error_message)
             
             # Process job descriptions for successful results
-            for job in jobs:
-                if not job.get("company"):
-                    job["company"] = "[Not Found]"
-
-                # Clean and decode HTML entities in description
-                import html
-                raw_description = job.get("description", "Description not available")
-                decoded_description = html.unescape(raw_description)
-                cleaned_description = (
-                    decoded_description.replace("<u>", "")
-                                      .replace("</u>", "")
-                                      .replace("<strong>", "")
-                                      .replace("</strong>", "")
-                                      .replace("<b>", "")
-                                      .replace("</b>", "")
-                )
-                job["formatted_description"] = cleaned_description
-                # Add source field
-                job["source"] = "EFC" if source == "efinancialcareers" else "CareerJet"
+            format_jobs_for_display(jobs, source)
                 
         except Exception as e:
             print(f"❌ LOAD SEARCH ERROR: {str(e)}")
@@ -4350,20 +4954,350 @@ def index():
         # IMPORTANT: After successful search, increment the count
         if jobs and len(jobs) > 0 and not any(job.get("error_type") for job in jobs):
             increment_search_count()
+            persist_scraped_jobs(jobs)
        
-        last_results = jobs
-        global last_search_name
-        last_search_name = title if title else "Job_Search"
+        search_id = store_search_results(jobs, title if title else "Job_Search", meta={
+            "title": title, "location": location, "source": source, "max_jobs": max_jobs, "seniority": seniority
+        })
         print(f"🔍 DEBUG: About to render template with info = '{info}'")
-        return render_template("index.html", info=info, jobs=jobs, title=title, location=location, source=source, max_jobs=max_jobs, seniority=seniority, has_scheduling_access=check_feature_access('scheduling'), saved_searches=load_saved_searches())
+        return render_template("index.html", info=info, jobs=jobs, search_id=search_id, title=title, location=location, source=source, max_jobs=max_jobs, seniority=seniority, has_scheduling_access=check_feature_access('scheduling'), saved_searches=load_saved_searches())
     
     saved_searches = check_excel_files_for_searches(load_saved_searches())
     print("✅ Saved searches and their Excel status:")
     for s in saved_searches:
         print(f"- {s['name']}: has_excel = {s.get('has_excel')}")
 
+    # Results of a background search (see /app/search/start)
+    if request.args.get("search_id"):
+        stored = load_search_results(request.args.get("search_id"))
+        if stored:
+            session['last_search_id'] = stored["search_id"]
+            meta = stored.get("meta") or {}
+            return render_template_with_admin("index.html", jobs=stored["results"], search_id=stored["search_id"],
+                                              title=meta.get("title", ""), location=meta.get("location", ""),
+                                              source=meta.get("source"), max_jobs=meta.get("max_jobs", 10),
+                                              seniority=meta.get("seniority", ""),
+                                              has_scheduling_access=check_feature_access('scheduling'),
+                                              saved_searches=saved_searches)
+
     return render_template_with_admin("index.html", title="", location="", seniority="", max_jobs=10, has_scheduling_access=check_feature_access('scheduling'), saved_searches=saved_searches)
 
+def _update_search_job(job_id, **fields):
+    with _search_updated:
+        job = _search_jobs.get(job_id)
+        if job is not None:
+            job.update(fields)
+            _search_updated.notify_all()
+    if job is not None:
+        _publish_search_job(job_id, force=True)
+    return job
+
+def _search_job_snapshot(job, since=0):
+    """Plain copy of a search job for the status and stream endpoints (call with _search_lock held)"""
+    snapshot = {
+        'status': job['status'],
+        'stage': job['stage'],
+        'sources': {k: dict(v) for k, v in job['sources'].items()},
+        'partial': job['partial'][since:],
+        'partial_count': len(job['partial']),
+        'created_at': job['created_at'],
+        'started_at': job.get('started_at')
+    }
+    if _queue_position(job):
+        snapshot['queue_position'] = _queue_position(job)
+    for key in ('search_id', 'result_count', 'special_message', 'error'):
+        if job.get(key) is not None:
+            snapshot[key] = job[key]
+    return snapshot
+
+def _publish_search_job(job_id, force=False):
+    """Mirror a search job to the shared result store; progress updates are throttled"""
+    with _search_lock:
+        job = _search_jobs.get(job_id)
+        now = time.time()
+        if job is None or (not force and now - job.get('published_at', 0) < _SEARCH_JOB_PUBLISH_SECONDS):
+            return
+        job['published_at'] = now
+        job['version'] = job.get('version', 0) + 1
+        owner, version, snapshot = job['user_id'], job['version'], _search_job_snapshot(job)
+    get_result_store().save_search_job(owner, job_id, snapshot, version)
+
+def _load_search_job(job_id, user_id, since=0):
+    """Snapshot of a search job run by this worker, else the copy another worker published"""
+    with _search_lock:
+        job = _search_jobs.get(job_id)
+        if job is not None:
+            return _search_job_snapshot(job, since) if job.get('user_id') == user_id else None
+    snapshot = get_result_store().get_search_job(user_id, job_id)
+    if snapshot is not None:
+        snapshot['partial'] = snapshot['partial'][since:]
+    return snapshot
+
+def _job_preview(job):
+    """The fields a streamed/polled result row needs, with a plain-text description snippet"""
+    import html
+    import re
+    description = re.sub(r"<[^>]+>", " ", html.unescape(job.get("description") or ""))
+    description = " ".join(description.split())
+    preview = {key: job.get(key) for key in ("title", "company", "location", "link", "source")}
+    preview["description"] = description[:600] + ("…" if len(description) > 600 else "")
+    return preview
+
+def _queue_position(job):
+    """Place in line for a search that has not started scraping yet (call with _search_lock held)"""
+    if job['status'] == 'queued':
+        # Still waiting for a search worker thread
+        return 1 + sum(1 for v in _search_jobs.values()
+                       if v['status'] == 'queued' and v['created_at'] < job['created_at'])
+    if job['stage'] == 'queued':
+        # Waiting for a browser slot in the scrape scheduler
+        return job.get('queue_position')
+    return None
+
+def _release_search_reservation(job_id):
+    """A search that did not succeed does not count towards the daily limit"""
+    with _search_lock:
+        job = _search_jobs.get(job_id)
+        if job is None or not job.get('reserved'):
+            return
+        job['reserved'] = False
+    release_daily_search(job['user_id'], job['search_date'])
+
+def _run_search_job(job_id, user_id, criteria, region):
+    """Background worker: runs the scrape for one /app/search/start request"""
+    from job_dedup import DedupIndex
+    title = criteria["title"]
+    location = criteria["location"]
+    source = criteria["source"]
+    partial_index = DedupIndex()
+
+    def progress(stage, source=None, **info):
+        with _search_updated:
+            job = _search_jobs.get(job_id)
+            if job is None:
+                return
+            job["stage"] = stage
+            source_state = job["sources"].setdefault(source or "all", {})
+            source_state["stage"] = stage
+            if "done" in info:
+                source_state["done"] = info["done"]
+                source_state["total"] = info.get("total")
+            elif stage == "links":
+                source_state["total"] = info.get("total")
+            _search_updated.notify_all()
+        if stage == "job" and partial_index.add(info["job"], source=source) is None:
+            preview = _job_preview(info["job"])
+            with _search_updated:
+                job = _search_jobs.get(job_id)
+                if job is not None:
+                    job["partial"].append(preview)
+                    _search_updated.notify_all()
+        _publish_search_job(job_id)
+
+    _update_search_job(job_id, status="running", started_at=time.time(), stage="starting")
+    try:
+        jobs = scrape_source_jobs(source, title, location, criteria["max_jobs"],
+                                  seniority=criteria["seniority"], region=region, progress=progress,
+                                  on_queue=lambda position: _update_search_job(job_id, stage="queued",
+                                                                               queue_position=position))
+
+        if jobs and len(jobs) == 1 and (jobs[0].get("no_results") or jobs[0].get("error_type")):
+            special_message = jobs[0].get("special_message") if jobs[0].get("no_results") else None
+            special_message = special_message or jobs[0].get("description", "An error occurred during the search.")
+            _update_search_job(job_id, status="done", stage="finished", special_message=special_message,
+                               finished_at=time.time())
+            _release_search_reservation(job_id)
+            return
+
+        format_jobs_for_display(jobs, source)
+        successful = bool(jobs) and not any(job.get("error_type") for job in jobs)
+        if successful:
+            persist_scraped_jobs(jobs)
+        search_id = get_result_store().save(user_id, jobs, title if title else "Job_Search", meta=criteria)
+        if search_id is None:
+            # The results page is loaded by search_id, so there is nothing to send the user to
+            raise RuntimeError("results could not be stored")
+        _update_search_job(job_id, status="done", stage="finished", search_id=search_id, successful=successful,
+                           result_count=len(jobs), finished_at=time.time())
+        if not successful:
+            _release_search_reservation(job_id)
+    except Exception as e:
+        print(f"❌ Background search {job_id} failed: {e}")
+        import traceback
+        traceback.print_exc()
+        _update_search_job(job_id, status="error", stage="failed", finished_at=time.time(),
+                           error="We're experiencing technical difficulties. Please try again in a few minutes.")
+        _release_search_reservation(job_id)
+
+@app.route("/app/search/start", methods=["POST"])
+def start_search_job():
+    """Queue a job search and return its id straight away; poll /app/search/status/<job_id>"""
+    user_id = get_current_user_id()
+    if not user_id:
+        return jsonify({'error': 'Not authenticated'}), 401
+    # Counted now, not when the result is picked up, so parallel or abandoned starts cannot
+    # get round the limit; failed searches hand it back
+    allowed, reserved = reserve_daily_search()
+    if not allowed:
+        # The browser falls back to a normal form post, which renders the upgrade page
+        return jsonify({'error': f'Daily limit of {FREE_DAILY_SEARCH_LIMIT} searches reached', 'fallback': True}), 429
+    search_date = datetime.now().date()
+
+    try:
+        max_jobs = int(request.form.get("max_jobs", ""))
+        if max_jobs <= 0 or max_jobs > 50:
+            max_jobs = 50
+    except (ValueError, TypeError):
+        max_jobs = 50
+    criteria = {
+        "title": request.form.get("title", ""),
+        "location": request.form.get("location", ""),
+        "seniority": request.form.get("seniority", ""),
+        "source": request.form.get("source", "efinancialcareers"),
+        "max_jobs": max_jobs
+    }
+    region = detect_user_region(request)
+
+    # Turn work away now rather than queueing a search that would be rejected later
+    busy = get_scrape_scheduler().admission_error()
+    if busy:
+        if reserved:
+            release_daily_search(user_id, search_date)
+        return jsonify({'error': busy}), 503
+
+    job_id = str(uuid.uuid4())
+    with _search_lock:
+        now = time.time()
+        stale = [k for k, v in _search_jobs.items()
+                 if now - v.get('created_at', now) > _SEARCH_JOB_TTL]
+        for k in stale:
+            del _search_jobs[k]
+        active = sum(1 for v in _search_jobs.values() if v['status'] in ('queued', 'running'))
+        queue_full = active >= _SEARCH_WORKERS + _SEARCH_QUEUE_LIMIT
+        if not queue_full:
+            _search_jobs[job_id] = {
+                'status': 'queued', 'stage': 'queued', 'created_at': now, 'user_id': user_id,
+                'criteria': criteria, 'sources': {}, 'partial': [],
+                'reserved': reserved, 'search_date': search_date
+            }
+    if queue_full:
+        if reserved:
+            release_daily_search(user_id, search_date)
+        return jsonify({'error': 'Search queue is full, please try again in a minute.'}), 503
+    _publish_search_job(job_id, force=True)
+
+    try:
+        _search_executor.submit(_run_search_job, job_id, user_id, criteria, region)
+    except RuntimeError:
+        # Executor shut down
+        _update_search_job(job_id, status="error", stage="failed", finished_at=time.time(),
+                           error="We're experiencing technical difficulties. Please try again in a few minutes.")
+        _release_search_reservation(job_id)
+        return jsonify({'error': 'Search service is unavailable, please try again in a minute.'}), 503
+    log_user_activity("search", f"'{criteria['title']}' in '{criteria['location']}' (background)")
+    return jsonify({'job_id': job_id, 'status': 'queued'})
+
+@app.route("/app/search/status/<job_id>", methods=["GET"])
+def search_job_status(job_id):
+    """Poll endpoint: stage, per-source progress and results found so far (from ?since=N)"""
+    user_id = get_current_user_id()
+    if not user_id:
+        return jsonify({'error': 'Not authenticated'}), 401
+    try:
+        since = max(int(request.args.get('since', 0)), 0)
+    except ValueError:
+        since = 0
+
+    job = _load_search_job(job_id, user_id, since)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    payload = {key: job[key] for key in ('status', 'stage', 'sources', 'partial', 'partial_count')}
+    payload['elapsed'] = round(time.time() - (job.get('started_at') or job['created_at']), 1)
+    for key in ('queue_position', 'search_id', 'result_count', 'special_message', 'error'):
+        if job.get(key) is not None:
+            payload[key] = job[key]
+
+    return jsonify(payload)
+
+def _sse(event, data, event_id=None):
+    message = f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    return f"id: {event_id}\n{message}" if event_id is not None else message
+
+@app.route("/app/search/stream/<job_id>", methods=["GET"])
+def search_job_stream(job_id):
+    """Server-Sent Events: a `job` event per result as it is scraped, `progress` on stage
+    changes and a final `done` summary. Reconnects resume from Last-Event-ID.
+
+    After SEARCH_STREAM_MAX_SECONDS a `poll` event tells the page to switch to
+    /app/search/status, so a slow scrape does not hold a sync worker throughout."""
+    user_id = get_current_user_id()
+    if not user_id:
+        return jsonify({'error': 'Not authenticated'}), 401
+    if _load_search_job(job_id, user_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    try:
+        sent = max(int(request.headers.get('Last-Event-ID') or request.args.get('since', 0)), 0)
+    except ValueError:
+        sent = 0
+
+    def next_snapshot(previous, wait):
+        """The job once it has news since `previous` (or after `wait` seconds)"""
+        with _search_updated:
+            job = _search_jobs.get(job_id)
+            if job is not None:
+                if job['status'] in ('queued', 'running') and len(job['partial']) <= sent:
+                    _search_updated.wait(timeout=wait)
+                    job = _search_jobs.get(job_id)
+                if job is not None:
+                    return _search_job_snapshot(job, sent)
+        # Run by another worker: poll the copy it publishes
+        deadline = time.time() + wait
+        while True:
+            job = _load_search_job(job_id, user_id, sent)
+            if job is None or previous is None or job['status'] not in ('queued', 'running') or job['partial'] \
+                    or any(job.get(key) != previous.get(key) for key in ('stage', 'sources', 'queue_position')) \
+                    or time.time() >= deadline:
+                return job
+            time.sleep(_SEARCH_JOB_POLL_SECONDS)
+
+    def generate():
+        nonlocal sent
+        last_progress = job = None
+        stream_deadline = time.time() + _SEARCH_STREAM_MAX_SECONDS
+        yield "retry: 3000\n\n"
+        while True:
+            remaining = stream_deadline - time.time()
+            if remaining <= 0:
+                yield _sse('poll', {'partial_count': sent})
+                return
+            job = next_snapshot(job, min(15, remaining))
+            if job is None:
+                break
+            new_jobs = job['partial']
+            status = job['status']
+            progress = {key: job[key] for key in ('status', 'stage', 'sources', 'partial_count', 'queue_position')
+                        if job.get(key) is not None}
+            summary = {key: job[key] for key in ('search_id', 'result_count', 'special_message', 'error')
+                       if job.get(key) is not None}
+
+            for preview in new_jobs:
+                sent += 1
+                yield _sse('job', preview, event_id=sent)
+            if progress != last_progress:
+                last_progress = progress
+                yield _sse('progress', progress)
+            elif not new_jobs:
+                yield ": keepalive\n\n"
+            if status in ('done', 'error'):
+                yield _sse('done', dict(summary, status=status, partial_count=progress['partial_count']))
+                return
+        yield _sse('done', {'status': 'error', 'error': 'This search has expired. Please run it again.'})
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
@@ -4584,7 +5518,7 @@ def settings():
     try:
         with engine.connect() as conn:
             result = conn.execute(text("""
-                SELECT username, email FROM users WHERE id = :user_id
+                SELECT username, email, email_digest FROM users WHERE id = :user_id
             """), {"user_id": user_id})
             user = result.fetchone()
             
@@ -4593,6 +5527,7 @@ def settings():
                 
             current_username = user[0]
             current_email = user[1]
+            current_digest = digest_mode(user[2])
     except Exception as e:
         print(f"Error fetching user data: {e}")
         return "Error loading settings", 500
@@ -4604,20 +5539,22 @@ def settings():
             # Handle profile updates
             new_username = request.form.get("username", "").strip()
             new_email = request.form.get("email", "").strip()
+            new_digest = digest_mode(request.form.get("email_digest", current_digest))
             
             if not new_username or not new_email:
                 return render_template("settings.html", 
-                    username=current_username, email=current_email,
+                    username=current_username, email=current_email, email_digest=current_digest,
                     error="Please fill in all fields")
             
             try:
                 with engine.connect() as conn:
                     conn.execute(text("""
-                        UPDATE users SET username = :username, email = :email 
+                        UPDATE users SET username = :username, email = :email, email_digest = :email_digest 
                         WHERE id = :user_id
                     """), {
                         "username": new_username,
                         "email": new_email,
+                        "email_digest": new_digest,
                         "user_id": user_id
                     })
                     conn.commit()
@@ -4626,11 +5563,11 @@ def settings():
                     session['username'] = new_username
                     
                 return render_template("settings.html", 
-                    username=new_username, email=new_email,
+                    username=new_username, email=new_email, email_digest=new_digest,
                     success="Profile updated successfully!")
             except Exception as e:
                 return render_template("settings.html", 
-                    username=current_username, email=current_email,
+                    username=current_username, email=current_email, email_digest=current_digest,
                     error="Username or email already exists")
         
         elif action == "change_password":
@@ -4641,18 +5578,18 @@ def settings():
             
             if not current_password or not new_password or not confirm_password:
                 return render_template("settings.html", 
-                    username=current_username, email=current_email,
+                    username=current_username, email=current_email, email_digest=current_digest,
                     error="Please fill in all password fields")
             
             if new_password != confirm_password:
                 return render_template("settings.html", 
-                    username=current_username, email=current_email,
+                    username=current_username, email=current_email, email_digest=current_digest,
                     error="New passwords don't match")
             
             # Verify current password
             if not verify_user(current_username, current_password):
                 return render_template("settings.html", 
-                    username=current_username, email=current_email,
+                    username=current_username, email=current_email, email_digest=current_digest,
                     error="Current password is incorrect")
             
             try:
@@ -4668,11 +5605,11 @@ def settings():
                     conn.commit()
                     
                 return render_template("settings.html", 
-                    username=current_username, email=current_email,
+                    username=current_username, email=current_email, email_digest=current_digest,
                     success="Password changed successfully!")
             except Exception as e:
                 return render_template("settings.html", 
-                    username=current_username, email=current_email,
+                    username=current_username, email=current_email, email_digest=current_digest,
                     error="Error changing password")
     
    
@@ -4718,17 +5655,18 @@ def settings():
                         trans.rollback()
                         print(f"Error during account deletion: {e}")
                         return render_template("settings.html", 
-                            username=current_username, email=current_email,
+                            username=current_username, email=current_email, email_digest=current_digest,
                             error="Error deleting account. Please try again later.")
                             
             except Exception as e:
                 print(f"Database error during account deletion: {e}")
                 return render_template("settings.html", 
-                    username=current_username, email=current_email,
+                    username=current_username, email=current_email, email_digest=current_digest,
                     error="Database error. Please try again later.")   
     
     
-    return render_template("settings.html", username=current_username, email=current_email)
+    return render_template("settings.html", username=current_username, email=current_email,
+                           email_digest=current_digest)
 
 @app.route("/submit_feedback", methods=["POST"])
 def submit_feedback():
@@ -4824,13 +5762,9 @@ def load_saved_search(index):
             print(f"🔍 LOAD DEBUG: All criteria: {criteria}")
 
             # Use the SAVED source, not the form
-            if saved_source == "careerjet":
-                print("🔍 LOAD DEBUG: Calling CareerJet because saved search was CareerJet")
-                from careerjet_api import scrape_jobs as scrape_careerjet_jobs
-                jobs = scrape_careerjet_jobs(title, location, max_jobs, seniority=seniority, region=region)
-            else:
-                print("🔍 LOAD DEBUG: Calling eFinancialCareers because saved search was eFinancialCareers")
-                jobs = scrape_jobs(title, location, max_jobs, seniority=seniority, region=region)
+            print(f"🔍 LOAD DEBUG: Calling {source_label(saved_source)} because that is the saved source")
+            jobs = scrape_source_jobs(saved_source, title, location, max_jobs, seniority=seniority, region=region)
+            persist_scraped_jobs(jobs)
                         
             log_user_activity("search", f"'{title}' in '{location}' ({len(jobs)} results)")
             
@@ -4851,15 +5785,12 @@ def load_saved_search(index):
 
      
         
-        global last_results
-        last_results = jobs
-
-        global last_search_name
-        last_search_name = searches[index]['name']
+        search_id = store_search_results(jobs, searches[index]['name'])
 
         return render_template(
             "index.html",
             jobs=jobs,
+            search_id=search_id,
             title=title,
             location=location,
             max_jobs=max_jobs,
@@ -4884,11 +5815,12 @@ def download():
                              current_plan="free")
 
     # Your existing code continues unchanged....   
-    global last_results
-    if not last_results:
+    stored = load_search_results(request.form.get("search_id"))
+    results = stored["results"] if stored else []
+    if not results:
         return "No results to export", 400
 
-    df = pd.DataFrame(last_results).drop(columns=["formatted_description"], errors="ignore")
+    df = pd.DataFrame(results).drop(columns=["formatted_description"], errors="ignore")
     df["description"] = df["description"].apply(clean_description_for_excel)
 
     # Reorder columns so 'link' comes before 'description'
@@ -4994,20 +5926,17 @@ def download():
         worksheet.autofilter(0, 0, len(df), len(df.columns))
 
 
-    global last_search_name
+    last_search_name = stored["name"]
     title_from_form = request.form.get("title", "").strip()
 
     # Get source from the current search
     if hasattr(request, 'form') and request.form.get("source"):
-        source_from_form = request.form.get("source", "efinancialcareers")
+        source_abbrev = source_label(request.form.get("source", "efinancialcareers")).replace(" + ", "_")
+    elif results:
+        # Try to detect source(s) from job results
+        source_abbrev = "_".join(dict.fromkeys(job.get("source", "EFC") for job in results))
     else:
-        # Try to detect source from job results
-        source_from_form = "efinancialcareers"  # default
-        if last_results and len(last_results) > 0:
-            first_job_source = last_results[0].get("source", "EFC")
-            source_from_form = "careerjet" if first_job_source == "CareerJet" else "efinancialcareers"
-
-    source_abbrev = "EFC" if source_from_form == "efinancialcareers" else "CareerJet"
+        source_abbrev = "EFC"  # default
     
     if last_search_name and last_search_name != "Job_Search":
         base_name = last_search_name
@@ -5139,16 +6068,19 @@ def save_schedule():
         if engine:
             try:
                 with engine.connect() as conn:
-                    conn.execute(text("""
+                    row = conn.execute(text("""
                         UPDATE saved_searches 
                         SET schedule = :schedule 
                         WHERE name = :name AND user_id = :user_id
+                        RETURNING id
                     """), {
                         "schedule": frequency,
                         "name": search["name"],
                         "user_id": get_current_user_id()
-                    })
+                    }).fetchone()
                     conn.commit()
+                if row:
+                    schedule_next_run(engine, row[0], get_current_user_id(), frequency)
                 return '', 200
             except Exception as e:
                 print(f"Error updating schedule: {e}")
@@ -5165,11 +6097,15 @@ def download_scheduled(search_name):
     
     try:
         with engine.connect() as conn:
+            # Fall back to the digest workbook, which has this search's results on its own sheet
             result = conn.execute(text("""
                 SELECT file_data, filename FROM scheduled_files 
-                WHERE search_name = :search_name AND user_id = :user_id
+                WHERE search_name IN (:search_name, :digest_name) AND user_id = :user_id
+                ORDER BY (search_name = :search_name) DESC, created_at DESC
+                LIMIT 1
             """), {
                 "search_name": search_name,
+                "digest_name": DIGEST_FILE_NAME,
                 "user_id": get_current_user_id()
             })
             
@@ -5199,6 +6135,60 @@ def api_saved_searches():
     searches = load_saved_searches()
     return json.dumps(searches), 200, {'Content-Type': 'application/json'}
 
+@app.route("/api/jobs/search")
+def api_search_jobs():
+    """Full-text search over every posting scraped so far, without a new scrape"""
+    if not get_current_user_id():
+        return jsonify({"error": "Not authenticated"}), 401
+
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "Missing search query 'q'"}), 400
+    location = request.args.get("location", "").strip()
+    source = request.args.get("source", "").strip()
+    try:
+        limit = min(max(int(request.args.get("limit", 25)), 1), 100)
+    except ValueError:
+        limit = 25
+
+    engine = get_db_connection()
+    if not engine:
+        return jsonify({"error": "Database not available"}), 503
+    try:
+        with engine.connect() as conn:
+            result = conn.execute(text("""
+                SELECT source, url, title, company, location, LEFT(description, 500),
+                       first_seen, last_seen, ts_rank(search_vector, query) AS rank
+                FROM jobs, websearch_to_tsquery('english', :q) AS query
+                WHERE search_vector @@ query
+                  AND (:location = '' OR location ILIKE :location_pattern)
+                  AND (:source = '' OR source = :source)
+                ORDER BY rank DESC, last_seen DESC
+                LIMIT :limit
+            """), {
+                "q": query,
+                "location": location,
+                "location_pattern": f"%{location}%",
+                "source": source,
+                "limit": limit
+            })
+            jobs = [{
+                "source": row[0],
+                "link": row[1],
+                "title": row[2],
+                "company": row[3],
+                "location": row[4],
+                "description": row[5],
+                "first_seen": row[6].isoformat() if row[6] else None,
+                "last_seen": row[7].isoformat() if row[7] else None,
+                "rank": float(row[8])
+            } for row in result]
+    except Exception as e:
+        print(f"❌ Job search error: {e}")
+        return jsonify({"error": "Search failed"}), 500
+
+    return jsonify({"query": query, "count": len(jobs), "jobs": jobs})
+
 @app.route("/saved_searches_partial")
 def saved_searches_partial():
     searches = check_excel_files_for_searches(load_saved_searches())
@@ -5353,6 +6343,27 @@ def test_db():
     except Exception as e:
         return f"Database error: {e}"
 
+@app.route("/debug_cache_stats")
+def debug_cache_stats():
+    """Hit/miss counters for the scraper caches. Owner only."""
+    if get_current_user_id() != 3:
+        return "Unauthorized", 403
+    from careerjet_api import search_cache_stats
+    return jsonify({"careerjet_search_cache": search_cache_stats(),
+                    "result_store": get_result_store().stats(),
+                    "scrape_scheduler": get_scrape_scheduler().stats()})
+
+@app.route("/debug_scheduler_report")
+def debug_scheduler_report():
+    """Per-search outcome of the last scheduled run. Owner only."""
+    if get_current_user_id() != 3:
+        return "Unauthorized", 403
+    report = dict(_last_scheduler_report or {"message": "No scheduled run since the last restart"})
+    if get_task_queue():
+        report["task_queue"] = get_task_queue().stats()
+    report["smtp_pool"] = get_mailer(config).pool.stats()
+    return jsonify(report)
+
 @app.route("/debug_env")
 def debug_env():
     import os
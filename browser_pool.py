@@ -0,0 +1,235 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class PoolExhausted(Exception):
+    """Raised when no browser could be checked out before the timeout."""
+
+
+class _PooledDriver:
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.uses = 0
+        self.checked_out = False
+
+
+class DriverPool:
+    """Bounded pool of pre-launched browser drivers.
+
+    ``factory`` must return a fully configured driver (options, anti-detection
+    script, etc). Idle drivers are health-checked on checkout, recycled after
+    ``max_uses`` searches and evicted once idle for ``idle_timeout`` seconds.
+    """
+
+    def __init__(self, factory, max_size=2, min_idle=0, max_uses=20,
+                 idle_timeout=600, checkout_timeout=120):
+        self.factory = factory
+        self.max_size = max(1, int(max_size))
+        self.min_idle = min(int(min_idle), self.max_size)
+        self.max_uses = int(max_uses)
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = []          # most recently returned last
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._reaper = None
+        self._closed = False
+
+    # ── public API ─────────────────────────────────────────────────────────
+
+    def acquire(self, timeout=None):
+        """Check a healthy driver out of the pool, launching one if allowed."""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+        self._ensure_reaper()
+
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolExhausted("Driver pool is closed")
+                    if self._idle:
+                        entry = self._idle.pop()
+                        self._in_use += 1
+                        break
+                    if self._size() < self.max_size:
+                        entry = None
+                        self._in_use += 1
+                        break
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise PoolExhausted(
+                            f"No browser available after {timeout}s "
+                            f"({self._in_use}/{self.max_size} in use)"
+                        )
+                    self._cond.wait(remaining)
+
+            if entry is None:
+                try:
+                    entry = _PooledDriver(self.factory())
+                    logger.info("🌐 Driver pool: launched new browser")
+                except Exception:
+                    self._forget_checkout()
+                    raise
+            elif not self._is_healthy(entry):
+                logger.info("♻️ Driver pool: discarding unhealthy browser")
+                self._quit(entry)
+                self._forget_checkout()
+                continue
+
+            entry.uses += 1
+            entry.last_used = time.time()
+            entry.checked_out = True
+            entry.driver._pool_entry = entry
+            return entry.driver
+
+    def release(self, driver, discard=False):
+        """Return a driver to the pool; ``discard`` quits it instead."""
+        entry = getattr(driver, "_pool_entry", None)
+        if entry is None:
+            _safe_quit(driver)
+            return
+        if not entry.checked_out:
+            return  # already released
+        entry.checked_out = False
+
+        if not discard and self.max_uses and entry.uses >= self.max_uses:
+            logger.info(f"♻️ Driver pool: recycling browser after {entry.uses} uses")
+            discard = True
+
+        if not discard:
+            try:
+                driver.get("about:blank")
+                driver.delete_all_cookies()
+            except Exception:
+                discard = True
+
+        if discard:
+            self._quit(entry)
+            self._forget_checkout()
+            return
+
+        with self._cond:
+            self._in_use -= 1
+            if self._closed:
+                self._quit(entry)
+            else:
+                entry.last_used = time.time()
+                self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Context manager around acquire/release; errors discard the driver."""
+        drv = self.acquire(timeout=timeout)
+        try:
+            yield drv
+        except BaseException:
+            self.release(drv, discard=True)
+            raise
+        else:
+            self.release(drv)
+
+    def warm_up(self):
+        """Pre-launch drivers until ``min_idle`` are waiting in the pool."""
+        while True:
+            with self._cond:
+                if self._closed or len(self._idle) >= self.min_idle or self._size() >= self.max_size:
+                    return
+                self._in_use += 1
+            try:
+                entry = _PooledDriver(self.factory())
+            except Exception as e:
+                logger.info(f"❌ Driver pool warm-up failed: {e}")
+                self._forget_checkout()
+                return
+            with self._cond:
+                self._in_use -= 1
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def evict_idle(self):
+        """Quit drivers that have sat idle longer than ``idle_timeout``."""
+        now = time.time()
+        with self._cond:
+            keep, stale = [], []
+            for entry in self._idle:
+                if self.idle_timeout and now - entry.last_used > self.idle_timeout:
+                    stale.append(entry)
+                else:
+                    keep.append(entry)
+            # Never evict below the warm floor
+            while stale and len(keep) < self.min_idle:
+                keep.append(stale.pop())
+            self._idle = keep
+            if stale:
+                self._cond.notify_all()
+        for entry in stale:
+            self._quit(entry)
+        if stale:
+            logger.info(f"🧹 Driver pool: evicted {len(stale)} idle browser(s)")
+
+    def stats(self):
+        with self._cond:
+            return {"idle": len(self._idle), "in_use": self._in_use, "max_size": self.max_size}
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for entry in idle:
+            self._quit(entry)
+
+    # ── internals ──────────────────────────────────────────────────────────
+
+    def _size(self):
+        return len(self._idle) + self._in_use
+
+    def _forget_checkout(self):
+        with self._cond:
+            self._in_use -= 1
+            self._cond.notify()
+
+    def _is_healthy(self, entry):
+        try:
+            entry.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, entry):
+        _safe_quit(entry.driver)
+
+    def _ensure_reaper(self):
+        if self._reaper is not None or not self.idle_timeout:
+            return
+        with self._cond:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        interval = max(5, min(60, self.idle_timeout / 2))
+        while not self._closed:
+            time.sleep(interval)
+            try:
+                self.evict_idle()
+                self.warm_up()
+            except Exception as e:
+                logger.info(f"❌ Driver pool maintenance error: {e}")
+
+
+def _safe_quit(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
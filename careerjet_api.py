@@ -1,37 +1,81 @@
 import requests
-import time
+import html
+import math
+import os
+import re
 import random
 import logging
 from datetime import datetime
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from host_throttle import HostThrottle
+from ttl_cache import CoalescingTTLCache
+from job_cache import conditional_headers, get_job_cache, validators_from_response
+from job_dedup import DedupIndex, job_key
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PAGE_SIZE = 20
 
-def extract_full_careerjet_description(job_url):
-   """Extract full description from individual CareerJet job page"""
+REGION_URLS = {
+    "US": "https://www.careerjet.com",
+    "UK": "https://www.careerjet.co.uk",
+    "CA": "https://www.careerjet.ca",
+    "AU": "https://www.careerjet.com.au",
+    "DE": "https://www.careerjet.de",
+    "SG": "https://www.careerjet.sg",
+    "IN": "https://www.careerjet.co.in"
+}
+
+# Short-lived cache of search API responses keyed by normalised query
+_search_cache = CoalescingTTLCache(
+    maxsize=500, ttl=int(os.environ.get("CAREERJET_SEARCH_CACHE_TTL", "300")))
+
+# Description fetches share one keep-alive session and a per-host rate limit
+DESCRIPTION_WORKERS = int(os.environ.get("CAREERJET_DESC_WORKERS", "5"))
+_description_throttle = HostThrottle(float(os.environ.get("CAREERJET_MIN_INTERVAL", "0.25")))
+_http_session = requests.Session()
+_http_session.mount("https://", HTTPAdapter(pool_maxsize=max(10, DESCRIPTION_WORKERS * 2)))
+_http_session.mount("http://", HTTPAdapter(pool_maxsize=max(10, DESCRIPTION_WORKERS * 2)))
+
+
+def extract_full_careerjet_description(job_url, meta=None):
+   """Extract full description from individual CareerJet job page
+
+   Consults the shared job cache first; ``meta`` (title/company/location from
+   the API) is stored alongside the description on a successful fetch.
+   """
    print(f"🚨 EXTRACT FUNCTION: Attempting to scrape from URL: {job_url}")
+
+   cache = get_job_cache()
+   cached = cache.lookup(job_url)
+   if cached and cached["fresh"] and cached.get("description"):
+       print(f"💾 EXTRACT FUNCTION: Cache hit for {job_url}")
+       return cached["description"]
    
    try:
        headers = {
            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36'
        }
+       headers.update(conditional_headers(cached))
        
+       _description_throttle.wait(job_url)
        print(f"🚨 EXTRACT FUNCTION: Making HTTP request to: {job_url}")
-       response = requests.get(job_url, headers=headers, timeout=15)
+       response = _http_session.get(job_url, headers=headers, timeout=15)
        print(f"🚨 EXTRACT FUNCTION: Response status: {response.status_code}")
        print(f"🚨 EXTRACT FUNCTION: Final URL after redirects: {response.url}")
+
+       if response.status_code == 304 and cached and cached.get("description"):
+           print(f"💾 EXTRACT FUNCTION: Cache revalidated (304) for {job_url}")
+           cache.touch(job_url)
+           return cached["description"]
        
        if response.status_code != 200:
            print(f"🚨 EXTRACT FUNCTION: Failed - non-200 status")
            return None
            
-       # Save the actual page content for inspection
-       with open(f"debug_job_page_{int(time.time())}.html", "w", encoding="utf-8") as f:
-           f.write(response.text)
-       print(f"🚨 EXTRACT FUNCTION: Saved page content to debug file")
-       
        soup = BeautifulSoup(response.content, 'html.parser')
        
        # Find the content section (from your HTML analysis)
@@ -41,6 +85,8 @@ def extract_full_careerjet_description(job_url):
            full_description = content_section.get_text(separator=' ', strip=True)
            print(f"🚨 EXTRACT FUNCTION: Found content section - {len(full_description)} chars")
            print(f"🚨 EXTRACT FUNCTION: Content preview: {full_description[:200]}...")
+           cache.store(job_url, dict(meta or {}, description=full_description),
+                       **validators_from_response(response))
            return full_description
        else:
            print(f"🚨 EXTRACT FUNCTION: No content section found")
@@ -50,7 +96,306 @@ def extract_full_careerjet_description(job_url):
        print(f"🚨 EXTRACT FUNCTION: Exception occurred: {e}")
        return None
 
-def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US"):
+class CareerJetAPIError(Exception):
+   """Search request failed; ``error_job`` is the error dict shown to the user"""
+   def __init__(self, error_job):
+       super().__init__(error_job.get("description", "CareerJet API error"))
+       self.error_job = error_job
+
+
+def _error_job(error_type, title, company, location, description):
+   return {
+       "error_type": error_type,
+       "title": title,
+       "company": company,
+       "location": location,
+       "link": "#",
+       "description": description,
+       "formatted_description": description
+   }
+
+
+def _build_search_params(title, location, max_jobs, seniority, region):
+   # Enhanced regional mapping for CareerJet
+   region_mapping = {
+       "US": "en_US",
+       "UK": "en_GB", 
+       "CA": "en_CA",
+       "AU": "en_AU",
+       "DE": "de_DE",
+       "SG": "en_SG",
+       "IN": "en_IN"
+   }
+
+   locale_code = region_mapping.get(region, "en_US")  # Default to US
+   print(f"🌍 Using CareerJet locale: {locale_code} for region: {region}")        
+   
+   # API parameters
+   params = {
+       'keywords': " ".join(title.split()),
+       'location': " ".join(location.split()),
+       'affid': 'dbeb46864e3514ee44146b52e98c7e8e',
+       'user_ip': '127.0.0.1',
+       'user_agent': 'FindMeAJob/1.0',
+       'locale_code': locale_code,
+       'pagesize': min(max_jobs, PAGE_SIZE),
+       'page': 1
+   }
+   
+   # Add seniority filtering if specified
+   if seniority:
+       seniority_mapping = {
+           'intern': 'internship',
+           'junior': 'entry level',
+           'analyst': 'entry level',
+           'associate': 'experienced', 
+           'avp': 'experienced',
+           'vp': 'manager',
+           'svp': 'executive',
+           'director': 'executive',
+           'md': 'executive',
+           'csuite': 'executive'
+       }
+       mapped_seniority = seniority_mapping.get(seniority, '')
+       if mapped_seniority:
+           params['keywords'] = f"{params['keywords']} {mapped_seniority}"
+           print(f"🎯 Applied seniority filter: {mapped_seniority}")
+   return params
+
+
+def search_cache_key(params):
+   """Normalised cache key: case/whitespace-folded query, locale, page size and page"""
+   def fold(value):
+       return " ".join(str(value or "").split()).casefold()
+   return (
+       fold(params.get('keywords')),
+       fold(params.get('location')),
+       params.get('locale_code'),
+       params.get('pagesize'),
+       params.get('page'),
+   )
+
+
+def search_cache_stats():
+   return _search_cache.stats()
+
+
+def _fetch_search_page(params, page, location):
+   """Request one page of API results; raises CareerJetAPIError on failure
+
+   Identical normalised queries within CAREERJET_SEARCH_CACHE_TTL seconds are
+   served from cache, and concurrent identical queries share one upstream call.
+   """
+   params = dict(params, page=page)
+   return _search_cache.get_or_compute(
+       search_cache_key(params), lambda: _request_search_page(params, page, location))
+
+
+def _request_search_page(params, page, location):
+   api_url = "http://public.api.careerjet.net/search"
+   print(f"🔍 API Request params: {params}")
+   
+   # Make API request
+   response = _http_session.get(api_url, params=params, timeout=30)
+   print(f"🔍 API Response status: {response.status_code} (page {page})")
+   
+   if response.status_code != 200:
+       print(f"❌ API Error: Status {response.status_code}")
+       raise CareerJetAPIError(_error_job(
+           "api_error", "CareerJet API Error", "Error", location,
+           f"CareerJet API returned status {response.status_code}. Please try again later."))
+   
+   # Parse JSON response
+   try:
+       data = response.json()
+       # STEP 1 DEBUG: Save raw API response
+       print("🔍 STEP 1 DEBUG: Raw API response structure")
+       print(f"Response keys: {data.keys()}")
+       print(f"Response type field: {data.get('type', 'NO_TYPE_FIELD')}")
+       print(f"Number of jobs: {len(data.get('jobs', []))}")
+       print(f"Hits: {data.get('hits', 'NO_HITS_FIELD')}, pages: {data.get('pages', 'NO_PAGES_FIELD')}")
+   except Exception as e:
+       print(f"❌ JSON Parse Error: {e}")
+       raise CareerJetAPIError(_error_job(
+           "json_error", "API Response Error", "Error", location,
+           "Could not parse CareerJet API response. Please try again later."))
+   
+   # Check for API errors
+   if data.get('type') != 'JOBS':
+       print(f"❌ API Error: {data.get('type', 'Unknown error')}")
+       raise CareerJetAPIError(_error_job(
+           "api_response_error", "No Jobs Found", "CareerJet", location,
+           f"CareerJet API error: {data.get('type', 'Unknown error')}"))
+
+   jobs_data = data.get('jobs', [])
+   print(f"🔍 Found {len(jobs_data)} jobs from CareerJet API on page {page}")
+   return data
+
+
+def _resolve_job(job, i, location, region):
+   """Pull the fields we need from an API job and convert its tracking URL"""
+   # Get basic job data from API
+   job_title = job.get('title', '[Not Found]').strip()
+   company = job.get('company', '[Not Found]').strip()
+   job_location = job.get('locations', location).strip()
+   raw_job_url = job.get('url', '#')
+   short_description = job.get('description', 'No description available').strip()
+
+   # DEBUG: Check what CareerJet API actually returns
+   print(f"🔍 CAREERJET DEBUG - Job {i+1}: {job_title}")
+   print(f"🔍 SHORT DESC LENGTH: {len(short_description)} chars")
+   print(f"🔍 SHORT DESC PREVIEW: {short_description[:200]}...")
+   print(f"🔍 ALL JOB FIELDS: {list(job.keys())}")
+
+   # Extract job ID from tracking URL to get actual job page
+   if 'jobviewtrack.com' in raw_job_url:
+       # Extract the 32-character job ID from the URL
+       job_id_match = re.search(r'/([a-f0-9]{32})\.html', raw_job_url)
+       base_url = REGION_URLS.get(region, "https://www.careerjet.com")
+       
+       if job_id_match:
+           if region == "IN":
+               base_url = "https://www.careerjet.com"  # job ads for IN resolve on the .com site
+           job_id = job_id_match.group(1)
+           job_url = f"{base_url}/jobad/us{job_id}"
+           print(f"🔄 Extracted job URL: {job_url}")
+       else:
+           print(f"❌ Could not extract job ID from: {raw_job_url}")
+           # Fallback to search URL
+           safe_title = job_title.replace(' ', '+').replace(',', '')
+           safe_location = job_location.replace(' ', '+').replace(',', '')
+           job_url = f"{base_url}/jobs?s={safe_title}&l={safe_location}"
+   else:
+       job_url = raw_job_url
+
+   print(f"🔍 Processing job {i+1}: {job_title}")
+   return {
+       'index': i,
+       'title': job_title,
+       'company': company,
+       'location': job_location,
+       'raw_url': raw_job_url,
+       'link': job_url,
+       'short_description': short_description,
+   }
+
+
+def _format_job(item, full_description):
+   i = item['index']
+   short_description = item['short_description']
+
+   # Use full description if available, otherwise use short one
+   print(f"🔍 DESCRIPTION COMPARISON FOR JOB {i+1}:")
+   print(f"  - Original API URL: {item['raw_url']}")
+   print(f"  - Converted URL: {item['link']}")
+   print(f"  - Short desc: {len(short_description)} chars")
+   print(f"  - Full desc: {len(full_description) if full_description else 0} chars")
+
+   if full_description and len(full_description) > len(short_description):
+       description = full_description
+       print(f"✅ JOB {i+1}: Using FULL description from {item['link']}")
+   else:
+       description = short_description
+       print(f"⚠️ JOB {i+1}: Using SHORT description from API")
+   print(f"  - Final length: {len(description)} chars")
+   print("=" * 100)
+   
+   # Basic description cleanup
+   description = html.unescape(description)
+   description = description.replace('\n', ' ').replace('\r', ' ')
+   
+   print(f"✅ Processed job {i+1}: {item['title']} at {item['company']}")
+   return {
+       'title': item['title'],
+       'company': item['company'],
+       'location': item['location'],
+       'link': item['link'],
+       'description': description,
+       'formatted_description': description
+   }
+
+
+def iter_jobs(title, location, max_jobs=10, seniority=None, region="US", dedup=None, exclude_links=None):
+   """
+   Yield CareerJet jobs as soon as each full description is ready.
+
+   Walks API pages of up to PAGE_SIZE results until ``max_jobs`` jobs have
+   been yielded or the results run out. Page N+1 is requested in the
+   background while page N's descriptions are being fetched, and jobs are
+   yielded in API order. Postings whose URL repeats, that another source
+   already put in ``dedup`` (the fan-out's shared DedupIndex; a fresh one
+   per call by default), or whose job_key is in ``exclude_links`` (postings
+   seen by an earlier run of a saved search) are skipped before their
+   description is fetched. Within CareerJet's own results only the URL
+   counts, so several same-title openings at one company are all kept.
+   A failure on the first page raises CareerJetAPIError; a failure on a
+   later page just ends the stream.
+   """
+   params = _build_search_params(title, location, max_jobs, seniority, region)
+   pagesize = params['pagesize']
+   # One spare page so postings dropped as duplicates can be made up
+   max_pages = (math.ceil(max_jobs / pagesize) if pagesize else 1) + 1
+   dedup = DedupIndex() if dedup is None else dedup
+
+   page_fetcher = ThreadPoolExecutor(max_workers=1)
+   description_pool = ThreadPoolExecutor(max_workers=max(1, min(DESCRIPTION_WORKERS, max_jobs)))
+   try:
+       page = 1
+       yielded = 0
+       next_page = page_fetcher.submit(_fetch_search_page, params, page, location)
+       while next_page is not None:
+           try:
+               data = next_page.result()
+           except Exception as e:
+               if page == 1:
+                   raise
+               print(f"⚠️ CareerJet page {page} failed, stopping pagination: {e}")
+               break
+
+           # STEP 2: Resolve URLs and drop duplicates before any description is fetched
+           jobs_data = data.get('jobs', [])
+           items = []
+           for job in jobs_data:
+               if yielded + len(items) >= max_jobs:
+                   break
+               item = _resolve_job(job, yielded + len(items), location, region)
+               if exclude_links and job_key(item['link']) in exclude_links:
+                   print(f"⏭️ Already seen in a previous run: {item['title']} at {item['company']}")
+                   continue
+               reason = dedup.add(item, source="careerjet")
+               if reason:
+                   print(f"♻️ Skipping duplicate CareerJet job ({reason}): {item['title']} at {item['company']}")
+                   continue
+               items.append(item)
+
+           total_pages = data.get('pages') or page
+           has_more = (
+               len(jobs_data) >= pagesize and
+               page < min(max_pages, total_pages) and
+               yielded + len(items) < max_jobs
+           )
+           next_page = page_fetcher.submit(_fetch_search_page, params, page + 1, location) if has_more else None
+
+           # STEP 3: Fetch full descriptions concurrently
+           futures = [
+               description_pool.submit(
+                   extract_full_careerjet_description, item['link'],
+                   {'title': item['title'], 'company': item['company'], 'location': item['location']})
+               for item in items
+           ]
+
+           # STEP 4: Yield in API order as descriptions complete
+           for item, future in zip(items, futures):
+               yield _format_job(item, future.result())
+               yielded += 1
+           page += 1
+   finally:
+       page_fetcher.shutdown(wait=False, cancel_futures=True)
+       description_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US", exclude_links=None, progress=None,
+               dedup=None):
    """
    Enhanced CareerJet API: Get URLs from API, then extract full descriptions
    """
@@ -63,259 +408,20 @@ def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US"):
    print(f"  - region: '{region}'")
    
    try:
-       # STEP 1: Get job URLs from CareerJet API (your existing code)
-       api_url = "http://public.api.careerjet.net/search"
-       
-       # Enhanced regional mapping for CareerJet
-       region_mapping = {
-           "US": "en_US",
-           "UK": "en_GB", 
-           "CA": "en_CA",
-           "AU": "en_AU",
-           "DE": "de_DE",
-           "SG": "en_SG",
-           "IN": "en_IN"
-       }
-
-       locale_code = region_mapping.get(region, "en_US")  # Default to US
-       print(f"🌍 Using CareerJet locale: {locale_code} for region: {region}")        
-       
-       # API parameters
-       params = {
-           'keywords': title,
-           'location': location,
-           'affid': 'dbeb46864e3514ee44146b52e98c7e8e',
-           'user_ip': '127.0.0.1',
-           'user_agent': 'FindMeAJob/1.0',
-           'locale_code': locale_code,
-           'pagesize': min(max_jobs, 20),
-           'page': 1
-       }
-       
-       # Add seniority filtering if specified
-       if seniority:
-           seniority_mapping = {
-               'intern': 'internship',
-               'junior': 'entry level',
-               'analyst': 'entry level',
-               'associate': 'experienced', 
-               'avp': 'experienced',
-               'vp': 'manager',
-               'svp': 'executive',
-               'director': 'executive',
-               'md': 'executive',
-               'csuite': 'executive'
-           }
-           mapped_seniority = seniority_mapping.get(seniority, '')
-           if mapped_seniority:
-               params['keywords'] = f"{title} {mapped_seniority}"
-               print(f"🎯 Applied seniority filter: {mapped_seniority}")
-       
-       print(f"🔍 API Request params: {params}")
-       
-       # Make API request
-       response = requests.get(api_url, params=params, timeout=30)
-       print(f"🔍 API Response status: {response.status_code}")
-       
-       if response.status_code != 200:
-           print(f"❌ API Error: Status {response.status_code}")
-           return [{
-               "error_type": "api_error",
-               "title": "CareerJet API Error",
-               "company": "Error",
-               "location": location,
-               "link": "#",
-               "description": f"CareerJet API returned status {response.status_code}. Please try again later.",
-               "formatted_description": f"CareerJet API returned status {response.status_code}. Please try again later."
-           }]
-       
-       # Parse JSON response
-       try:
-           data = response.json()
-           # STEP 1 DEBUG: Save raw API response
-           print("🔍 STEP 1 DEBUG: Raw API response structure")
-           print(f"Response keys: {data.keys()}")
-           print(f"Response type field: {data.get('type', 'NO_TYPE_FIELD')}")
-           print(f"Number of jobs: {len(data.get('jobs', []))}")
-
-           # Save first job for analysis
-           if data.get('jobs'):
-               first_job = data.get('jobs')[0]
-               print("🔍 STEP 1 DEBUG: First job structure:")
-               for key, value in first_job.items():
-                   print(f"  {key}: {str(value)[:100]}...")
-
-               # Output JSON directly to logs instead of file
-               import json
-               print("🔍 FULL API RESPONSE:")
-               print(json.dumps(data, indent=2))
-               print("🔍 END OF API RESPONSE")
-           
-       except Exception as e:
-           print(f"❌ JSON Parse Error: {e}")
-           return [{
-               "error_type": "json_error", 
-               "title": "API Response Error",
-               "company": "Error",
-               "location": location,
-               "link": "#",
-               "description": "Could not parse CareerJet API response. Please try again later.",
-               "formatted_description": "Could not parse CareerJet API response. Please try again later."
-           }]
-       
-       # CRITICAL DEBUG: What is the API actually returning?
-       print("🚨 CRITICAL DEBUG: Full API response analysis:")
-       print(f"🚨 Response type: {type(data)}")
-       print(f"🚨 Response keys: {list(data.keys()) if isinstance(data, dict) else 'Not a dict'}")
-       print(f"🚨 'type' field value: '{data.get('type', 'NO_TYPE_FIELD')}'")
-       print(f"🚨 Raw response preview: {str(data)[:500]}...")
-       
-       
-       # Check for API errors
-       if data.get('type') == 'JOBS':
-           jobs_data = data.get('jobs', [])
-           print(f"🔍 Found {len(jobs_data)} jobs from CareerJet API")
-           # DEBUG: Print ALL job descriptions and their lengths
-           for idx, job in enumerate(jobs_data):
-               desc = job.get('description', '')
-               print(f"🔍 JOB {idx+1} API DESC LENGTH: {len(desc)} chars")
-               print(f"🔍 JOB {idx+1} API DESC: {desc}")
-               print("=" * 80)
-       else:
-           print(f"❌ API Error: {data.get('type', 'Unknown error')}")
-           return [{
-               "error_type": "api_response_error",
-               "title": "No Jobs Found",
-               "company": "CareerJet",
-               "location": location, 
-               "link": "#",
-               "description": f"CareerJet API error: {data.get('type', 'Unknown error')}",
-               "formatted_description": f"CareerJet API error: {data.get('type', 'Unknown error')}"
-           }]
-       
-       # STEP 2: Extract full descriptions (NEW PART)
+       if progress:
+           progress("search")
        job_results = []
-       for i, job in enumerate(jobs_data):
-           if len(job_results) >= max_jobs:
-               break
-               
-           # Get basic job data from API
-           job_title = job.get('title', '[Not Found]').strip()
-           company = job.get('company', '[Not Found]').strip()
-           job_location = job.get('locations', location).strip()
-           raw_job_url = job.get('url', '#')
-           short_description = job.get('description', 'No description available').strip()
-
-           # DEBUG: Check what CareerJet API actually returns
-           print(f"🔍 CAREERJET DEBUG - Job {i+1}: {job_title}")
-           print(f"🔍 SHORT DESC LENGTH: {len(short_description)} chars")
-           print(f"🔍 SHORT DESC PREVIEW: {short_description[:200]}...")
-           print(f"🔍 ALL JOB FIELDS: {list(job.keys())}")
-           
-
-           # Extract job ID from tracking URL to get actual job page
-           if 'jobviewtrack.com' in raw_job_url:
-               import re
-               # Extract the 32-character job ID from the URL
-               job_id_match = re.search(r'/([a-f0-9]{32})\.html', raw_job_url)
-               
-               if job_id_match:
-                   job_id = job_id_match.group(1)
-                   region_urls = {
-                       "US": "https://www.careerjet.com",
-                       "UK": "https://www.careerjet.co.uk",
-                       "CA": "https://www.careerjet.ca", 
-                       "AU": "https://www.careerjet.com.au",
-                       "DE": "https://www.careerjet.de",
-                       "SG": "https://www.careerjet.sg"
-                   }
-                   base_url = region_urls.get(region, "https://www.careerjet.com")
-                   job_url = f"{base_url}/jobad/us{job_id}"
-                   print(f"🔄 Extracted job URL: {job_url}")
-               else:
-                   print(f"❌ Could not extract job ID from: {raw_job_url}")
-                   # Fallback to search URL
-                   safe_title = job_title.replace(' ', '+').replace(',', '')
-                   safe_location = job_location.replace(' ', '+').replace(',', '')
-                   region_urls = {
-                       "US": "https://www.careerjet.com",
-                       "UK": "https://www.careerjet.co.uk",
-                       "CA": "https://www.careerjet.ca", 
-                       "AU": "https://www.careerjet.com.au",
-                       "DE": "https://www.careerjet.de",
-                       "SG": "https://www.careerjet.sg",
-                       "IN": "https://www.careerjet.co.in"
-                   }
-                   base_url = region_urls.get(region, "https://www.careerjet.com")
-                   job_url = f"{base_url}/jobs?s={safe_title}&l={safe_location}"
-           else:
-               job_url = raw_job_url
-
-           print(f"🔍 STEP 2 DEBUG: Processing job {i+1}")
-           print(f"  Raw URL from API: {job.get('url', 'NO_URL')}")
-           print(f"  URL type: {type(job.get('url'))}")
-           print(f"  URL length: {len(str(job.get('url', '')))}")
-           print(f"  Contains 'clk/': {'clk/' in str(job.get('url', ''))}")
-           print(f"  Contains 'jobviewtrack': {'jobviewtrack' in str(job.get('url', ''))}")    
-
-           # ADD THIS NEW DEBUG BLOCK HERE:
-           print(f"🔍 JOB URL DEBUG for job {i+1}:")
-           print(f"  ALL job fields: {list(job.keys())}")
-           print(f"  'url' field: {job.get('url', 'NOT_FOUND')}")
-           print(f"  'site' field: {job.get('site', 'NOT_FOUND')}")
-           print(f"  'company_url' field: {job.get('company_url', 'NOT_FOUND')}")
-           print(f"  'redirect_url' field: {job.get('redirect_url', 'NOT_FOUND')}")            
-           
-           print(f"🔍 Processing job {i+1}: {job_title}")
-           print(f"🔍 Short description length: {len(short_description)} chars")
-           
-           # STEP 3: Get full description from individual job page
-           full_description = extract_full_careerjet_description(job_url)
-
-           # Use full description if available, otherwise use short one
-           print(f"🔍 DESCRIPTION COMPARISON FOR JOB {i+1}:")
-           print(f"  - Original API URL: {raw_job_url}")
-           print(f"  - Converted URL: {job_url}")
-           print(f"  - Short desc: {len(short_description)} chars")
-           print(f"  - Full desc: {len(full_description) if full_description else 0} chars")
-           print(f"  - Short desc preview: {short_description[:100]}...")
-           if full_description:
-               print(f"  - Full desc preview: {full_description[:100]}...")
-
-           if full_description and len(full_description) > len(short_description):
-               description = full_description
-               print(f"✅ JOB {i+1}: Using FULL description from {job_url}")
-               print(f"✅ JOB {i+1}: Final length: {len(description)} chars")
-           else:
-               description = short_description
-               print(f"⚠️ JOB {i+1}: Using SHORT description from API")
-               print(f"⚠️ JOB {i+1}: Final length: {len(description)} chars")
-
-           print("=" * 100)
-           
-           
-           # Basic description cleanup
-           import html
-           description = html.unescape(description)
-           description = description.replace('\n', ' ').replace('\r', ' ')
-           
-           formatted_job = {
-               'title': job_title,
-               'company': company,
-               'location': job_location,
-               'link': job_url,
-               'description': description,
-               'formatted_description': description
-           }
-           
-           job_results.append(formatted_job)
-           print(f"✅ Processed job {i+1}: {job_title} at {company}")
-           
-           # Add delay to be respectful
-           time.sleep(2)
-       
+       for job in iter_jobs(title, location, max_jobs, seniority=seniority, region=region,
+                            exclude_links=exclude_links, dedup=dedup):
+           job_results.append(job)
+           if progress:
+               progress("job", job=job)
+               progress("details", done=len(job_results), total=max_jobs)
        print(f"🎯 FINAL RESULT: Successfully retrieved {len(job_results)} jobs from CareerJet")
        return job_results
+
+   except CareerJetAPIError as e:
+       return [e.error_job]
        
    except Exception as e:
        print(f"❌ GENERAL ERROR: {e}")
@@ -351,9 +457,6 @@ def test_url_patterns():
        except Exception as e:
            print(f"❌ {url}: ERROR {e}")
 
-# Run this test
-test_url_patterns()
-
 # Test function
 if __name__ == "__main__":
    jobs = scrape_jobs("Risk Manager", "New York", 3)
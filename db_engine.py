@@ -0,0 +1,25 @@
+"""The process-wide SQLAlchemy engine.
+
+app.py, the job detail cache and the result store all talk to the same
+Postgres database, so they share one engine and one connection pool rather
+than each opening their own.
+"""
+import os
+import threading
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Engine for ``DATABASE_URL``, or None when no database is configured."""
+    global _engine
+    if _engine is None:
+        database_url = os.environ.get("DATABASE_URL")
+        if not database_url:
+            return None
+        with _engine_lock:
+            if _engine is None:
+                from sqlalchemy import create_engine
+                _engine = create_engine(database_url, pool_pre_ping=True)
+    return _engine
@@ -0,0 +1,256 @@
+"""Outgoing email: pooled SMTP connections and a background send queue.
+
+``SmtpPool`` keeps logged-in SMTP connections open between messages, so a
+scheduled run pays the TLS and AUTH handshake once per connection instead of
+once per email. Port 465 uses implicit TLS (``SMTP_SSL``); other ports use
+STARTTLS. A connection the server has dropped is replaced transparently.
+
+``Mailer.send_now`` sends synchronously. ``Mailer.batch()`` collects
+messages (from any thread) and, when the ``with`` block ends (even with an
+error), merges the ones going to the same recipient into a single email
+carrying all their attachments before handing them to the background
+outbox. The outbox retries failed sends with exponential backoff and
+reports the final outcome through each message's ``on_sent`` /
+``on_failed`` callbacks; ``batch.outcomes`` counts them as they land.
+"""
+import heapq
+import itertools
+import logging
+import os
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from email.message import EmailMessage
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.environ.get("SMTP_POOL_SIZE", "2"))
+IDLE_TIMEOUT = float(os.environ.get("SMTP_IDLE_TIMEOUT", "240"))
+MAX_ATTEMPTS = int(os.environ.get("EMAIL_MAX_ATTEMPTS", "4"))
+RETRY_BACKOFF = float(os.environ.get("EMAIL_RETRY_BACKOFF", "30"))
+
+_RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+class SmtpPool:
+    def __init__(self, server, port, username, password, size=POOL_SIZE, idle_timeout=IDLE_TIMEOUT,
+                 timeout=30, smtp_factory=None):
+        self.server = server
+        self.port = int(port)
+        self.username = username
+        self.password = password
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.smtp_factory = smtp_factory
+        self._idle = []  # [(connection, last_used)]
+        self._slots = threading.BoundedSemaphore(max(1, size))
+        self._lock = threading.Lock()
+        self.counters = {"connections": 0, "sent": 0, "reconnects": 0}
+
+    def _connect(self):
+        if self.smtp_factory:
+            connection = self.smtp_factory()
+        elif self.port == 465:
+            connection = smtplib.SMTP_SSL(self.server, self.port, timeout=self.timeout)
+        else:
+            connection = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+            connection.starttls()
+        connection.login(self.username, self.password)
+        with self._lock:
+            self.counters["connections"] += 1
+        logger.info(f"📨 SMTP: opened connection to {self.server}:{self.port}")
+        return connection
+
+    def _checkout(self):
+        with self._lock:
+            while self._idle:
+                connection, last_used = self._idle.pop()
+                if time.monotonic() - last_used < self.idle_timeout:
+                    return connection, True
+                _quit(connection)
+        return self._connect(), False
+
+    def send(self, msg):
+        with self._slots:
+            connection, reused = self._checkout()
+            try:
+                connection.send_message(msg)
+            except _RECONNECT_ERRORS:
+                _quit(connection)
+                if not reused:
+                    raise
+                # The server closed an idle connection; one fresh attempt
+                with self._lock:
+                    self.counters["reconnects"] += 1
+                connection = self._connect()
+                try:
+                    connection.send_message(msg)
+                except Exception:
+                    _quit(connection)
+                    raise
+            except Exception:
+                _quit(connection)
+                raise
+            with self._lock:
+                self.counters["sent"] += 1
+                self._idle.append((connection, time.monotonic()))
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            _quit(connection)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, idle=len(self._idle))
+
+
+def _quit(connection):
+    try:
+        connection.quit()
+    except Exception:
+        pass
+
+
+class _Batch:
+    def __init__(self):
+        self.items = []
+        self.outcomes = {"queued": 0, "sent": 0, "failed": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, outcome):
+        with self._lock:
+            self.outcomes[outcome] += 1
+
+    def add(self, to, subject, body, attachments=(), on_sent=None, on_failed=None):
+        with self._lock:
+            self.items.append({"to": to, "subject": subject, "body": body, "attachments": list(attachments),
+                               "on_sent": [on_sent] if on_sent else [],
+                               "on_failed": [on_failed] if on_failed else []})
+
+
+def merge_by_recipient(items):
+    """One item per recipient; several become a digest with every attachment."""
+    by_recipient = {}
+    for item in items:
+        by_recipient.setdefault(item["to"], []).append(item)
+    merged = []
+    for to, group in by_recipient.items():
+        if len(group) == 1:
+            merged.append(group[0])
+            continue
+        merged.append({
+            "to": to,
+            "subject": f"Your scheduled job searches: {len(group)} results",
+            "body": "\n\n".join(item["body"] for item in group),
+            "attachments": [path for item in group for path in item["attachments"]],
+            "on_sent": [callback for item in group for callback in item["on_sent"]],
+            "on_failed": [callback for item in group for callback in item["on_failed"]],
+        })
+    return merged
+
+
+class Mailer:
+    def __init__(self, pool, from_header, max_attempts=MAX_ATTEMPTS, backoff=RETRY_BACKOFF):
+        self.pool = pool
+        self.from_header = from_header
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._queue = []  # heap of (due, seq, attempt, item)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._thread = None
+
+    def build_message(self, to, subject, body, attachments=()):
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = self.from_header
+        msg["To"] = to
+        msg.set_content(body)
+        for path in attachments:
+            with open(path, "rb") as f:
+                msg.add_attachment(f.read(), maintype="application", subtype="octet-stream",
+                                   filename=os.path.basename(path))
+        return msg
+
+    def send_now(self, to, subject, body, attachments=()):
+        self.pool.send(self.build_message(to, subject, body, attachments))
+
+    # ── background outbox ──────────────────────────────────────────────────
+
+    def enqueue(self, item, delay=0):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+                self._thread.start()
+            heapq.heappush(self._queue, (time.monotonic() + delay, next(self._seq), item.get("attempt", 0), item))
+            self._cond.notify()
+
+    @contextmanager
+    def batch(self):
+        """Collect messages; on exit queue one (merged) email per recipient."""
+        batch = _Batch()
+        try:
+            yield batch
+        finally:
+            # Messages added before an error still describe work that was done
+            merged = merge_by_recipient(batch.items)
+            if len(merged) < len(batch.items):
+                logger.info(f"📨 Outbox: merged {len(batch.items)} emails into {len(merged)}")
+            batch.outcomes["queued"] = len(merged)
+            for item in merged:
+                item["on_sent"] = item["on_sent"] + [lambda: batch._count("sent")]
+                item["on_failed"] = item["on_failed"] + [lambda: batch._count("failed")]
+                self.enqueue(item)
+
+    def flush(self, timeout=None):
+        """Wait until the outbox is empty; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue or self._queue[0][0] > time.monotonic():
+                    self._cond.wait(None if not self._queue else self._queue[0][0] - time.monotonic())
+                _, _, attempt, item = heapq.heappop(self._queue)
+                self._in_flight += 1
+            try:
+                self._deliver(item, attempt + 1)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def _deliver(self, item, attempt):
+        try:
+            self.send_now(item["to"], item["subject"], item["body"], item["attachments"])
+        except Exception as e:
+            if attempt < self.max_attempts:
+                delay = self.backoff * 2 ** (attempt - 1)
+                logger.info(f"🔁 Email to {item['to']} failed (attempt {attempt}/{self.max_attempts}): {e}; "
+                            f"retrying in {delay:.0f}s")
+                self.enqueue(dict(item, attempt=attempt), delay)
+                return
+            logger.error(f"❌ Giving up on email to {item['to']} after {attempt} attempts: {e}")
+            _run_callbacks(item["on_failed"], item["to"])
+            return
+        logger.info(f"✅ Email sent to {item['to']} with {len(item['attachments'])} attachment(s)")
+        _run_callbacks(item["on_sent"], item["to"])
+
+
+def _run_callbacks(callbacks, to):
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            logger.info(f"⚠️ Email callback failed for {to}: {e}")
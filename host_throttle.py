@@ -0,0 +1,28 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class HostThrottle:
+    """Per-host politeness budget shared by concurrent fetchers.
+
+    Each call to ``wait(url)`` reserves the next free slot for that URL's host
+    and sleeps until it arrives, so requests to one host are spaced at least
+    ``min_interval`` seconds apart no matter how many workers are running.
+    """
+
+    def __init__(self, min_interval=1.0):
+        self.min_interval = float(min_interval)
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
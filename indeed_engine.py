@@ -0,0 +1,281 @@
+"""Shared asyncio engine for the Indeed scrapers.
+
+One nodriver browser lives on a dedicated event-loop thread for the lifetime
+of the process. Each search runs the Indeed search flow in its own tab and
+then fetches job detail pages in several tabs at once, so concurrent searches
+share one browser instead of each launching their own. The number of open
+tabs across all searches is capped by ``INDEED_MAX_TABS``.
+
+Async callers consume ``IndeedEngine.iter_jobs`` directly on the engine loop;
+Flask routes and the scheduler use the blocking ``scrape_jobs`` wrapper.
+"""
+import asyncio
+import atexit
+import logging
+import os
+import threading
+
+from job_cache import get_job_cache
+from job_dedup import job_key, unique_links
+from nodriver_indeed_scraper import (
+    JobCollectionError,
+    collect_job_links,
+    extract_job_details,
+    launch_browser,
+    open_tab,
+)
+
+logger = logging.getLogger(__name__)
+
+MAX_TABS = int(os.environ.get("INDEED_MAX_TABS", "4"))
+MAX_SEARCHES = int(os.environ.get("INDEED_MAX_SEARCHES", "2"))
+DETAIL_WORKERS = int(os.environ.get("INDEED_DETAIL_WORKERS", "3"))
+SEARCH_TIMEOUT = int(os.environ.get("INDEED_SEARCH_TIMEOUT", "600"))
+
+
+def _is_valid_job(job):
+    return not (
+        job["title"] == "[Not Found]" or
+        job["location"] == "[Not Found]" or
+        job["description"] == "[Not Found]"
+    )
+
+
+def _missing_job(url):
+    return {"title": "[Not Found]", "company": "[Not Found]", "location": "[Not Found]",
+            "link": url, "description": "[Not Found]"}
+
+
+def _error_job(error_type, title, location, message):
+    return {
+        "error_type": error_type,
+        "title": title,
+        "company": "Error",
+        "location": location,
+        "link": "#",
+        "description": message,
+        "formatted_description": message,
+    }
+
+
+async def _close_tab(tab):
+    try:
+        await tab.close()
+    except Exception as e:
+        logger.info(f"⚠️ Tab close error (non-critical): {e}")
+
+
+async def _stop_browser(browser):
+    try:
+        result = browser.stop()
+        if asyncio.iscoroutine(result):
+            await result
+    except Exception as e:
+        logger.info(f"Browser cleanup error (non-critical): {e}")
+
+
+class IndeedEngine:
+    def __init__(self, headless=True, max_tabs=MAX_TABS, max_searches=MAX_SEARCHES,
+                 detail_workers=DETAIL_WORKERS):
+        self.headless = headless
+        self.detail_workers = max(1, detail_workers)
+        self._browser = None
+        self._loop = None
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        # asyncio primitives bind to the engine loop on first use
+        self._browser_lock = asyncio.Lock()
+        self._tab_slots = asyncio.Semaphore(max(1, max_tabs))
+        self._search_slots = asyncio.Semaphore(max(1, max_searches))
+
+    # ── Event loop thread ──────────────────────────────────────────────────
+
+    def _ensure_loop(self):
+        with self._thread_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._run_loop, name="indeed-engine", daemon=True)
+                self._thread.start()
+        return self._loop
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule ``coro`` on the engine loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    # ── Browser lifecycle ──────────────────────────────────────────────────
+
+    async def _get_browser(self):
+        async with self._browser_lock:
+            if self._browser is None or getattr(self._browser, "stopped", False):
+                self._browser = await launch_browser(self.headless)
+            return self._browser
+
+    async def _discard_browser(self, browser):
+        """Drop ``browser`` if it is still the shared one, so the next search relaunches."""
+        async with self._browser_lock:
+            if self._browser is not browser:
+                return
+            self._browser = None
+        await _stop_browser(browser)
+
+    async def _browser_alive(self, browser):
+        if getattr(browser, "stopped", False):
+            return False
+        try:
+            await asyncio.wait_for(browser.update_targets(), timeout=10)
+            return True
+        except Exception:
+            return False
+
+    async def _shutdown(self):
+        async with self._browser_lock:
+            browser, self._browser = self._browser, None
+        if browser is not None:
+            await _stop_browser(browser)
+
+    def close(self):
+        if self._loop is None:
+            return
+        try:
+            self.submit(self._shutdown()).result(timeout=15)
+        except Exception as e:
+            logger.info(f"Browser cleanup error (non-critical): {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    # ── Scraping ───────────────────────────────────────────────────────────
+
+    async def _fetch_detail(self, browser, url, cache):
+        cached = await asyncio.to_thread(cache.lookup, url)
+        if cached and cached["fresh"]:
+            print(f"💾 Cache hit: {url}")
+            return {field: cached[field] for field in ("title", "company", "location", "description")} | {"link": url}
+        async with self._tab_slots:
+            tab = await open_tab(browser)
+            try:
+                job = await extract_job_details(tab, url)
+            finally:
+                await _close_tab(tab)
+        if _is_valid_job(job):
+            await asyncio.to_thread(cache.store, url, job)
+        return job
+
+    async def iter_jobs(self, title, location, max_jobs=10, seniority=None, exclude_links=None, progress=None):
+        """Async generator of valid Indeed job dicts, in search-result order.
+
+        Detail pages are fetched by ``detail_workers`` tasks in parallel tabs;
+        jobs are yielded as soon as every earlier link has resolved, and the
+        remaining fetches are cancelled once ``max_jobs`` jobs have been yielded.
+        Links whose job_key is in ``exclude_links`` are never fetched.
+        ``progress`` is called on the engine loop with stage updates.
+        Must run on the engine loop (see ``submit``). Raises
+        ``JobCollectionError`` when the results page cannot be read.
+        """
+        browser = await self._get_browser()
+        async with self._search_slots:
+            async with self._tab_slots:
+                if progress:
+                    progress("search")
+                search_tab = await open_tab(browser)
+                try:
+                    job_links = await collect_job_links(search_tab, title, location, seniority)
+                finally:
+                    await _close_tab(search_tab)
+
+        job_links = unique_links(job_links)
+        if exclude_links:
+            job_links = [link for link in job_links if job_key(link) not in exclude_links]
+        if not job_links:
+            return
+        if progress:
+            progress("links", total=len(job_links))
+        workers = min(self.detail_workers, len(job_links))
+        print(f"🚀 Fetching {len(job_links)} Indeed job details in {workers} tab(s)")
+
+        cache = get_job_cache()
+        loop = asyncio.get_running_loop()
+        slots = [loop.create_future() for _ in job_links]
+        pending = iter(range(len(job_links)))
+
+        async def worker():
+            for index in pending:
+                url = job_links[index]
+                try:
+                    job = await self._fetch_detail(browser, url, cache)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"⚠️ Error extracting job {index + 1}: {e}")
+                    job = _missing_job(url)
+                slots[index].set_result(job)
+
+        tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+        collected = 0
+        try:
+            for slot in slots:
+                job = await slot
+                if not _is_valid_job(job):
+                    print("⛔ Skipping invalid job.")
+                    continue
+                collected += 1
+                print(f"✅ Collected: {collected} / {max_jobs}")
+                if progress:
+                    progress("job", job=job)
+                    progress("details", done=collected, total=min(max_jobs, len(job_links)))
+                yield job
+                if collected >= max_jobs:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def collect(self, title, location, max_jobs=10, seniority=None, exclude_links=None, progress=None):
+        """Drain ``iter_jobs`` into a list, mapping failures to the scraper error dicts."""
+        browser = None
+        try:
+            browser = await self._get_browser()
+            return [job async for job in self.iter_jobs(title, location, max_jobs, seniority, exclude_links, progress)]
+        except JobCollectionError as e:
+            return [_error_job("collection_failed", "Job Collection Failed", location, str(e))]
+        except Exception as e:
+            print(f"❌ GENERAL ERROR: {e}")
+            print(f"❌ ERROR TYPE: {type(e).__name__}")
+            if browser is not None and not await self._browser_alive(browser):
+                print("♻️ Indeed browser is unresponsive, relaunching on next search")
+                await self._discard_browser(browser)
+            return [_error_job("general", "Nodriver Error", location, f"Nodriver failed: {str(e)[:200]}...")]
+
+    def scrape_jobs(self, title, location, max_jobs=10, seniority=None, exclude_links=None, progress=None,
+                    timeout=SEARCH_TIMEOUT):
+        """Blocking entry point for threads outside the engine loop."""
+        future = self.submit(self.collect(title, location, max_jobs, seniority, exclude_links, progress))
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            print(f"❌ TIMEOUT ERROR: Indeed search exceeded {timeout}s")
+            return [_error_job("timeout", "Search Timeout", location,
+                               "The job site is taking longer than usual to respond. Please try again with fewer results (5-10 jobs) or try a different location.")]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_indeed_engine(headless=True):
+    """Process-wide Indeed engine; the first caller's ``headless`` setting wins."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = IndeedEngine(headless=headless)
+                atexit.register(_engine.close)
+    return _engine
+
+
+def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US", exclude_links=None, progress=None):
+    return get_indeed_engine().scrape_jobs(title, location, max_jobs, seniority, exclude_links, progress)
@@ -5,12 +5,14 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from bs4 import BeautifulSoup
 from bleach import clean
+import os
 import time
 import random
 import logging
 from selenium.webdriver.chrome.options import Options
 from selenium import webdriver
 from datetime import datetime
+from resource_blocking import apply_to_selenium
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -120,6 +122,16 @@ def extract_job_details(driver, url):
     }
 
 def scrape_jobs(title, location, max_jobs=10, seniority=None, headless=False):
+    """Indeed search through the shared nodriver engine.
+
+    Set INDEED_ENGINE=seleniumbase to fall back to the per-call SeleniumBase flow.
+    """
+    if os.environ.get("INDEED_ENGINE", "nodriver").lower() != "seleniumbase":
+        from indeed_engine import get_indeed_engine
+        return get_indeed_engine().scrape_jobs(title, location, max_jobs, seniority)
+    return scrape_jobs_seleniumbase(title, location, max_jobs, seniority, headless)
+
+def scrape_jobs_seleniumbase(title, location, max_jobs=10, seniority=None, headless=False):
     """Your original logic with SeleniumBase browser initialization"""
     print("🔍 BASIC DEBUG: Function called with parameters:")
     print(f"  - title: '{title}'")
@@ -138,6 +150,7 @@ def scrape_jobs(title, location, max_jobs=10, seniority=None, headless=False):
         with SB(uc=True, headless=True) as sb:
             driver = sb.driver
             logger.info("✅ SeleniumBase UC Mode initialized successfully")
+            apply_to_selenium(driver, "indeed")
 
             # Test connection immediately and handle disconnection
             try:
@@ -0,0 +1,195 @@
+"""Shared cache of scraped job details keyed by canonical job URL.
+
+An in-memory LRU sits in front of a Postgres table (``job_detail_cache``) when
+``DATABASE_URL`` is set, so details fetched by one user's search or by the
+scheduler are reused by every later search. Entries older than
+``JOB_CACHE_TTL_HOURS`` are stale; stale entries that carry an ETag or
+Last-Modified value can be revalidated with a conditional GET instead of a
+full re-scrape.
+"""
+import logging
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from db_engine import get_engine
+from ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "trk", "tracking", "ref", "referrer", "src", "from"}
+
+_FIELDS = ("title", "company", "location", "description")
+
+
+def canonical_job_url(url):
+    """Normalise a job URL so tracking variants of one posting share a key."""
+    if not url:
+        return url
+    parts = urlsplit(url.strip())
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower() or "https", parts.netloc.lower(), path, urlencode(sorted(query)), ""))
+
+
+def conditional_headers(entry):
+    """If-None-Match / If-Modified-Since headers for revalidating ``entry``."""
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def validators_from_response(response):
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+
+class JobDetailCache:
+    def __init__(self, ttl_seconds=24 * 3600, memory_size=2000, engine=None):
+        self.ttl_seconds = ttl_seconds
+        self.engine = engine
+        self._memory = TTLCache(maxsize=memory_size, ttl=0)
+        self._table_ready = False
+        self._table_lock = threading.Lock()
+
+    def lookup(self, url):
+        """Cached entry for ``url`` with a ``fresh`` flag, or None if never seen."""
+        key = canonical_job_url(url)
+        entry = self._memory.get(key)
+        if entry is None:
+            entry = self._db_get(key)
+            if entry is not None:
+                self._memory.set(key, entry)
+        if entry is None:
+            return None
+        result = dict(entry)
+        result["fresh"] = time.time() - entry["fetched_at"] < self.ttl_seconds
+        return result
+
+    def store(self, url, job, etag=None, last_modified=None):
+        key = canonical_job_url(url)
+        entry = {field: job.get(field) or "" for field in _FIELDS}
+        entry.update({"etag": etag, "last_modified": last_modified, "fetched_at": time.time()})
+        self._memory.set(key, entry)
+        self._db_put(key, entry)
+
+    def touch(self, url):
+        """Mark an entry fresh again after a 304 Not Modified."""
+        key = canonical_job_url(url)
+        entry = self._memory.get(key) or self._db_get(key)
+        if entry is None:
+            return
+        entry = dict(entry, fetched_at=time.time())
+        self._memory.set(key, entry)
+        self._db_put(key, entry)
+
+    # ── Postgres backing store ─────────────────────────────────────────────
+
+    def _ensure_table(self):
+        if self._table_ready or self.engine is None:
+            return self.engine is not None
+        from sqlalchemy import text
+        with self._table_lock:
+            if not self._table_ready:
+                with self.engine.connect() as conn:
+                    conn.execute(text("""
+                        CREATE TABLE IF NOT EXISTS job_detail_cache (
+                            canonical_url TEXT PRIMARY KEY,
+                            title TEXT,
+                            company TEXT,
+                            location TEXT,
+                            description TEXT,
+                            etag VARCHAR(255),
+                            last_modified VARCHAR(64),
+                            fetched_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+                        )
+                    """))
+                    # Older tables used a plain TIMESTAMP, holding TO_TIMESTAMP() values in the
+                    # session's time zone; EXTRACT(EPOCH ...) then read them back shifted by its offset
+                    column_type = conn.execute(text("""
+                        SELECT data_type FROM information_schema.columns
+                        WHERE table_name = 'job_detail_cache' AND column_name = 'fetched_at'
+                    """)).scalar()
+                    if column_type == "timestamp without time zone":
+                        conn.execute(text("""
+                            ALTER TABLE job_detail_cache ALTER COLUMN fetched_at TYPE TIMESTAMPTZ
+                            USING fetched_at AT TIME ZONE current_setting('TimeZone')
+                        """))
+                    conn.commit()
+                self._table_ready = True
+        return True
+
+    def _db_get(self, key):
+        try:
+            if not self._ensure_table():
+                return None
+            from sqlalchemy import text
+            with self.engine.connect() as conn:
+                row = conn.execute(text("""
+                    SELECT title, company, location, description, etag, last_modified,
+                           EXTRACT(EPOCH FROM fetched_at)
+                    FROM job_detail_cache WHERE canonical_url = :url
+                """), {"url": key}).fetchone()
+        except Exception as e:
+            logger.info(f"❌ Job cache read error: {e}")
+            return None
+        if row is None:
+            return None
+        return {
+            "title": row[0], "company": row[1], "location": row[2], "description": row[3],
+            "etag": row[4], "last_modified": row[5], "fetched_at": float(row[6]),
+        }
+
+    def _db_put(self, key, entry):
+        try:
+            if not self._ensure_table():
+                return
+            from sqlalchemy import text
+            with self.engine.connect() as conn:
+                conn.execute(text("""
+                    INSERT INTO job_detail_cache
+                        (canonical_url, title, company, location, description, etag, last_modified, fetched_at)
+                    VALUES (:url, :title, :company, :location, :description, :etag, :last_modified,
+                            TO_TIMESTAMP(:fetched_at))
+                    ON CONFLICT (canonical_url) DO UPDATE SET
+                        title = EXCLUDED.title,
+                        company = EXCLUDED.company,
+                        location = EXCLUDED.location,
+                        description = EXCLUDED.description,
+                        etag = EXCLUDED.etag,
+                        last_modified = EXCLUDED.last_modified,
+                        fetched_at = EXCLUDED.fetched_at
+                """), dict(entry, url=key))
+                conn.commit()
+        except Exception as e:
+            logger.info(f"❌ Job cache write error: {e}")
+
+
+_job_cache = None
+_job_cache_lock = threading.Lock()
+
+
+def get_job_cache():
+    """Process-wide job detail cache configured from the environment."""
+    global _job_cache
+    if _job_cache is None:
+        with _job_cache_lock:
+            if _job_cache is None:
+                engine = None
+                if os.environ.get("JOB_CACHE_BACKEND", "postgres") == "postgres":
+                    engine = get_engine()
+                _job_cache = JobDetailCache(
+                    ttl_seconds=float(os.environ.get("JOB_CACHE_TTL_HOURS", "24")) * 3600,
+                    memory_size=int(os.environ.get("JOB_CACHE_MEMORY_SIZE", "2000")),
+                    engine=engine,
+                )
+    return _job_cache
@@ -0,0 +1,189 @@
+"""Cross-source job de-duplication.
+
+The same posting reaches us through several sources with different tracking
+URLs and slightly different title / company strings. ``DedupIndex`` keeps
+three hash-based keys per accepted job so each new job is checked in O(1):
+
+* the posting id or canonical URL (CareerJet ``jobviewtrack.com`` redirects
+  and ``/jobad/`` pages share their 32-hex id, Indeed links share ``jk``)
+* a normalised company + title + location fingerprint
+* a 64-bit SimHash of the description, bucketed in bands so near-identical
+  descriptions (at most ``max_distance`` differing bits) land in a shared
+  bucket
+
+URL and fingerprint checks need no description, so scrapers can drop
+duplicates before paying for a detail fetch.
+"""
+import hashlib
+import re
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+from job_cache import canonical_job_url
+
+_CAREERJET_ID = re.compile(r"(?:jobviewtrack\.com/.*?/|/jobad/[a-z]{2})([a-f0-9]{32})")
+_WORD = re.compile(r"[a-z0-9]+")
+_TAG = re.compile(r"<[^>]+>")
+
+COMPANY_SUFFIXES = {
+    "inc", "llc", "ltd", "limited", "plc", "corp", "corporation", "co", "company",
+    "group", "holdings", "gmbh", "ag", "sa", "lp", "llp", "the",
+}
+TITLE_ABBREVIATIONS = {
+    "sr": "senior", "jr": "junior", "mgr": "manager", "assoc": "associate",
+    "vp": "vice president", "avp": "assistant vice president", "dir": "director",
+}
+MISSING = {"", "[not found]", "not found", "n/a"}
+
+
+def _words(text):
+    return _WORD.findall((text or "").lower())
+
+
+def job_key(url):
+    """Source-independent identity of a job URL."""
+    if not url or url == "#":
+        return None
+    match = _CAREERJET_ID.search(url)
+    if match:
+        return f"careerjet:{match.group(1)}"
+    parts = urlsplit(url)
+    if "indeed." in parts.netloc.lower():
+        jk = parse_qs(parts.query).get("jk") or parse_qs(parts.query).get("vjk")
+        if jk:
+            return f"indeed:{jk[0]}"
+    return canonical_job_url(url)
+
+
+def normalise_company(company):
+    words = [w for w in _words(company) if w not in COMPANY_SUFFIXES]
+    return " ".join(words)
+
+
+def normalise_title(title):
+    # Drop bracketed qualifiers such as "(Hybrid)" or "[Remote]"
+    title = re.sub(r"[(\[].*?[)\]]", " ", title or "")
+    words = []
+    for word in _words(title):
+        words.extend(TITLE_ABBREVIATIONS.get(word, word).split())
+    return " ".join(words)
+
+
+def normalise_location(location):
+    # "New York, NY, United States" and "New York" describe the same posting
+    return " ".join(_words((location or "").split(",")[0]))
+
+
+def fingerprint(job):
+    """company|title|location key, or None when any part is missing."""
+    parts = []
+    for field, normalise in (("company", normalise_company), ("title", normalise_title),
+                             ("location", normalise_location)):
+        raw = (job.get(field) or "").strip()
+        if raw.lower() in MISSING:
+            return None
+        value = normalise(raw)
+        if not value:
+            return None
+        parts.append(value)
+    return "|".join(parts)
+
+
+def simhash(text, bits=64, shingle=3):
+    """SimHash of word shingles; near-duplicate texts differ in few bits."""
+    words = _words(_TAG.sub(" ", text or ""))
+    if len(words) < shingle:
+        return None
+    weights = [0] * bits
+    for i in range(len(words) - shingle + 1):
+        digest = hashlib.blake2b(" ".join(words[i:i + shingle]).encode(), digest_size=bits // 8).digest()
+        value = int.from_bytes(digest, "big")
+        for bit in range(bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(bits) if weights[bit] > 0)
+
+
+class DedupIndex:
+    """Thread-safe index of seen jobs; ``add`` returns the duplicate reason or None.
+
+    Jobs can be tagged with the ``source`` that produced them. A repeated URL
+    is a duplicate whoever reported it, but the company/title/location
+    fingerprint and near-identical descriptions only count across sources:
+    one site listing several "Analyst" openings at the same bank and city
+    keeps them all.
+    """
+
+    def __init__(self, max_distance=3, bands=4, min_description_words=40):
+        # With max_distance < bands, two hashes within range share at least one band
+        self.max_distance = max_distance
+        self.bands = bands
+        self.min_description_words = min_description_words
+        self._urls = set()
+        self._fingerprints = {}  # fingerprint -> {source, ...}
+        self._buckets = {}  # (band, value) -> [(simhash, source), ...]
+        self._lock = threading.Lock()
+        self.dropped = {"url": 0, "fingerprint": 0, "description": 0}
+
+    def _band_keys(self, value):
+        width = 64 // self.bands
+        mask = (1 << width) - 1
+        return [(band, value >> (band * width) & mask) for band in range(self.bands)]
+
+    def _description_hash(self, job):
+        description = job.get("description") or ""
+        if len(_words(description)) < self.min_description_words:
+            return None
+        return simhash(description)
+
+    def _near_duplicate(self, value, source):
+        for key in self._band_keys(value):
+            for other, other_source in self._buckets.get(key, ()):
+                if _other_source(other_source, source) and bin(value ^ other).count("1") <= self.max_distance:
+                    return True
+        return False
+
+    def add(self, job, source=None):
+        """Record ``job``; return "url", "fingerprint" or "description" if it was already seen."""
+        url_key = job_key(job.get("link"))
+        print_key = fingerprint(job)
+        description_hash = self._description_hash(job)
+        with self._lock:
+            reason = None
+            if url_key and url_key in self._urls:
+                reason = "url"
+            elif print_key and any(_other_source(seen, source) for seen in self._fingerprints.get(print_key, ())):
+                reason = "fingerprint"
+            elif description_hash is not None and self._near_duplicate(description_hash, source):
+                reason = "description"
+            if reason:
+                self.dropped[reason] += 1
+                return reason
+            if url_key:
+                self._urls.add(url_key)
+            if print_key:
+                self._fingerprints.setdefault(print_key, set()).add(source)
+            if description_hash is not None:
+                for key in self._band_keys(description_hash):
+                    self._buckets.setdefault(key, []).append((description_hash, source))
+            return None
+
+    def filter(self, jobs, source=None):
+        """Jobs from ``jobs`` not seen before, in order; duplicates are dropped."""
+        return [job for job in jobs if self.add(job, source) is None]
+
+
+def _other_source(seen, source):
+    # Untagged jobs match everything, as before sources were tracked
+    return seen is None or source is None or seen != source
+
+
+def unique_links(links):
+    """``links`` with tracking variants of one posting collapsed, keeping first occurrence."""
+    seen = set()
+    result = []
+    for link in links:
+        key = job_key(link) or link
+        if key not in seen:
+            seen.add(key)
+            result.append(link)
+    return result
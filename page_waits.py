@@ -0,0 +1,159 @@
+"""Readiness conditions for Selenium pages, used instead of fixed sleeps.
+
+Each ``*_condition`` helper returns a callable suitable for
+``WebDriverWait(driver, timeout).until(...)``: it returns a truthy value once
+the page is ready and a falsy one while it is still settling.
+"""
+import time
+from contextlib import contextmanager
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
+
+POLL_FREQUENCY = 0.2
+
+_INSTALL_OBSERVER_JS = """
+if (!window.__fmajObserver) {
+    window.__fmajLastMutation = performance.now();
+    window.__fmajObserver = new MutationObserver(function () {
+        window.__fmajLastMutation = performance.now();
+    });
+    window.__fmajObserver.observe(document.documentElement,
+        {childList: true, subtree: true, attributes: true, characterData: true});
+}
+return true;
+"""
+
+_QUIET_FOR_MS_JS = """
+var entries = performance.getEntriesByType('resource');
+var lastNetwork = 0;
+for (var i = 0; i < entries.length; i++) {
+    var end = entries[i].responseEnd || entries[i].startTime;
+    if (end > lastNetwork) lastNetwork = end;
+}
+var lastMutation = window.__fmajLastMutation || 0;
+return {
+    ready: document.readyState === 'complete',
+    now: performance.now(),
+    lastNetwork: lastNetwork,
+    lastMutation: lastMutation
+};
+"""
+
+
+class StepTimer:
+    """Records how long each named step of a scrape took.
+
+    ``on_step(name)``, if given, is called as each step starts.
+    """
+
+    def __init__(self, label="", on_step=None):
+        self.label = label
+        self.on_step = on_step
+        self.steps = []
+
+    @contextmanager
+    def step(self, name):
+        if self.on_step:
+            self.on_step(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.steps.append((name, elapsed))
+            print(f"⏱️ {self.label}{name}: {elapsed:.2f}s")
+
+    def total(self):
+        return sum(elapsed for _, elapsed in self.steps)
+
+    def summary(self):
+        parts = ", ".join(f"{name}={elapsed:.2f}s" for name, elapsed in self.steps)
+        return f"{self.label}total={self.total():.2f}s ({parts})"
+
+
+def install_mutation_observer(driver):
+    """Start tracking DOM mutations on the current document."""
+    try:
+        driver.execute_script(_INSTALL_OBSERVER_JS)
+    except Exception:
+        pass
+
+
+def page_quiet_condition(quiet_ms=500):
+    """Document loaded and no network responses or DOM mutations for ``quiet_ms``."""
+    def condition(driver):
+        try:
+            state = driver.execute_script(_QUIET_FOR_MS_JS)
+        except Exception:
+            return False
+        if not state or not state.get("ready"):
+            return False
+        last_activity = max(state.get("lastNetwork", 0), state.get("lastMutation", 0))
+        return state["now"] - last_activity >= quiet_ms
+    return condition
+
+
+def count_stable_condition(selector, quiet_seconds=0.75, allow_empty_when=None):
+    """Number of elements matching ``selector`` is non-zero and unchanged for ``quiet_seconds``.
+
+    ``allow_empty_when`` is an optional XPath; if it matches, an empty result
+    set is accepted as final (e.g. a "no jobs found" banner).
+    """
+    state = {"count": None, "since": None}
+
+    def condition(driver):
+        count = len(driver.find_elements(By.CSS_SELECTOR, selector))
+        now = time.monotonic()
+        if count != state["count"]:
+            state["count"], state["since"] = count, now
+            return False
+        if count == 0:
+            return bool(
+                allow_empty_when and now - state["since"] >= quiet_seconds
+                and driver.find_elements(By.XPATH, allow_empty_when)
+            )
+        return count if now - state["since"] >= quiet_seconds else False
+    return condition
+
+
+def snapshot_links(driver, selector):
+    """Hrefs of the elements matching ``selector``, used to detect list changes."""
+    links = []
+    for elem in driver.find_elements(By.CSS_SELECTOR, selector):
+        try:
+            links.append(elem.get_attribute("href"))
+        except Exception:
+            continue
+    return links
+
+
+def list_changed_condition(selector, before):
+    """The hrefs under ``selector`` differ from the ``before`` snapshot."""
+    def condition(driver):
+        try:
+            current = snapshot_links(driver, selector)
+        except Exception:
+            return False
+        return bool(current) and current != before
+    return condition
+
+
+def text_length_condition(selector, min_length):
+    """Element matching ``selector`` has at least ``min_length`` characters of text."""
+    def condition(driver):
+        try:
+            elem = driver.find_element(By.CSS_SELECTOR, selector)
+            return len(elem.text.strip()) >= min_length
+        except Exception:
+            return False
+    return condition
+
+
+def wait_until(driver, condition, timeout, poll=POLL_FREQUENCY):
+    """``WebDriverWait.until`` with a fast poll; returns None instead of raising on timeout."""
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll).until(condition)
+    except TimeoutException:
+        return None
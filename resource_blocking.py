@@ -0,0 +1,99 @@
+"""Shared request-blocking profile for the browser-based scrapers.
+
+Heavy or irrelevant resources (images, media, fonts, analytics, ads) are
+blocked through CDP ``Network.setBlockedURLs``, whose patterns only know the
+``*`` wildcard. The active profile comes from the ``SCRAPER_BLOCK_PROFILE``
+env var ("off", "light", "default") and is the same for every site. CDP has
+no way to exempt single URLs from a blocked pattern, so patterns are anchored
+on a file extension or a host and stay clear of anything a site needs to
+work (e.g. the Cloudflare challenge scripts Indeed serves);
+test_resource_blocking.py checks those still load.
+"""
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+def _extensions(*extensions):
+    """Patterns for URLs whose path ends in one of ``extensions``, with or without a query."""
+    return [pattern for ext in extensions for pattern in (f"*.{ext}", f"*.{ext}?*")]
+
+
+def _hosts(*hosts):
+    """Patterns for requests to ``hosts`` and their subdomains, not URLs that merely mention them."""
+    return [pattern for host in hosts for pattern in (f"*://{host}/*", f"*://*.{host}/*")]
+
+
+BLOCK_CATEGORIES = {
+    "images": _extensions("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico"),
+    "media": _extensions("mp4", "webm", "mp3", "m4a", "ogg", "wav", "m3u8"),
+    "fonts": _extensions("woff", "woff2", "ttf", "otf", "eot") + _hosts("fonts.googleapis.com", "fonts.gstatic.com"),
+    "analytics": _hosts(
+        "google-analytics.com", "googletagmanager.com", "analytics.google.com",
+        "hotjar.com", "clarity.ms", "segment.io", "segment.com", "mixpanel.com",
+        "amplitude.com", "fullstory.com", "newrelic.com", "nr-data.net",
+        "optimizely.com", "bat.bing.com",
+    ),
+    "ads": _hosts(
+        "doubleclick.net", "googlesyndication.com", "googleadservices.com",
+        "adservice.google.com", "connect.facebook.net", "ads.linkedin.com",
+        "criteo.com", "criteo.net", "taboola.com",
+        "outbrain.com", "adnxs.com", "quantserve.com", "scorecardresearch.com",
+    ),
+}
+
+PROFILES = {
+    "off": [],
+    "light": ["images", "media", "fonts"],
+    "default": ["images", "media", "fonts", "analytics", "ads"],
+}
+
+def active_profile():
+    name = os.environ.get("SCRAPER_BLOCK_PROFILE", "default").lower()
+    if name not in PROFILES:
+        logger.info(f"⚠️ Unknown SCRAPER_BLOCK_PROFILE '{name}', using 'default'")
+        name = "default"
+    return name
+
+
+def blocked_patterns(profile=None):
+    """URL patterns to block under ``profile`` (defaults to the env profile)."""
+    profile = profile or active_profile()
+    patterns = []
+    for category in PROFILES.get(profile, []):
+        for pattern in BLOCK_CATEGORIES[category]:
+            if pattern not in patterns:
+                patterns.append(pattern)
+    return patterns
+
+
+def apply_to_selenium(driver, site, profile=None):
+    """Install the blocking profile on a Selenium/SeleniumBase Chrome driver."""
+    patterns = blocked_patterns(profile)
+    if not patterns:
+        return 0
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        logger.info(f"🚫 Blocking {len(patterns)} resource patterns for {site}")
+        return len(patterns)
+    except Exception as e:
+        logger.info(f"⚠️ Could not apply resource blocking for {site}: {e}")
+        return 0
+
+
+async def apply_to_nodriver(tab, site, profile=None):
+    """Install the blocking profile on a nodriver tab."""
+    patterns = blocked_patterns(profile)
+    if not patterns:
+        return 0
+    try:
+        from nodriver import cdp
+        set_blocked = getattr(cdp.network, "set_blocked_ur_ls", None) or getattr(cdp.network, "set_blocked_urls")
+        await tab.send(cdp.network.enable())
+        await tab.send(set_blocked(urls=patterns))
+        logger.info(f"🚫 Blocking {len(patterns)} resource patterns for {site}")
+        return len(patterns)
+    except Exception as e:
+        logger.info(f"⚠️ Could not apply resource blocking for {site}: {e}")
+        return 0
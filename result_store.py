@@ -0,0 +1,269 @@
+"""Per-user store for search results, keyed by a search id.
+
+The results page renders the id into its forms, and ``/download`` reads the
+matching result set back, so concurrent users and multiple gunicorn workers
+never see each other's results. The store also keeps a snapshot of each
+background search's status and progress (``save_search_job``), so whichever
+worker a poll or stream request lands on can answer it. Two backends:
+
+* ``memory``: an in-process LRU capped by entry count and approximate size
+  in bytes (single worker only)
+* ``postgres``: ``search_results`` and ``search_jobs`` tables shared by every
+  worker
+
+``RESULT_STORE_BACKEND`` picks one; it defaults to ``postgres`` when
+``DATABASE_URL`` is set.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from db_engine import get_engine
+
+logger = logging.getLogger(__name__)
+
+
+def new_search_id():
+    return uuid.uuid4().hex
+
+
+class MemoryResultStore:
+    def __init__(self, max_entries=500, max_bytes=64 * 1024 * 1024, ttl_seconds=24 * 3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()  # search_id -> record
+        self._bytes = 0
+        self._jobs = OrderedDict()  # job_id -> (owner, version, state)
+        self._lock = threading.Lock()
+
+    def save(self, owner, results, name="Job_Search", search_id=None, meta=None):
+        search_id = search_id or new_search_id()
+        size = len(json.dumps(results, default=str))
+        record = {"owner": owner, "results": results, "name": name, "meta": meta or {},
+                  "created_at": time.time(), "size": size}
+        with self._lock:
+            old = self._data.pop(search_id, None)
+            if old:
+                self._bytes -= old["size"]
+            self._data[search_id] = record
+            self._bytes += size
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= evicted["size"]
+        return search_id
+
+    def _expired(self, record):
+        return self.ttl_seconds and time.time() - record["created_at"] > self.ttl_seconds
+
+    def get(self, owner, search_id):
+        """Record for ``search_id`` if it belongs to ``owner`` and has not expired."""
+        with self._lock:
+            record = self._data.get(search_id)
+            if record is None or record["owner"] != owner:
+                return None
+            if self._expired(record):
+                self._bytes -= record["size"]
+                del self._data[search_id]
+                return None
+            self._data.move_to_end(search_id)
+            return {"search_id": search_id, "results": record["results"], "name": record["name"],
+                    "meta": record["meta"]}
+
+    def save_search_job(self, owner, job_id, state, version):
+        """Store a background search's state unless a newer ``version`` is already stored."""
+        with self._lock:
+            stored = self._jobs.get(job_id)
+            if stored is None or stored[1] < version:
+                self._jobs[job_id] = (owner, version, state)
+                self._jobs.move_to_end(job_id)
+            while len(self._jobs) > self.max_entries:
+                self._jobs.popitem(last=False)
+        return True
+
+    def get_search_job(self, owner, job_id):
+        with self._lock:
+            stored = self._jobs.get(job_id)
+        if stored is None or stored[0] != owner:
+            return None
+        return stored[2]
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._data), "bytes": self._bytes}
+
+
+class PostgresResultStore:
+    def __init__(self, engine, ttl_seconds=24 * 3600):
+        self.engine = engine
+        self.ttl_seconds = ttl_seconds
+        self._table_ready = False
+        self._table_lock = threading.Lock()
+        self._last_purge = 0
+
+    def _ensure_table(self):
+        if self._table_ready:
+            return
+        from sqlalchemy import text
+        with self._table_lock:
+            if not self._table_ready:
+                with self.engine.connect() as conn:
+                    conn.execute(text("""
+                        CREATE TABLE IF NOT EXISTS search_results (
+                            search_id VARCHAR(32) PRIMARY KEY,
+                            user_id INTEGER,
+                            name VARCHAR(255),
+                            results JSONB NOT NULL,
+                            meta JSONB,
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        )
+                    """))
+                    conn.execute(text("""
+                        ALTER TABLE search_results ADD COLUMN IF NOT EXISTS meta JSONB
+                    """))
+                    conn.execute(text("""
+                        CREATE INDEX IF NOT EXISTS idx_search_results_created_at ON search_results (created_at)
+                    """))
+                    conn.execute(text("""
+                        CREATE TABLE IF NOT EXISTS search_jobs (
+                            job_id VARCHAR(36) PRIMARY KEY,
+                            user_id INTEGER,
+                            version INTEGER NOT NULL,
+                            state JSONB NOT NULL,
+                            updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+                        )
+                    """))
+                    conn.execute(text("""
+                        CREATE INDEX IF NOT EXISTS idx_search_jobs_updated_at ON search_jobs (updated_at)
+                    """))
+                    conn.commit()
+                self._table_ready = True
+
+    def _purge_expired(self, conn):
+        # At most once an hour per worker
+        if not self.ttl_seconds or time.time() - self._last_purge < 3600:
+            return
+        from sqlalchemy import text
+        conn.execute(text("""
+            DELETE FROM search_results WHERE created_at < NOW() - make_interval(secs => :ttl)
+        """), {"ttl": self.ttl_seconds})
+        conn.execute(text("""
+            DELETE FROM search_jobs WHERE updated_at < NOW() - make_interval(secs => :ttl)
+        """), {"ttl": self.ttl_seconds})
+        self._last_purge = time.time()
+
+    def save(self, owner, results, name="Job_Search", search_id=None, meta=None):
+        """Store ``results`` and return their search id, or None if they could not be written."""
+        search_id = search_id or new_search_id()
+        try:
+            self._ensure_table()
+            from sqlalchemy import text
+            with self.engine.connect() as conn:
+                conn.execute(text("""
+                    INSERT INTO search_results (search_id, user_id, name, results, meta)
+                    VALUES (:search_id, :user_id, :name, CAST(:results AS JSONB), CAST(:meta AS JSONB))
+                    ON CONFLICT (search_id) DO UPDATE SET
+                        results = EXCLUDED.results,
+                        name = EXCLUDED.name,
+                        meta = EXCLUDED.meta,
+                        created_at = CURRENT_TIMESTAMP
+                """), {"search_id": search_id, "user_id": owner, "name": name,
+                       "results": json.dumps(results, default=str),
+                       "meta": json.dumps(meta or {}, default=str)})
+                self._purge_expired(conn)
+                conn.commit()
+        except Exception as e:
+            logger.info(f"❌ Result store write error: {e}")
+            return None
+        return search_id
+
+    def get(self, owner, search_id):
+        try:
+            self._ensure_table()
+            from sqlalchemy import text
+            with self.engine.connect() as conn:
+                row = conn.execute(text("""
+                    SELECT results, name, meta FROM search_results
+                    WHERE search_id = :search_id AND user_id IS NOT DISTINCT FROM :user_id
+                      AND (:ttl = 0 OR created_at >= NOW() - make_interval(secs => :ttl))
+                """), {"search_id": search_id, "user_id": owner, "ttl": self.ttl_seconds or 0}).fetchone()
+        except Exception as e:
+            logger.info(f"❌ Result store read error: {e}")
+            return None
+        if row is None:
+            return None
+        results = row[0] if not isinstance(row[0], str) else json.loads(row[0])
+        meta = row[2] if not isinstance(row[2], str) else json.loads(row[2])
+        return {"search_id": search_id, "results": results, "name": row[1], "meta": meta or {}}
+
+    def save_search_job(self, owner, job_id, state, version):
+        """Store a background search's state unless a newer ``version`` is already stored."""
+        try:
+            self._ensure_table()
+            from sqlalchemy import text
+            with self.engine.connect() as conn:
+                conn.execute(text("""
+                    INSERT INTO search_jobs (job_id, user_id, version, state)
+                    VALUES (:job_id, :user_id, :version, CAST(:state AS JSONB))
+                    ON CONFLICT (job_id) DO UPDATE SET
+                        version = EXCLUDED.version,
+                        state = EXCLUDED.state,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE search_jobs.version < EXCLUDED.version
+                """), {"job_id": job_id, "user_id": owner, "version": version,
+                       "state": json.dumps(state, default=str)})
+                conn.commit()
+        except Exception as e:
+            logger.info(f"❌ Search job store write error: {e}")
+            return False
+        return True
+
+    def get_search_job(self, owner, job_id):
+        try:
+            self._ensure_table()
+            from sqlalchemy import text
+            with self.engine.connect() as conn:
+                row = conn.execute(text("""
+                    SELECT state FROM search_jobs
+                    WHERE job_id = :job_id AND user_id IS NOT DISTINCT FROM :user_id
+                """), {"job_id": job_id, "user_id": owner}).fetchone()
+        except Exception as e:
+            logger.info(f"❌ Search job store read error: {e}")
+            return None
+        if row is None:
+            return None
+        return row[0] if not isinstance(row[0], str) else json.loads(row[0])
+
+    def stats(self):
+        return {"backend": "postgres"}
+
+
+_result_store = None
+_result_store_lock = threading.Lock()
+
+
+def get_result_store():
+    """Process-wide result store configured from the environment."""
+    global _result_store
+    if _result_store is None:
+        with _result_store_lock:
+            if _result_store is None:
+                database_url = os.environ.get("DATABASE_URL")
+                backend = os.environ.get("RESULT_STORE_BACKEND", "postgres" if database_url else "memory").lower()
+                ttl_seconds = float(os.environ.get("RESULT_STORE_TTL_HOURS", "24")) * 3600
+                if backend == "postgres" and database_url:
+                    engine = get_engine()
+                    _result_store = PostgresResultStore(engine, ttl_seconds=ttl_seconds)
+                else:
+                    if backend == "postgres":
+                        logger.info("⚠️ RESULT_STORE_BACKEND=postgres but DATABASE_URL is not set, using memory")
+                    _result_store = MemoryResultStore(
+                        max_entries=int(os.environ.get("RESULT_STORE_MAX_ENTRIES", "500")),
+                        max_bytes=int(float(os.environ.get("RESULT_STORE_MAX_MB", "64")) * 1024 * 1024),
+                        ttl_seconds=ttl_seconds,
+                    )
+    return _result_store
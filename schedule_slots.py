@@ -0,0 +1,92 @@
+"""Run slots for scheduled searches.
+
+Instead of every scheduled search firing at 5am, each user gets a fixed slot
+inside a daily window (``SCHEDULE_WINDOW_START_HOUR`` for
+``SCHEDULE_WINDOW_HOURS``). The slot is a stable hash of the user id, so
+load is spread evenly across the window, a search runs at the same time
+every day, and all of one user's searches come due together: their emails
+merge into one per recipient and a digest covers the whole day. Daily
+searches run every day, weekly ones on Mondays and monthly ones on the 1st,
+as before.
+
+A due search shares its scrape with other users' identical searches whose
+slots fall within the next ``SCHEDULE_COALESCE_MINUTES`` (three scheduler
+ticks by default). The horizon is kept short so that coalescing does not
+pull later slots forward and bring back the burst at the window start.
+"""
+import hashlib
+import os
+from datetime import datetime, time, timedelta
+
+WINDOW_START_HOUR = int(os.environ.get("SCHEDULE_WINDOW_START_HOUR", "5"))
+WINDOW_HOURS = float(os.environ.get("SCHEDULE_WINDOW_HOURS", "4"))
+TICK_MINUTES = int(os.environ.get("SCHEDULER_TICK_MINUTES", "5"))
+COALESCE_MINUTES = float(os.environ.get("SCHEDULE_COALESCE_MINUTES", str(3 * TICK_MINUTES)))
+
+SCHEDULES = ("daily", "weekly", "monthly")
+
+
+def slot_offset(slot_key, window_hours=WINDOW_HOURS):
+    """Seconds after the window start at which ``slot_key``'s searches run."""
+    window_seconds = max(int(window_hours * 3600), 1)
+    digest = hashlib.sha1(str(slot_key).encode()).digest()
+    return int.from_bytes(digest[:8], "big") % window_seconds
+
+
+def runs_on(schedule, day):
+    return (
+        (schedule == "daily") or
+        (schedule == "weekly" and day.weekday() == 0) or
+        (schedule == "monthly" and day.day == 1)
+    )
+
+
+def next_run_at(slot_key, schedule, after, start_hour=WINDOW_START_HOUR, window_hours=WINDOW_HOURS):
+    """First slot strictly after ``after`` on a day ``schedule`` runs, or None if unscheduled.
+
+    The result carries ``after``'s tzinfo, so pass an aware datetime when it
+    is stored in a timestamptz column.
+    """
+    if schedule not in SCHEDULES:
+        return None
+    offset = timedelta(seconds=slot_offset(slot_key, window_hours))
+    day = after.date()
+    # A monthly schedule is at most 31 days away
+    for _ in range(32):
+        candidate = datetime.combine(day, time(start_hour), tzinfo=after.tzinfo) + offset
+        if runs_on(schedule, day) and candidate > after:
+            return candidate
+        day += timedelta(days=1)
+    return None
+
+
+def next_run_after(slot_key, schedule, ran_at, slot_at=None, start_hour=WINDOW_START_HOUR, window_hours=WINDOW_HOURS):
+    """Slot that follows a run at ``ran_at`` of the slot ``slot_at``.
+
+    A search coalesced into an earlier query runs before its own slot, so the
+    next slot counts from whichever is later; otherwise it would come due
+    again at its own slot the same day.
+    """
+    after = max(ran_at, slot_at) if slot_at is not None else ran_at
+    return next_run_at(slot_key, schedule, after, start_hour, window_hours)
+
+
+def coalescing_horizon(now, minutes=COALESCE_MINUTES):
+    """Searches due before this may join a query group that is already due now."""
+    return now + timedelta(minutes=minutes)
+
+
+def due_groups(groups, now):
+    """Query groups of searches to run now: those where one search's slot has come up.
+
+    ``groups`` should only hold searches due within ``coalescing_horizon``.
+    A user's searches share one slot, so they come due together without
+    chaining groups through users.
+    """
+    return [group for group in groups if any(search["next_run_at"] <= now for search in group)]
+
+
+def realigned_run_at(slot_key, schedule, current, start_hour=WINDOW_START_HOUR, window_hours=WINDOW_HOURS):
+    """``slot_key``'s slot on the day a stored ``current`` run falls, for moving rows onto a new slot key."""
+    day_start = datetime.combine(current.date(), time(0), tzinfo=current.tzinfo)
+    return next_run_at(slot_key, schedule, day_start - timedelta(microseconds=1), start_hour, window_hours)
@@ -0,0 +1,78 @@
+"""Digest delivery for scheduled searches.
+
+A user who opts into a digest (``users.email_digest``) gets one workbook and
+one email per scheduled run instead of one per saved search. In ``sheets``
+mode each saved search keeps its own sheet; in ``merged`` mode every
+search's postings go into a single sheet with a "Search" column, and a
+posting several searches found appears once.
+
+``DigestCollector`` is filled from the scheduler's worker threads while the
+run is in progress and read once the run has finished.
+"""
+import re
+import threading
+
+from job_dedup import DedupIndex
+
+DIGEST_MODES = ("off", "sheets", "merged")
+DIGEST_FILE_NAME = "Scheduled digest"
+
+_SHEET_INVALID = re.compile(r"[\[\]:*?/\\]")
+_SHEET_MAX = 31
+
+
+def digest_mode(value):
+    """Normalise a stored setting; anything unknown means no digest."""
+    value = (value or "off").strip().lower()
+    return value if value in DIGEST_MODES else "off"
+
+
+class DigestCollector:
+    def __init__(self):
+        self._users = {}
+        self._lock = threading.Lock()
+
+    def wants(self, search):
+        return digest_mode(search.get("email_digest")) != "off"
+
+    def add(self, search, jobs):
+        with self._lock:
+            user = self._users.setdefault(search["user_id"], {
+                "user_id": search["user_id"],
+                "email": search["user_email"],
+                "mode": digest_mode(search.get("email_digest")),
+                "sections": [],
+            })
+            user["sections"].append((search, list(jobs)))
+
+    def users(self):
+        """One entry per user with postings, sections in the order they arrived."""
+        with self._lock:
+            return [dict(user, sections=list(user["sections"])) for user in self._users.values()]
+
+
+def sheet_names(names):
+    """Excel-safe, unique sheet names (at most 31 characters, no []:*?/\\)."""
+    used = set()
+    result = []
+    for name in names:
+        base = _SHEET_INVALID.sub(" ", str(name or "")).strip().strip("'")[:_SHEET_MAX] or "Search"
+        candidate, n = base, 2
+        while candidate.lower() in used:
+            suffix = f" ({n})"
+            candidate = base[:_SHEET_MAX - len(suffix)] + suffix
+            n += 1
+        used.add(candidate.lower())
+        result.append(candidate)
+    return result
+
+
+def merge_sections(sections):
+    """Every section's jobs in one list tagged with their search; repeats across searches are dropped."""
+    index = DedupIndex()
+    merged = []
+    for search, jobs in sections:
+        for job in jobs:
+            if index.add(job) is None:
+                merged.append(dict(job, search=search["name"]))
+    return merged
@@ -0,0 +1,145 @@
+"""Bounded, retrying batch runner for the nightly scheduled searches.
+
+``run_batch`` hands each due search to a pool of ``SCHEDULER_WORKERS``
+threads. Searches against the same job site also share a per-source limit
+(``SCHEDULER_SOURCE_LIMITS``, e.g. ``"efinancialcareers=2,indeed=1"``), so a
+batch of Indeed searches cannot monopolise the pool. A failed attempt is
+retried with exponential backoff up to ``SCHEDULER_MAX_ATTEMPTS`` times.
+Anything not started within ``SCHEDULER_RUN_WINDOW`` seconds is reported as
+"deferred" rather than running into the day. The returned report has one
+entry per search plus per-status counts.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.environ.get("SCHEDULER_WORKERS", "4"))
+SOURCE_LIMITS = os.environ.get("SCHEDULER_SOURCE_LIMITS", "")
+DEFAULT_SOURCE_LIMIT = int(os.environ.get("SCHEDULER_SOURCE_LIMIT_DEFAULT", "2"))
+MAX_ATTEMPTS = int(os.environ.get("SCHEDULER_MAX_ATTEMPTS", "3"))
+RETRY_BACKOFF = float(os.environ.get("SCHEDULER_RETRY_BACKOFF", "30"))
+RUN_WINDOW = float(os.environ.get("SCHEDULER_RUN_WINDOW", "7200"))
+
+
+class Deferred(Exception):
+    """The run window closed before the search could start."""
+
+
+def parse_limits(spec):
+    """``"indeed=1, careerjet=4"`` -> {"indeed": 1, "careerjet": 4}; malformed parts are ignored."""
+    limits = {}
+    for part in (spec or "").split(","):
+        key, _, value = part.partition("=")
+        if key.strip() and value.strip().isdigit():
+            limits[key.strip()] = max(1, int(value))
+    return limits
+
+
+class SourceLimiter:
+    """One semaphore per job source; unknown sources get ``default`` slots."""
+
+    def __init__(self, limits=None, default=DEFAULT_SOURCE_LIMIT):
+        self.limits = dict(limits or {})
+        self.default = max(1, default)
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, key):
+        with self._lock:
+            if key not in self._semaphores:
+                self._semaphores[key] = threading.Semaphore(self.limits.get(key, self.default))
+            return self._semaphores[key]
+
+    @contextmanager
+    def hold(self, keys, deadline=None):
+        """Hold a slot for every key; sorted order keeps multi-source searches deadlock free."""
+        with ExitStack() as stack:
+            for key in sorted(set(keys)):
+                semaphore = self._semaphore(key)
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                if not semaphore.acquire(timeout=timeout):
+                    raise Deferred(f"no {key} slot before the run window closed")
+                stack.callback(semaphore.release)
+            yield
+
+
+def backoff_delay(attempt, base=RETRY_BACKOFF):
+    """Exponential backoff with +/-20% jitter so retries of one batch spread out."""
+    return base * 2 ** (attempt - 1) * random.uniform(0.8, 1.2)
+
+
+def run_with_retries(function, attempts=MAX_ATTEMPTS, backoff=RETRY_BACKOFF, label="task", deadline=None):
+    """Call ``function`` until it returns without raising; re-raises the last error."""
+    for attempt in range(1, attempts + 1):
+        try:
+            return function()
+        except Deferred:
+            raise
+        except Exception as e:
+            delay = backoff_delay(attempt, backoff)
+            if deadline is not None:
+                delay = min(delay, deadline - time.monotonic())
+            if attempt >= attempts or delay <= 0:
+                raise
+            logger.info(f"🔁 {label} failed (attempt {attempt}/{attempts}): {e}; retrying in {delay:.0f}s")
+            time.sleep(delay)
+
+
+def run_batch(items, task, sources_for=lambda item: (), label_for=str, workers=WORKERS, limiter=None,
+              max_attempts=MAX_ATTEMPTS, backoff=RETRY_BACKOFF, window=RUN_WINDOW):
+    """Run ``task(item)`` for every item on a bounded pool and return a run report.
+
+    ``task`` returns a dict with a "status" (and optional "detail") or raises
+    to trigger a retry. Source slots from ``sources_for(item)`` are held for
+    each attempt and released during backoff.
+    """
+    limiter = limiter or SourceLimiter(parse_limits(SOURCE_LIMITS))
+    started_at = datetime.now()
+    started = time.monotonic()
+    deadline = started + window if window else None
+
+    def run(item):
+        label = label_for(item)
+        item_started = time.monotonic()
+        attempts_made = 0
+
+        def attempt():
+            nonlocal attempts_made
+            if deadline is not None and time.monotonic() >= deadline:
+                raise Deferred("run window closed")
+            attempts_made += 1
+            with limiter.hold(sources_for(item), deadline):
+                return task(item) or {}
+
+        entry = {"search": label}
+        try:
+            outcome = run_with_retries(attempt, max_attempts, backoff, label, deadline)
+            entry.update(status=outcome.get("status", "ok"), detail=outcome.get("detail"))
+        except Deferred as e:
+            entry.update(status="deferred", detail=str(e))
+        except Exception as e:
+            logger.info(f"❌ {label} failed after {attempts_made} attempt(s): {e}")
+            entry.update(status="failed", detail=str(e)[:300])
+        entry.update(attempts=attempts_made, seconds=round(time.monotonic() - item_started, 1))
+        return entry
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="scheduled") as executor:
+        entries = list(executor.map(run, items))
+
+    counts = {}
+    for entry in entries:
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+    return {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "seconds": round(time.monotonic() - started, 1),
+        "total": len(entries),
+        "counts": counts,
+        "searches": entries,
+    }
@@ -0,0 +1,19 @@
+"""Standalone consumer for queued scheduled searches.
+
+Run one or more of these (on any node with DATABASE_URL set) alongside
+SCHEDULER_MODE=queue:
+
+    python scheduled_worker.py
+"""
+import logging
+import signal
+import threading
+
+from app import run_task_worker
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    run_task_worker(stop_event=stop)
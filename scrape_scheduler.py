@@ -0,0 +1,256 @@
+"""Process-wide admission control for browser-driven searches.
+
+Every search started through ``scraper_registry.scrape_jobs`` takes a slot
+from one ``ScrapeScheduler`` before any scraper runs, so the number of
+searches driving Chrome at once never exceeds ``SCRAPE_MAX_CONCURRENT`` no
+matter how many requests, saved-search loads and scheduled runs arrive
+together. Waiting searches form a priority queue: interactive searches are
+served before scheduled ones, first come first served within a class, and
+each waiter can be told its queue position as it changes.
+
+New work is rejected up front (``AdmissionRejected``) when the queue is
+full or the container is short of memory, instead of launching a browser
+that gets the process OOM-killed.
+
+The limits are per process. Every gunicorn worker and every
+``scheduled_worker.py`` process has its own scheduler, so up to
+processes x ``SCRAPE_MAX_CONCURRENT`` searches can drive Chrome at once in
+one container; size the limit for that. The free-memory check reads the
+container's memory and so still covers all of them together.
+"""
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 0
+SCHEDULED = 1
+
+# Per process: multiply by the number of web workers and task workers for the container total
+MAX_CONCURRENT = int(os.environ.get("SCRAPE_MAX_CONCURRENT", "2"))
+QUEUE_LIMIT = int(os.environ.get("SCRAPE_QUEUE_LIMIT", "20"))
+MIN_FREE_MB = int(os.environ.get("SCRAPE_MIN_FREE_MB", "400"))
+QUEUE_TIMEOUT = int(os.environ.get("SCRAPE_QUEUE_TIMEOUT", "900"))
+
+
+class AdmissionRejected(Exception):
+    """Raised when a search cannot be queued (queue full, low memory or queue timeout)."""
+
+
+def _read_int(path):
+    try:
+        with open(path) as f:
+            value = f.read().strip()
+    except OSError:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def available_memory_mb():
+    """Memory still available to this container in MB, or None when it cannot be read.
+
+    Takes the lower of the host's MemAvailable and the cgroup headroom
+    (limit minus usage), since the container is killed at its cgroup limit.
+    """
+    candidates = []
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    candidates.append(int(line.split()[1]) // 1024)
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+    for limit_path, usage_path in (("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+                                   ("/sys/fs/cgroup/memory/memory.limit_in_bytes",
+                                    "/sys/fs/cgroup/memory/memory.usage_in_bytes")):
+        limit, usage = _read_int(limit_path), _read_int(usage_path)
+        # cgroup v1 reports "no limit" as a huge number
+        if limit is not None and usage is not None and limit < 1 << 60:
+            candidates.append(max(limit - usage, 0) // (1024 * 1024))
+            break
+    return min(candidates) if candidates else None
+
+
+class _Ticket:
+    __slots__ = ("priority", "seq", "label", "on_queue", "position")
+
+    def __init__(self, priority, seq, label, on_queue):
+        self.priority = priority
+        self.seq = seq
+        self.label = label
+        self.on_queue = on_queue
+        self.position = None
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class ScrapeScheduler:
+    """Bounded number of concurrent searches with a priority wait queue."""
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT, queue_limit=QUEUE_LIMIT, min_free_mb=MIN_FREE_MB,
+                 memory_probe=available_memory_mb, memory_retry=2.0):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.queue_limit = int(queue_limit)
+        self.min_free_mb = min_free_mb
+        self.memory_probe = memory_probe
+        self.memory_retry = memory_retry
+        self._queue = []  # heap of _Ticket
+        self._running = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.counters = {"started": 0, "rejected": 0, "timed_out": 0}
+
+    # ── public API ─────────────────────────────────────────────────────────
+
+    def memory_tight(self):
+        if not self.min_free_mb:
+            return False
+        free = self.memory_probe()
+        return free is not None and free < self.min_free_mb
+
+    def admission_error(self):
+        """Why new work would be rejected right now, or None if it would be queued."""
+        with self._cond:
+            if self.queue_limit and len(self._queue) >= self.queue_limit:
+                return "Too many searches are waiting. Please try again in a few minutes."
+            running = self._running
+        # Like _acquire, an idle server always takes one search, or a small box would never run any
+        if running and self.memory_tight():
+            return "The server is busy running other searches. Please try again in a few minutes."
+        return None
+
+    @contextmanager
+    def slot(self, priority=INTERACTIVE, on_queue=None, label="search", timeout=QUEUE_TIMEOUT):
+        """Hold one search slot for the duration of the ``with`` block.
+
+        ``on_queue(position)`` is called with the 1-based queue position
+        whenever it changes while waiting. Raises ``AdmissionRejected``.
+        The block receives a list: futures appended to it are work the search
+        gave up waiting for but which is still running (and holding a
+        browser), so the slot stays taken until they finish.
+        """
+        self._acquire(priority, on_queue, label, timeout)
+        lingering = []
+        try:
+            yield lingering
+        finally:
+            pending = [future for future in lingering if not future.done()]
+            if not pending:
+                self._release()
+            else:
+                logger.info(f"⏳ {label}: holding its slot until {len(pending)} abandoned scrape(s) finish")
+                self._release_after(pending)
+
+    def run(self, function, *args, priority=INTERACTIVE, on_queue=None, label="search", **kwargs):
+        with self.slot(priority, on_queue, label):
+            return function(*args, **kwargs)
+
+    def _release(self):
+        with self._cond:
+            self._running -= 1
+            self._cond.notify_all()
+
+    def _release_after(self, futures):
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def finished(_):
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self._release()
+
+        for future in futures:
+            future.add_done_callback(finished)
+
+    def stats(self):
+        with self._cond:
+            waiting = sorted(self._queue)
+            return {
+                "running": self._running,
+                "max_concurrent": self.max_concurrent,
+                "queued_interactive": sum(1 for t in waiting if t.priority == INTERACTIVE),
+                "queued_scheduled": sum(1 for t in waiting if t.priority != INTERACTIVE),
+                "free_memory_mb": self.memory_probe(),
+                **self.counters,
+            }
+
+    # ── internals ──────────────────────────────────────────────────────────
+
+    def _acquire(self, priority, on_queue, label, timeout):
+        error = self.admission_error()
+        if error:
+            with self._cond:
+                self.counters["rejected"] += 1
+            logger.info(f"🚫 Rejected {label}: {error}")
+            raise AdmissionRejected(error)
+
+        deadline = time.monotonic() + timeout if timeout else None
+        with self._cond:
+            ticket = _Ticket(priority, next(self._seq), label, on_queue)
+            heapq.heappush(self._queue, ticket)
+            self._cond.notify_all()
+            try:
+                while True:
+                    if self._queue[0] is ticket and self._running < self.max_concurrent:
+                        # Hold back while memory is tight, unless nothing else is running
+                        if self._running == 0 or not self.memory_tight():
+                            heapq.heappop(self._queue)
+                            self._running += 1
+                            self.counters["started"] += 1
+                            self._cond.notify_all()
+                            break
+                        wait = self.memory_retry
+                    else:
+                        wait = None
+                    self._report_positions()
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.counters["timed_out"] += 1
+                            raise AdmissionRejected("Your search waited too long in the queue. Please try again.")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            except BaseException:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                raise
+        if ticket.position is not None:
+            logger.info(f"🚦 Starting queued {label}")
+
+    def _report_positions(self):
+        # Called with the lock held; only the callbacks of tickets whose position moved fire
+        for position, ticket in enumerate(sorted(self._queue), start=1):
+            if ticket.position != position:
+                ticket.position = position
+                if ticket.on_queue:
+                    try:
+                        ticket.on_queue(position)
+                    except Exception as e:
+                        logger.info(f"⚠️ Queue position callback failed: {e}")
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scrape_scheduler():
+    """Process-wide scheduler configured from the environment (limits apply to this process only)."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = ScrapeScheduler()
+                logger.info(f"🚦 Scrape scheduler for pid {os.getpid()}: up to {_scheduler.max_concurrent} "
+                            f"concurrent search(es) in this process")
+    return _scheduler
@@ -6,20 +6,96 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from bs4 import BeautifulSoup
 from bleach import clean
-import time
+from requests.adapters import HTTPAdapter
+import requests
+from browser_pool import DriverPool
+from host_throttle import HostThrottle
+from job_cache import conditional_headers, get_job_cache, validators_from_response
+from job_dedup import job_key, unique_links
+from resource_blocking import apply_to_selenium
+from page_waits import (
+    StepTimer, count_stable_condition, install_mutation_observer, list_changed_condition,
+    page_quiet_condition, snapshot_links, text_length_condition, wait_until,
+)
+from concurrent.futures import ThreadPoolExecutor
+import atexit
+import os
+import threading
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36"
+ANTI_DETECTION_JS = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+
+# Detail-page fan-out: concurrent drivers and minimum spacing per host
+DETAIL_WORKERS = int(os.environ.get("EFC_DETAIL_WORKERS", "3"))
+DETAIL_MIN_INTERVAL = float(os.environ.get("EFC_DETAIL_MIN_INTERVAL", "1.0"))
+_detail_throttle = HostThrottle(DETAIL_MIN_INTERVAL)
+
+# "auto" tries a plain HTTP fetch before using a browser; "browser" always drives Chrome
+DETAIL_MODE = os.environ.get("EFC_DETAIL_MODE", "auto").lower()
+DESCRIPTION_MIN_LENGTH = 500
+
+JOB_CARD_SELECTOR = "a.font-subtitle-3-medium.job-title"
+NO_MORE_JOBS_XPATH = "//*[contains(text(), 'No more jobs!')]"
+
+_http_session = None
+
+_driver_pool = None
+_driver_pool_lock = threading.Lock()
+
+
+def _launch_driver():
+    """Start a headless Chrome configured for eFinancialCareers scraping."""
+    options = Options()
+
+    # === CONVERT TO HEADLESS WITH ANTI-DETECTION ===
+    options.add_argument("--headless")  # Changed from --start-maximized
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+
+    # === ADD PROVEN ANTI-DETECTION ===
+    options.add_argument(f"--user-agent={USER_AGENT}")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument("--disable-web-security")
+    options.add_argument("--allow-running-insecure-content")
+
+    driver = webdriver.Chrome(options=options)
+
+    # === ADD ANTI-DETECTION SCRIPT ===
+    # Registered via CDP so it survives navigation on a reused (pooled) driver
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": ANTI_DETECTION_JS})
+    except Exception as e:
+        print(f"⚠️ Could not register anti-detection script: {e}")
+    driver.execute_script(ANTI_DETECTION_JS)
+
+    # Blocked URL list persists on the tab, so pooled drivers keep it
+    apply_to_selenium(driver, "efinancialcareers")
+    return driver
+
+
+def get_driver_pool():
+    """Process-wide pool of warm Chrome drivers shared by all searches."""
+    global _driver_pool
+    if _driver_pool is None:
+        with _driver_pool_lock:
+            if _driver_pool is None:
+                _driver_pool = DriverPool(
+                    _launch_driver,
+                    max_size=int(os.environ.get("BROWSER_POOL_SIZE", "2")),
+                    min_idle=int(os.environ.get("BROWSER_POOL_MIN_IDLE", "1")),
+                    max_uses=int(os.environ.get("BROWSER_POOL_MAX_USES", "20")),
+                    idle_timeout=int(os.environ.get("BROWSER_POOL_IDLE_TIMEOUT", "600")),
+                )
+                atexit.register(_driver_pool.close)
+    return _driver_pool
 
 
 def wait_for_full_description(driver, selector, min_length=500, timeout=15):
-    end_time = time.time() + timeout
-    while time.time() < end_time:
-        try:
-            elem = driver.find_element(By.CSS_SELECTOR, selector)
-            if len(elem.text.strip()) >= min_length:
-                return True
-        except Exception:
-            pass
-        time.sleep(0.5)
-    return False
+    return bool(wait_until(driver, text_length_condition(selector, min_length), timeout))
 
 def extract_job_details(driver, url):
     driver.get(url)
@@ -48,20 +124,14 @@ def extract_job_details(driver, url):
         company = "[Not Found]"
 
    
-    if wait_for_full_description(driver, "div.inner-content", min_length=500):
+    if wait_for_full_description(driver, "div.inner-content", min_length=DESCRIPTION_MIN_LENGTH):
         soup = BeautifulSoup(driver.page_source, "html.parser")
         desc_container = soup.select_one("div.inner-content")
-        with open("job_debug_raw.html", "w", encoding="utf-8") as f:
-            f.write(desc_container.prettify() if desc_container else "")
         raw_html = desc_container.decode_contents() if desc_container else "[Not Found]"
     else:
         raw_html = "[Not Found or Incomplete]"
 
-    allowed_tags = ['p', 'br', 'ul', 'li', 'ol', 'strong', 'em', 'h2', 'h3', 'a', 'b']
-    allowed_attrs = {'a': ['href', 'title']}
-    if "<span" in raw_html:
-        raw_html = raw_html.replace("<span>", "").replace("</span>", "")
-    description = clean(raw_html, tags=allowed_tags, attributes=allowed_attrs)
+    description = _clean_description(raw_html)
 
     print("======== JOB DEBUG INFO ========")
     print("🔗 URL:", url)
@@ -84,37 +154,218 @@ def extract_job_details(driver, url):
     }
 
 
-def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US"):
+def _clean_description(raw_html):
+    allowed_tags = ['p', 'br', 'ul', 'li', 'ol', 'strong', 'em', 'h2', 'h3', 'a', 'b']
+    allowed_attrs = {'a': ['href', 'title']}
+    if "<span" in raw_html:
+        raw_html = raw_html.replace("<span>", "").replace("</span>", "")
+    return clean(raw_html, tags=allowed_tags, attributes=allowed_attrs)
+
+
+def _get_http_session():
+    global _http_session
+    if _http_session is None:
+        with _driver_pool_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(4, DETAIL_WORKERS * 2))
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    "User-Agent": USER_AGENT,
+                    "Accept": "text/html,application/xhtml+xml",
+                    "Accept-Language": "en-GB,en;q=0.9",
+                })
+                _http_session = session
+    return _http_session
+
+
+def _job_from_cache(entry, url):
+    job = {field: entry[field] for field in ("title", "company", "location", "description")}
+    job["link"] = url
+    return job
+
+
+def extract_job_details_http(url, cached=None):
+    """Browserless detail fetch using the same selectors as extract_job_details.
+
+    Returns None when the page does not carry a complete description in its
+    server-rendered HTML, so the caller can fall back to Selenium. A stale
+    ``cached`` entry is revalidated with a conditional GET.
+    """
+    try:
+        response = _get_http_session().get(url, headers=conditional_headers(cached), timeout=15)
+    except Exception as e:
+        print(f"⚠️ HTTP detail fetch failed for {url}: {e}")
+        return None
+    if response.status_code == 304 and cached:
+        print(f"💾 Cache revalidated (304): {url}")
+        get_job_cache().touch(url)
+        return _job_from_cache(cached, url)
+    if response.status_code != 200:
+        print(f"⚠️ HTTP detail fetch returned {response.status_code} for {url}")
+        return None
+
+    soup = BeautifulSoup(response.text, "html.parser")
+    desc_container = soup.select_one("div.inner-content")
+    title_elem = soup.select_one("h1.font-heading-3")
+    if (
+        title_elem is None or desc_container is None or
+        len(desc_container.get_text(" ", strip=True)) < DESCRIPTION_MIN_LENGTH
+    ):
+        return None
+
+    location_elem = soup.select_one("span.loc")
+    company_elem = soup.select_one("a.companyInfo") or soup.select_one("span.companyInfo")
+    description = _clean_description(desc_container.decode_contents())
+
+    print(f"⚡ HTTP detail fetch: {url}")
+    job = {
+        "title": title_elem.get_text(strip=True),
+        "company": company_elem.get_text(strip=True) if company_elem else "[Not Found]",
+        "location": location_elem.get_text(strip=True) if location_elem else "[Not Found]",
+        "link": url,
+        "description": description
+    }
+    if _is_valid_job(job):
+        get_job_cache().store(url, job, **validators_from_response(response))
+    return job
+
+
+def _is_valid_job(job):
+    return not (
+        job["title"] == "[Not Found]" or
+        job["location"] == "[Not Found]" or
+        job["description"] == "[Not Found or Incomplete]"
+    )
+
+
+def extract_details_concurrently(job_links, max_jobs, workers=None, progress=None):
+    """Fetch job detail pages with several concurrent workers.
+
+    Each worker pulls the next link off a shared cursor, spacing requests per
+    host through ``_detail_throttle``. Fresh entries in the shared job cache
+    skip the fetch entirely. In ``auto`` mode pages are fetched over
+    plain HTTP first and a pooled driver is only checked out for the pages
+    whose HTML lacks a complete description, and handed back straight after,
+    so more workers than drivers never hold the pool. Results are
+    reassembled in ``job_links`` order and workers stop picking up new links
+    once the first ``max_jobs`` valid jobs are in hand. ``progress`` receives
+    a "details" update after every fetch and a "job" update per valid job.
+    """
+    pool = get_driver_pool()
+    cache = get_job_cache()
+    workers = workers or DETAIL_WORKERS
+    if DETAIL_MODE != "auto":
+        # Browser-only workers keep a driver each for the whole loop
+        workers = min(workers, pool.max_size)
+    workers = max(1, min(workers, len(job_links)))
+    if not job_links:
+        return []
+    print(f"🚀 Fetching {len(job_links)} job details with {workers} worker(s)")
+
+    results = [None] * len(job_links)
+    cursor = {"next": 0}
+    lock = threading.Lock()
+    enough = threading.Event()
+
+    def valid_prefix_count():
+        count = 0
+        for job in results:
+            if job is None:
+                break
+            if _is_valid_job(job):
+                count += 1
+        return count
+
+    def fetch(url, driver_holder):
+        cached = cache.lookup(url)
+        if cached and cached["fresh"]:
+            print(f"💾 Cache hit: {url}")
+            return _job_from_cache(cached, url)
+        _detail_throttle.wait(url)
+        if DETAIL_MODE == "auto":
+            job = extract_job_details_http(url, cached)
+            if job is not None:
+                return job
+            print(f"🌐 Falling back to browser for {url}")
+            with pool.driver() as driver:
+                job = extract_job_details(driver, url)
+            if _is_valid_job(job):
+                cache.store(url, job)
+            return job
+        if driver_holder["driver"] is None:
+            driver_holder["driver"] = pool.acquire()
+        job = extract_job_details(driver_holder["driver"], url)
+        if _is_valid_job(job):
+            cache.store(url, job)
+        return job
+
+    def worker():
+        driver_holder = {"driver": None}
+        try:
+            while not enough.is_set():
+                with lock:
+                    index = cursor["next"]
+                    if index >= len(job_links):
+                        return
+                    cursor["next"] += 1
+                url = job_links[index]
+                try:
+                    job = fetch(url, driver_holder)
+                except Exception as e:
+                    # Includes PoolExhausted: the claimed slot must still be filled, or
+                    # the link is lost and the max_jobs early stop never fires
+                    print(f"⚠️ Detail fetch failed for {url}: {e}")
+                    job = {"title": "[Not Found]", "company": "[Not Found]", "location": "[Not Found]",
+                           "link": url, "description": "[Not Found or Incomplete]"}
+                with lock:
+                    results[index] = job
+                    done = sum(1 for result in results if result is not None)
+                    if valid_prefix_count() >= max_jobs:
+                        enough.set()
+                if progress:
+                    if _is_valid_job(job):
+                        progress("job", job=job)
+                    progress("details", done=done, total=len(job_links))
+        finally:
+            if driver_holder["driver"] is not None:
+                pool.release(driver_holder["driver"])
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(worker) for _ in range(workers)]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"⚠️ Detail worker stopped: {e}")
+
+    job_results = []
+    for job in results:
+        if job is None:
+            continue
+        if not _is_valid_job(job):
+            print("⛔ Skipping invalid job.")
+            continue
+        job_results.append(job)
+        print(f"✅ Collected: {len(job_results)} / {max_jobs}")
+        if len(job_results) >= max_jobs:
+            break
+    return job_results
+
+
+def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US", exclude_links=None, progress=None):
     print("🔍 BASIC DEBUG: Function called with parameters:")
     print(f"  - title: '{title}'")
     print(f"  - location: '{location}'") 
     print(f"  - max_jobs: {max_jobs}")
     print(f"  - seniority: '{seniority}'")
     
+    timer = StepTimer("EFC ", on_step=progress)
     try:
-        print("🌐 Launching browser...")
-        options = Options()
-    
-        # === CONVERT TO HEADLESS WITH ANTI-DETECTION ===
-        options.add_argument("--headless")  # Changed from --start-maximized
-        options.add_argument("--no-sandbox") 
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-    
-        # === ADD PROVEN ANTI-DETECTION ===
-        user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36"
-        options.add_argument(f"--user-agent={user_agent}")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        options.add_argument("--disable-web-security")
-        options.add_argument("--allow-running-insecure-content")
-    
-        driver = webdriver.Chrome(options=options)
-    
-        # === ADD ANTI-DETECTION SCRIPT ===
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        print("🌐 Checking out browser from pool...")
+        with timer.step("browser checkout"):
+            driver = get_driver_pool().acquire()
 
         # === REST OF YOUR EXACT WORKING LOGIC ===
         if region == "US":
@@ -130,8 +381,10 @@ def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US"):
         print(f"🌍 REGION DEBUG: Using region '{region}' -> URL: {base_url}")
         print(f"🌐 ACTUAL URL BEING ACCESSED: About to navigate to {base_url}")
     
-        driver.get(base_url)
-        time.sleep(2)
+        with timer.step("home page"):
+            driver.get(base_url)
+            install_mutation_observer(driver)
+            wait_until(driver, page_quiet_condition(500), 10)
         print(f"🌐 CURRENT URL AFTER NAVIGATION: {driver.current_url}")
         print(f"🌐 PAGE TITLE: {driver.title}")
         print(f"🌐 PAGE LANGUAGE: Checking for German content...")
@@ -167,8 +420,9 @@ def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US"):
                 print("🔍 Found generic search button")
 
         search_button.click()
-        
-        time.sleep(5)
+
+        with timer.step("search results"):
+            wait_until(driver, count_stable_condition(JOB_CARD_SELECTOR, allow_empty_when=NO_MORE_JOBS_XPATH), 30)
 
         # DEBUG: Check what we actually got after the search
         print("🔍 DEBUG: Checking search results after initial search...")
@@ -196,9 +450,8 @@ def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US"):
             try:
                 print("⏳ Waiting for search results page to load...")
                 WebDriverWait(driver, 65).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "a.font-subtitle-3-medium.job-title"))
+                    EC.presence_of_element_located((By.CSS_SELECTOR, JOB_CARD_SELECTOR))
                 )
-                time.sleep(3)
         
                 print("🔽 Opening seniority filter...")
                 filter_buttons = driver.find_elements(By.CSS_SELECTOR, "efc-filter-button")
@@ -210,7 +463,8 @@ def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US"):
         
                 if seniority_btn:
                     seniority_btn.click()
-                    time.sleep(2)
+                    with timer.step("seniority panel"):
+                        wait_until(driver, EC.presence_of_element_located((By.CSS_SELECTOR, "input[id^='seniority']")), 10)
 
                     seniority_mapping = {
                         'intern': 'INTERN_GRADUATE',
@@ -236,19 +490,24 @@ def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US"):
                             print(f"✅ Seniority option '{seniority}' found in dropdown")
                         except:
                             print(f"🚫 Seniority level '{seniority}' not available for this search")
-                            driver.quit()
+                            get_driver_pool().release(driver)
+                            print(f"⏱️ {timer.summary()}")
                             return [{"no_results": True, "special_message": f"No {seniority} level positions available for '{title}' in {location}. Try a different seniority level."}]
                     
                         if not checkbox.is_selected():
+                            before = snapshot_links(driver, JOB_CARD_SELECTOR)
                             checkbox.click()
-                            time.sleep(2)
                             print(f"✅ Clicked checkbox for {checkbox_value}")
             
                             print("⏳ Waiting for filtered results to reload...")
-                            WebDriverWait(driver, 65).until(
-                                EC.presence_of_element_located((By.CSS_SELECTOR, "a.font-subtitle-3-medium.job-title"))
-                            )
-                            time.sleep(3)
+                            with timer.step("filtered results"):
+                                # The list may legitimately stay the same, so a missed
+                                # change is not an error; stabilisation is what matters.
+                                wait_until(driver, list_changed_condition(JOB_CARD_SELECTOR, before), 15)
+                                WebDriverWait(driver, 65).until(
+                                    EC.presence_of_element_located((By.CSS_SELECTOR, JOB_CARD_SELECTOR))
+                                )
+                                wait_until(driver, count_stable_condition(JOB_CARD_SELECTOR), 15)
                 else:
                     raise Exception("Seniority button not found")
                 
@@ -256,7 +515,7 @@ def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US"):
 
                 # DEBUG: Wait and check if job count updates    
                 print("🔍 DEBUG: Checking job count after filter...")
-                time.sleep(5)
+                wait_until(driver, EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'job in')]")), 5)
                 try:
                     result_text = driver.find_element(By.XPATH, "//*[contains(text(), 'job in')]").text
                     print(f"📊 Updated job count: {result_text}")
@@ -331,36 +590,32 @@ def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US"):
             except Exception:
                 continue
 
+        job_links = unique_links(job_links)
+        if exclude_links:
+            new_links = [link for link in job_links if job_key(link) not in exclude_links]
+            print(f"⏭️ Skipping {len(job_links) - len(new_links)} link(s) seen in previous runs")
+            job_links = new_links
         print(f"🔍 Found {len(job_links)} job links.\n")
+        if progress:
+            progress("links", total=len(job_links))
     
 
-        # ✅ Collect only valid jobs until we reach max_jobs
-        job_results = []
-        for url in job_links:
-            job = extract_job_details(driver, url)
-
-            if (
-                job["title"] == "[Not Found]" or
-                job["location"] == "[Not Found]" or
-                job["description"] == "[Not Found or Incomplete]"
-            ):
-                print("⛔ Skipping invalid job.")
-                continue
-
-            job_results.append(job)
-            print(f"✅ Collected: {len(job_results)} / {max_jobs}")
-            time.sleep(2)
+        # The search page is done with; hand its driver back so the detail
+        # workers can pick it up warm.
+        get_driver_pool().release(driver)
+        del driver
 
-            if len(job_results) >= max_jobs:
-                break
-    
-        driver.quit()
+        # ✅ Collect only valid jobs until we reach max_jobs
+        with timer.step("job details"):
+            job_results = extract_details_concurrently(job_links, max_jobs, progress=progress)
+        print(f"⏱️ {timer.summary()}")
         return job_results
         
     except TimeoutException as e:
         print(f"❌ TIMEOUT ERROR: {e}")
+        print(f"⏱️ {timer.summary()}")
         if 'driver' in locals():
-            driver.quit()
+            get_driver_pool().release(driver, discard=True)
         return [{
             "error_type": "timeout",
             "title": "Search Timeout",
@@ -373,8 +628,9 @@ def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US"):
         
     except Exception as e:
         print(f"❌ GENERAL ERROR: {e}")
+        print(f"⏱️ {timer.summary()}")
         if 'driver' in locals():
-            driver.quit()
+            get_driver_pool().release(driver, discard=True)
         error_msg = "We're experiencing technical difficulties. Please try again in a few minutes. If you continue seeing this error, email frameitbot@gmail.com with details about what you were searching for."
         
         return [{
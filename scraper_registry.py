@@ -0,0 +1,241 @@
+"""Registry of job-source adapters and multi-source fan-out search.
+
+Every adapter follows the same contract as ``scraper_logic.scrape_jobs``:
+``scrape_jobs(title, location, max_jobs, seniority, region)`` returning a list
+of job dicts, or a one-element list holding an ``error_type`` / ``no_results``
+dict. Adapter modules are imported on first use so a missing optional
+dependency (jobspy, nodriver, ...) only disables that source. Adapters may
+also accept ``exclude_links`` (a set of ``job_dedup.job_key`` values) to skip
+already-seen postings before fetching them, and ``dedup`` (the fan-out's
+shared ``DedupIndex``) to skip postings another source already returned
+before opening their detail pages; for the rest the registry filters their
+results afterwards. Likewise ``progress(stage, source=key, **info)``
+receives stage updates ("started", "links", "job", "details", "finished")
+from adapters that report them, and at least "started", one "job" per
+result and "finished" from those that do not.
+
+A source key naming a group ("both", "all") fans out to its members
+concurrently; the search then costs the slowest source rather than the sum,
+bounded by ``SEARCH_FANOUT_DEADLINE`` seconds.
+
+``scrape_jobs`` runs each search inside a ``scrape_scheduler`` slot, so the
+number of concurrent browser-driven searches stays bounded process-wide;
+sources abandoned at the fan-out deadline keep the slot until they finish.
+"""
+import importlib
+import inspect
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from job_dedup import DedupIndex, job_key
+from scrape_scheduler import INTERACTIVE, AdmissionRejected, get_scrape_scheduler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOURCE = "efinancialcareers"
+FANOUT_DEADLINE = float(os.environ.get("SEARCH_FANOUT_DEADLINE", "240"))
+
+# key -> (display label, module, function)
+SOURCES = {
+    "efinancialcareers": ("EFC", "scraper_logic", "scrape_jobs"),
+    "careerjet": ("CareerJet", "careerjet_api", "scrape_jobs"),
+    "indeed": ("Indeed", "indeed_engine", "scrape_jobs"),
+    "indeed_jobspy": ("Indeed", "indeed_jobspy", "scrape_jobs"),
+    "careerjet_jobspy": ("CareerJet", "careerjet_jobspy", "scrape_jobs"),
+    "careerjet_rss": ("CareerJet", "careerjet_rss", "scrape_jobs_rss"),
+}
+
+SOURCE_GROUPS = {
+    "both": ["efinancialcareers", "careerjet"],
+    "all": ["efinancialcareers", "careerjet", "indeed"],
+}
+
+
+def register_source(key, label, module, function="scrape_jobs"):
+    SOURCES[key] = (label, module, function)
+
+
+def resolve_sources(source):
+    """Source keys behind ``source``; unknown keys fall back to eFinancialCareers."""
+    source = (source or DEFAULT_SOURCE).lower()
+    if source in SOURCE_GROUPS:
+        return list(SOURCE_GROUPS[source])
+    if source in SOURCES:
+        return [source]
+    logger.info(f"⚠️ Unknown source '{source}', using '{DEFAULT_SOURCE}'")
+    return [DEFAULT_SOURCE]
+
+
+def source_label(source):
+    """Short display name used in saved-search names and the results table."""
+    return " + ".join(dict.fromkeys(SOURCES[key][0] for key in resolve_sources(source)))
+
+
+def get_scraper(key):
+    _, module, function = SOURCES[key]
+    return getattr(importlib.import_module(module), function)
+
+
+def _error_job(error_type, title, location, message):
+    return {
+        "error_type": error_type,
+        "title": title,
+        "company": "Error",
+        "location": location,
+        "link": "#",
+        "description": message,
+        "formatted_description": message,
+    }
+
+
+def _is_error(jobs):
+    return len(jobs) == 1 and (jobs[0].get("error_type") or jobs[0].get("no_results"))
+
+
+def _accepts(function, name):
+    try:
+        return name in inspect.signature(function).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _source_progress(progress, key, label):
+    """Bind ``progress`` to one source; callback errors never break a scrape."""
+    def report(stage, **info):
+        if "job" in info:
+            info["job"].setdefault("source", label)
+        try:
+            progress(stage, source=key, **info)
+        except Exception as e:
+            logger.info(f"⚠️ Progress callback failed for {key}: {e}")
+    return report
+
+
+def scrape_source(key, title, location, max_jobs=10, seniority=None, region="US", exclude_links=None,
+                  progress=None, dedup=None, **kwargs):
+    """Run one adapter and tag each job with the source's display label.
+
+    With a shared ``dedup`` index, jobs are recorded under ``key`` and those
+    another source already returned are dropped (by the adapter itself when
+    it accepts ``dedup``, before any detail fetch).
+    """
+    label = SOURCES[key][0]
+    report = _source_progress(progress, key, label) if progress else None
+    native_progress = native_dedup = False
+    started = time.monotonic()
+    if report:
+        report("started")
+    try:
+        scraper = get_scraper(key)
+        if exclude_links and _accepts(scraper, "exclude_links"):
+            kwargs["exclude_links"] = exclude_links
+        if report and _accepts(scraper, "progress"):
+            kwargs["progress"] = report
+            native_progress = True
+        if dedup is not None and _accepts(scraper, "dedup"):
+            kwargs["dedup"] = dedup
+            native_dedup = True
+        jobs = scraper(title, location, max_jobs, seniority=seniority, region=region, **kwargs) or []
+    except Exception as e:
+        print(f"❌ {label} scraper failed: {e}")
+        jobs = [_error_job("general", f"{label} Error", location, f"{label} search failed: {str(e)[:200]}")]
+    if exclude_links and not _is_error(jobs):
+        jobs = [job for job in jobs if job_key(job.get("link")) not in exclude_links]
+    if dedup is not None and not native_dedup and not _is_error(jobs):
+        jobs = dedup.filter(jobs, source=key)
+    for job in jobs:
+        job.setdefault("source", label)
+    if report:
+        if not native_progress and not _is_error(jobs):
+            for job in jobs:
+                report("job", job=job)
+        report("finished", count=0 if _is_error(jobs) else len(jobs))
+    print(f"⏱️ {label} ({key}) returned {len(jobs)} result(s) in {time.monotonic() - started:.1f}s")
+    return jobs
+
+
+def search_sources(keys, title, location, max_jobs=10, seniority=None, region="US",
+                   deadline=None, on_results=None, lingering=None, **kwargs):
+    """Query ``keys`` concurrently and merge their jobs in arrival order.
+
+    Postings already returned by another source are dropped through a
+    shared DedupIndex, which adapters that accept ``dedup`` consult before
+    fetching detail pages; a source's own results are only deduplicated by
+    URL. ``on_results(key, jobs)`` is called with each source's
+    remaining jobs as it finishes. Sources still running when ``deadline``
+    seconds have passed are abandoned and their futures appended to
+    ``lingering`` (see ``ScrapeScheduler.slot``). Returns
+    ``(jobs, status)`` where ``status`` maps each key to "ok", "empty",
+    "error" or "timeout". Error and no-results placeholders are only
+    returned when no source produced real jobs.
+    """
+    deadline = FANOUT_DEADLINE if deadline is None else deadline
+    stop_at = time.monotonic() + deadline
+    status = {key: "timeout" for key in keys}
+    merged, placeholders = [], []
+    dedup = DedupIndex()
+
+    executor = ThreadPoolExecutor(max_workers=len(keys), thread_name_prefix="fanout")
+    futures = {
+        executor.submit(scrape_source, key, title, location, max_jobs, seniority, region, dedup=dedup, **kwargs): key
+        for key in keys
+    }
+    try:
+        pending = set(futures)
+        while pending:
+            remaining = stop_at - time.monotonic()
+            if remaining <= 0:
+                if lingering is not None:
+                    lingering.extend(pending)
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = futures[future]
+                jobs = future.result()
+                if _is_error(jobs):
+                    status[key] = "empty" if jobs[0].get("no_results") else "error"
+                    placeholders.extend(jobs)
+                    continue
+                status[key] = "ok" if jobs else "empty"
+                merged.extend(jobs)
+                if on_results:
+                    on_results(key, jobs)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if any(dedup.dropped.values()):
+        print(f"♻️ Dropped cross-source duplicates: {dedup.dropped}")
+    timed_out = [key for key, state in status.items() if state == "timeout"]
+    if timed_out:
+        print(f"⏰ Fan-out deadline of {deadline:.0f}s reached, skipping: {', '.join(timed_out)}")
+    if not merged:
+        if placeholders:
+            return placeholders[:1], status
+        message = "None of the selected job sites responded in time. Please try again in a few minutes."
+        return [_error_job("timeout", "Search Timeout", location, message)], status
+    return merged, status
+
+
+def _search(keys, title, location, max_jobs, seniority, region, lingering=None, **kwargs):
+    if len(keys) == 1:
+        return scrape_source(keys[0], title, location, max_jobs, seniority, region, **kwargs)
+    jobs, _ = search_sources(keys, title, location, max_jobs, seniority, region, lingering=lingering, **kwargs)
+    return jobs
+
+
+def scrape_jobs(source, title, location, max_jobs=10, seniority=None, region="US",
+                priority=INTERACTIVE, on_queue=None, **kwargs):
+    """Search ``source`` (a single key or a group) with the standard scraper contract.
+
+    The search waits for a scrape-scheduler slot at ``priority``;
+    ``on_queue(position)`` reports its place in the queue meanwhile. When the
+    scheduler turns the search away a "busy" error dict is returned.
+    """
+    keys = resolve_sources(source)
+    try:
+        with get_scrape_scheduler().slot(priority, on_queue, label=f"{source_label(source)} search '{title}'") as lingering:
+            return _search(keys, title, location, max_jobs, seniority, region, lingering=lingering, **kwargs)
+    except AdmissionRejected as e:
+        return [_error_job("busy", "Server Busy", location, str(e))]
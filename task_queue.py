@@ -0,0 +1,231 @@
+"""Durable Postgres task queue shared by any number of worker processes.
+
+Tasks live in the ``task_queue`` table. Workers claim one at a time with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so concurrent workers never block on
+or double-claim a row, and hold it under a lease that a heartbeat keeps
+extending while the handler runs. A worker that crashes simply lets its
+lease expire and the task becomes claimable again. Failures are retried
+with exponential backoff until ``max_attempts`` is reached.
+
+``enqueue`` is idempotent on ``run_key``: enqueueing the same logical run
+twice (two schedulers, a restart, a manual trigger) creates one task.
+``complete`` and ``fail`` only apply while the caller still holds the
+lease, so a worker whose lease was taken over cannot overwrite the result.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = int(os.environ.get("TASK_LEASE_SECONDS", "900"))
+POLL_INTERVAL = float(os.environ.get("TASK_POLL_INTERVAL", "5"))
+RETRY_BACKOFF = float(os.environ.get("TASK_RETRY_BACKOFF", "60"))
+
+
+def new_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class TaskQueue:
+    def __init__(self, engine, lease_seconds=LEASE_SECONDS, retry_backoff=RETRY_BACKOFF):
+        self.engine = engine
+        self.lease_seconds = lease_seconds
+        self.retry_backoff = retry_backoff
+        self._table_ready = False
+        self._table_lock = threading.Lock()
+
+    def _ensure_table(self):
+        if self._table_ready:
+            return
+        from sqlalchemy import text
+        with self._table_lock:
+            if not self._table_ready:
+                with self.engine.connect() as conn:
+                    conn.execute(text("""
+                        CREATE TABLE IF NOT EXISTS task_queue (
+                            id BIGSERIAL PRIMARY KEY,
+                            kind VARCHAR(50) NOT NULL,
+                            run_key VARCHAR(255) UNIQUE NOT NULL,
+                            payload JSONB NOT NULL,
+                            status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                            attempts INTEGER NOT NULL DEFAULT 0,
+                            max_attempts INTEGER NOT NULL DEFAULT 3,
+                            available_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                            leased_until TIMESTAMPTZ,
+                            worker_id VARCHAR(100),
+                            last_error TEXT,
+                            result JSONB,
+                            created_at TIMESTAMPTZ DEFAULT NOW(),
+                            updated_at TIMESTAMPTZ DEFAULT NOW()
+                        )
+                    """))
+                    # Only unfinished rows are ever scanned by claim()
+                    conn.execute(text("""
+                        CREATE INDEX IF NOT EXISTS idx_task_queue_claimable
+                        ON task_queue (kind, available_at) WHERE status IN ('pending', 'running')
+                    """))
+                    conn.commit()
+                self._table_ready = True
+
+    def enqueue(self, kind, payload, run_key, max_attempts=3, delay_seconds=0):
+        """Add a task unless one with ``run_key`` exists; returns its id or None for a duplicate."""
+        self._ensure_table()
+        from sqlalchemy import text
+        with self.engine.connect() as conn:
+            row = conn.execute(text("""
+                INSERT INTO task_queue (kind, run_key, payload, max_attempts, available_at)
+                VALUES (:kind, :run_key, CAST(:payload AS JSONB), :max_attempts,
+                        NOW() + make_interval(secs => :delay))
+                ON CONFLICT (run_key) DO NOTHING
+                RETURNING id
+            """), {"kind": kind, "run_key": run_key, "payload": json.dumps(payload, default=str),
+                   "max_attempts": max_attempts, "delay": delay_seconds}).fetchone()
+            conn.commit()
+        return row[0] if row else None
+
+    def claim(self, worker_id, kinds):
+        """Lease the next due task of one of ``kinds``: a dict, or None when there is nothing to do."""
+        self._ensure_table()
+        from sqlalchemy import text
+        with self.engine.connect() as conn:
+            # Tasks whose last lease expired on their final attempt are given up on
+            conn.execute(text("""
+                UPDATE task_queue SET status = 'failed', updated_at = NOW(),
+                    last_error = COALESCE(last_error, 'lease expired')
+                WHERE status = 'running' AND leased_until < NOW() AND attempts >= max_attempts
+            """))
+            row = conn.execute(text("""
+                UPDATE task_queue SET
+                    status = 'running',
+                    attempts = attempts + 1,
+                    worker_id = :worker_id,
+                    leased_until = NOW() + make_interval(secs => :lease),
+                    updated_at = NOW()
+                WHERE id = (
+                    SELECT id FROM task_queue
+                    WHERE kind = ANY(:kinds)
+                      AND attempts < max_attempts
+                      AND ((status = 'pending' AND available_at <= NOW())
+                           OR (status = 'running' AND leased_until < NOW()))
+                    ORDER BY available_at, id
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1
+                )
+                RETURNING id, kind, run_key, payload, attempts, max_attempts
+            """), {"worker_id": worker_id, "lease": self.lease_seconds, "kinds": list(kinds)}).fetchone()
+            conn.commit()
+        if row is None:
+            return None
+        payload = row[3] if not isinstance(row[3], str) else json.loads(row[3])
+        return {"id": row[0], "kind": row[1], "run_key": row[2], "payload": payload,
+                "attempts": row[4], "max_attempts": row[5]}
+
+    def heartbeat(self, task_id, worker_id):
+        """Extend the lease; False means the task is no longer ours."""
+        from sqlalchemy import text
+        with self.engine.connect() as conn:
+            result = conn.execute(text("""
+                UPDATE task_queue SET leased_until = NOW() + make_interval(secs => :lease), updated_at = NOW()
+                WHERE id = :id AND worker_id = :worker_id AND status = 'running'
+            """), {"id": task_id, "worker_id": worker_id, "lease": self.lease_seconds})
+            conn.commit()
+        return result.rowcount == 1
+
+    def complete(self, task_id, worker_id, result=None):
+        """Mark the task done; returns False if another worker has taken it over meanwhile."""
+        from sqlalchemy import text
+        with self.engine.connect() as conn:
+            updated = conn.execute(text("""
+                UPDATE task_queue SET status = 'done', result = CAST(:result AS JSONB),
+                    leased_until = NULL, last_error = NULL, updated_at = NOW()
+                WHERE id = :id AND worker_id = :worker_id AND status = 'running'
+            """), {"id": task_id, "worker_id": worker_id, "result": json.dumps(result, default=str)})
+            conn.commit()
+        return updated.rowcount == 1
+
+    def fail(self, task_id, worker_id, error):
+        """Record a failed attempt: back off and retry, or give up after ``max_attempts``."""
+        from sqlalchemy import text
+        with self.engine.connect() as conn:
+            updated = conn.execute(text("""
+                UPDATE task_queue SET
+                    status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+                    available_at = NOW() + make_interval(secs => :backoff * power(2, attempts - 1)),
+                    leased_until = NULL,
+                    last_error = :error,
+                    updated_at = NOW()
+                WHERE id = :id AND worker_id = :worker_id AND status = 'running'
+            """), {"id": task_id, "worker_id": worker_id, "error": str(error)[:2000],
+                   "backoff": self.retry_backoff})
+            conn.commit()
+        return updated.rowcount == 1
+
+    def stats(self):
+        self._ensure_table()
+        from sqlalchemy import text
+        with self.engine.connect() as conn:
+            rows = conn.execute(text("""
+                SELECT kind, status, COUNT(*) FROM task_queue
+                WHERE updated_at > NOW() - INTERVAL '7 days'
+                GROUP BY kind, status
+            """)).fetchall()
+        stats = {}
+        for kind, status, count in rows:
+            stats.setdefault(kind, {})[status] = count
+        return stats
+
+
+def _keep_leased(queue, task_id, worker_id, stop):
+    interval = max(queue.lease_seconds / 3, 1)
+    while not stop.wait(interval):
+        try:
+            if not queue.heartbeat(task_id, worker_id):
+                logger.info(f"⚠️ Lost lease on task {task_id}")
+                return
+        except Exception as e:
+            logger.info(f"⚠️ Heartbeat failed for task {task_id}: {e}")
+
+
+def run_once(queue, handlers, worker_id):
+    """Claim and run at most one task; returns True if a task was processed."""
+    task = queue.claim(worker_id, handlers.keys())
+    if task is None:
+        return False
+    logger.info(f"📥 Worker {worker_id} running task {task['id']} ({task['kind']}, "
+                f"attempt {task['attempts']}/{task['max_attempts']})")
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_keep_leased, args=(queue, task["id"], worker_id, stop), daemon=True)
+    heartbeat.start()
+    started = time.monotonic()
+    try:
+        result = handlers[task["kind"]](task["payload"])
+    except Exception as e:
+        stop.set()
+        logger.info(f"❌ Task {task['id']} failed: {e}")
+        queue.fail(task["id"], worker_id, e)
+        return True
+    stop.set()
+    if queue.complete(task["id"], worker_id, result):
+        logger.info(f"✅ Task {task['id']} done in {time.monotonic() - started:.1f}s")
+    else:
+        logger.info(f"⚠️ Task {task['id']} finished after its lease was taken over; result discarded")
+    return True
+
+
+def run_worker(queue, handlers, worker_id=None, poll_interval=POLL_INTERVAL, stop_event=None):
+    """Process tasks for ``handlers`` ({kind: function(payload)}) until ``stop_event`` is set."""
+    worker_id = worker_id or new_worker_id()
+    stop_event = stop_event or threading.Event()
+    logger.info(f"👷 Task worker {worker_id} started for {', '.join(handlers)}")
+    while not stop_event.is_set():
+        try:
+            if run_once(queue, handlers, worker_id):
+                continue
+        except Exception as e:
+            logger.info(f"❌ Task worker error: {e}")
+        stop_event.wait(poll_interval)
@@ -0,0 +1,106 @@
+"""
+Unit tests for browser_pool.DriverPool using fake drivers (no Chrome needed).
+"""
+
+import threading
+import time
+
+import pytest
+
+from browser_pool import DriverPool, PoolExhausted
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+        self.healthy = True
+        self.visited = []
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("browser crashed")
+        return 1
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        self.quit_called = True
+
+
+def make_pool(**kwargs):
+    launched = []
+
+    def factory():
+        d = FakeDriver()
+        launched.append(d)
+        return d
+
+    kwargs.setdefault("idle_timeout", 0)
+    return DriverPool(factory, **kwargs), launched
+
+
+def test_driver_is_reused_between_checkouts():
+    pool, launched = make_pool(max_size=2)
+    d1 = pool.acquire()
+    pool.release(d1)
+    d2 = pool.acquire()
+    assert d1 is d2
+    assert len(launched) == 1
+    assert "about:blank" in d1.visited
+
+
+def test_recycled_after_max_uses():
+    pool, launched = make_pool(max_size=1, max_uses=2)
+    for _ in range(2):
+        pool.release(pool.acquire())
+    assert launched[0].quit_called
+    d = pool.acquire()
+    assert d is launched[1]
+
+
+def test_unhealthy_driver_replaced_on_checkout():
+    pool, launched = make_pool(max_size=1)
+    d1 = pool.acquire()
+    pool.release(d1)
+    d1.healthy = False
+    d2 = pool.acquire()
+    assert d2 is not d1
+    assert d1.quit_called
+
+
+def test_bounded_and_times_out():
+    pool, _ = make_pool(max_size=1)
+    pool.acquire()
+    with pytest.raises(PoolExhausted):
+        pool.acquire(timeout=0.05)
+
+
+def test_waiting_checkout_gets_released_driver():
+    pool, launched = make_pool(max_size=1)
+    d1 = pool.acquire()
+    got = []
+    t = threading.Thread(target=lambda: got.append(pool.acquire(timeout=2)))
+    t.start()
+    time.sleep(0.05)
+    pool.release(d1)
+    t.join()
+    assert got == [d1]
+    assert len(launched) == 1
+
+
+def test_idle_eviction_and_error_discard():
+    pool, launched = make_pool(max_size=2, idle_timeout=0.01)
+    with pytest.raises(ValueError):
+        with pool.driver():
+            raise ValueError("page broke")
+    assert launched[0].quit_called
+
+    pool.release(pool.acquire())
+    time.sleep(0.02)
+    pool.evict_idle()
+    assert launched[1].quit_called
+    assert pool.stats()["idle"] == 0
@@ -0,0 +1,80 @@
+"""
+Unit tests for email_delivery using a fake SMTP connection (no network).
+"""
+
+import smtplib
+
+from email_delivery import Mailer, SmtpPool
+
+
+class FakeSMTP:
+    def __init__(self, outbox, fail_first=0):
+        self.outbox = outbox
+        self.fail_first = fail_first
+        self.logins = 0
+
+    def login(self, user, password):
+        self.logins += 1
+
+    def send_message(self, msg):
+        if self.fail_first:
+            self.fail_first -= 1
+            raise smtplib.SMTPServerDisconnected("closed")
+        self.outbox.append(msg)
+
+    def quit(self):
+        pass
+
+
+def make_mailer(outbox, failures=None, **kwargs):
+    failures = failures or []
+    pool = SmtpPool("smtp.test", 465, "u", "p", size=1,
+                    smtp_factory=lambda: FakeSMTP(outbox, failures.pop(0) if failures else 0))
+    return Mailer(pool, "Test <t@example.com>", **kwargs), pool
+
+
+def test_connection_is_reused_and_replaced_when_dropped():
+    outbox = []
+    mailer, pool = make_mailer(outbox, failures=[0])
+    for i in range(3):
+        mailer.send_now("a@example.com", f"s{i}", "body")
+    assert len(outbox) == 3 and pool.stats()["connections"] == 1
+
+    # Server drops the idle connection: one transparent reconnect
+    pool._idle[0][0].fail_first = 1
+    mailer.send_now("a@example.com", "s3", "body")
+    assert len(outbox) == 4 and pool.stats()["reconnects"] == 1
+
+
+def test_batch_merges_per_recipient_and_retries(tmp_path):
+    outbox, sent = [], []
+    files = []
+    for name in ("one.xlsx", "two.xlsx", "three.xlsx"):
+        path = tmp_path / name
+        path.write_bytes(b"x")
+        files.append(str(path))
+    # The first connection fails to send, so the first email is retried
+    mailer, pool = make_mailer(outbox, failures=[1], backoff=0.01)
+    with mailer.batch() as batch:
+        batch.add("a@example.com", "A1", "first", [files[0]], on_sent=lambda: sent.append("A1"))
+        batch.add("b@example.com", "B1", "other", [files[1]], on_sent=lambda: sent.append("B1"))
+        batch.add("a@example.com", "A2", "second", [files[2]], on_sent=lambda: sent.append("A2"))
+    assert mailer.flush(timeout=5)
+    assert sorted(msg["To"] for msg in outbox) == ["a@example.com", "b@example.com"]
+    digest = next(msg for msg in outbox if msg["To"] == "a@example.com")
+    assert [part.get_filename() for part in digest.iter_attachments()] == ["one.xlsx", "three.xlsx"]
+    assert sorted(sent) == ["A1", "A2", "B1"]
+
+
+def test_batch_queues_collected_mail_when_the_run_fails():
+    outbox = []
+    mailer, pool = make_mailer(outbox)
+    try:
+        with mailer.batch() as batch:
+            batch.add("a@example.com", "A1", "first")
+            raise RuntimeError("scheduler crashed")
+    except RuntimeError:
+        pass
+    assert mailer.flush(timeout=5)
+    assert [msg["Subject"] for msg in outbox] == ["A1"]
+    assert batch.outcomes == {"queued": 1, "sent": 1, "failed": 0}
@@ -0,0 +1,85 @@
+"""
+Unit tests for job_cache (memory-only, no database) and ttl_cache.
+"""
+
+import threading
+import time
+
+from job_cache import JobDetailCache, canonical_job_url, conditional_headers
+from ttl_cache import CoalescingTTLCache, TTLCache
+
+
+def test_canonical_url_drops_tracking_and_fragment():
+    a = canonical_job_url("HTTPS://www.eFinancialCareers.com/jobs/123/?utm_source=mail&id=7#apply")
+    b = canonical_job_url("https://www.efinancialcareers.com/jobs/123?id=7&gclid=abc")
+    assert a == b == "https://www.efinancialcareers.com/jobs/123?id=7"
+
+
+def test_store_then_lookup_is_fresh():
+    cache = JobDetailCache(ttl_seconds=60)
+    cache.store("https://example.com/job/1?utm_medium=x",
+                {"title": "Risk Manager", "company": "Acme", "location": "London", "description": "<p>Hi</p>"},
+                etag='"abc"')
+    entry = cache.lookup("https://example.com/job/1")
+    assert entry["fresh"]
+    assert entry["title"] == "Risk Manager"
+    assert conditional_headers(entry) == {"If-None-Match": '"abc"'}
+
+
+def test_stale_entry_keeps_validators_and_touch_refreshes():
+    cache = JobDetailCache(ttl_seconds=0.01)
+    cache.store("https://example.com/job/2", {"description": "x"}, last_modified="Wed, 01 Jan 2025 00:00:00 GMT")
+    time.sleep(0.02)
+    entry = cache.lookup("https://example.com/job/2")
+    assert not entry["fresh"]
+    assert "If-Modified-Since" in conditional_headers(entry)
+    cache.ttl_seconds = 60
+    cache.touch("https://example.com/job/2")
+    assert cache.lookup("https://example.com/job/2")["fresh"]
+
+
+def test_unknown_url_is_a_miss():
+    assert JobDetailCache().lookup("https://example.com/never") is None
+
+
+def test_ttl_cache_lru_and_expiry():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "b" not in cache and cache.get("a") == 1
+    cache.set("d", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("d") is None
+
+
+def test_coalescing_cache_shares_inflight_call():
+    cache = CoalescingTTLCache(ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return {"jobs": []}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("q", compute)))
+    leader.start()
+    started.wait(2)
+    followers = [threading.Thread(target=lambda: results.append(cache.get_or_compute("q", compute)))
+                 for _ in range(3)]
+    for t in followers:
+        t.start()
+    release.set()
+    for t in [leader] + followers:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(results) == 4
+    cache.get_or_compute("q", compute)
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] + stats["coalesced"] == 4
@@ -0,0 +1,67 @@
+"""
+Unit tests for job_dedup keys and the DedupIndex.
+"""
+
+from job_dedup import DedupIndex, fingerprint, job_key, simhash, unique_links
+
+ID = "0123456789abcdef0123456789abcdef"
+
+DESCRIPTION = (
+    "We are hiring an operational risk manager to own the risk and control self assessment "
+    "process across the markets business, partner with first line teams on key risk indicators, "
+    "lead loss event reviews, challenge remediation plans and report to the regional risk "
+    "committee on emerging themes, regulatory change and control testing outcomes every quarter. "
+    "You will have at least eight years of experience in non-financial risk at a global bank, a strong "
+    "grasp of operational resilience and third party risk frameworks, and the confidence to present "
+    "findings to senior stakeholders. We offer hybrid working, a competitive bonus, private medical "
+    "cover and a generous pension with employer matching."
+)
+
+
+def test_careerjet_tracking_and_jobad_urls_share_a_key():
+    tracked = f"https://jobviewtrack.com/en-us/job-4a1b/{ID}.html?affid=x&utm_source=api"
+    jobad = f"https://www.careerjet.com/jobad/us{ID}"
+    assert job_key(tracked) == job_key(jobad) == f"careerjet:{ID}"
+
+
+def test_indeed_jk_and_unique_links():
+    a = "https://www.indeed.com/rc/clk?jk=abc123&from=serp"
+    b = "https://www.indeed.com/viewjob?jk=abc123"
+    assert job_key(a) == job_key(b) == "indeed:abc123"
+    assert unique_links([a, b, "https://x.com/j/1"]) == [a, "https://x.com/j/1"]
+
+
+def test_fingerprint_normalises_company_title_and_location():
+    a = {"company": "Acme Holdings Ltd", "title": "Sr. Risk Mgr (Hybrid)", "location": "New York, NY"}
+    b = {"company": "ACME", "title": "Senior Risk Manager", "location": "New York"}
+    assert fingerprint(a) == fingerprint(b)
+    assert fingerprint({"company": "[Not Found]", "title": "x", "location": "y"}) is None
+
+
+def test_index_drops_url_fingerprint_and_near_duplicate_descriptions():
+    index = DedupIndex()
+    first = {"link": f"https://www.careerjet.com/jobad/us{ID}", "title": "Risk Manager",
+             "company": "Acme", "location": "London", "description": DESCRIPTION}
+    assert index.add(first) is None
+    assert index.add(dict(first, link=f"https://jobviewtrack.com/x/{ID}.html")) == "url"
+    assert index.add(dict(first, link="https://efc.com/j/9")) == "fingerprint"
+    reworded = dict(first, link="https://indeed.com/viewjob?jk=zz", company="Other Bank",
+                    description="<p>" + DESCRIPTION.upper().replace(", ", ",<br> ") + "</p>")
+    assert index.add(reworded) == "description"
+    assert index.dropped == {"url": 1, "fingerprint": 1, "description": 1}
+
+
+def test_simhash_separates_unrelated_text():
+    other = "Python developer building trading systems with low latency messaging and kubernetes"
+    assert bin(simhash(DESCRIPTION) ^ simhash(other * 3)).count("1") > 10
+
+
+def test_fingerprints_only_match_across_sources():
+    index = DedupIndex()
+    first = {"link": "https://efc.com/j/1", "title": "Risk Manager", "company": "Acme", "location": "London"}
+    second = dict(first, link="https://efc.com/j/2")  # a second opening with the same title
+    assert index.filter([first, second], source="efc") == [first, second]
+    assert index.add(first, source="efc") == "url"
+    other_site = dict(first, link="https://indeed.com/viewjob?jk=q1")
+    assert index.add(other_site, source="indeed") == "fingerprint"
+    assert index.dropped == {"url": 1, "fingerprint": 1, "description": 0}
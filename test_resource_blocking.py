@@ -0,0 +1,44 @@
+"""
+Unit tests for resource_blocking patterns.
+"""
+
+import re
+
+from resource_blocking import PROFILES, blocked_patterns
+
+# What Indeed's Cloudflare Turnstile challenge loads before the search page appears
+CHALLENGE_URLS = [
+    "https://challenges.cloudflare.com/turnstile/v0/api.js?onload=onloadTurnstileCallback",
+    "https://challenges.cloudflare.com/cdn-cgi/challenge-platform/h/b/orchestrate/chl_page/v1?ray=8a1b2c3d",
+    "https://challenges.cloudflare.com/cdn-cgi/challenge-platform/h/b/turnstile/if/ov2/av0/rcv/0x4AAAAAAA/auto/fbE/normal/auto/",
+    "https://www.indeed.com/cdn-cgi/challenge-platform/h/b/scripts/jsd/main.js",
+]
+
+
+def blocks(url, patterns):
+    """CDP matching: ``*`` is the only wildcard, everything else is literal."""
+    return any(re.fullmatch(".*".join(map(re.escape, pattern.split("*"))), url) for pattern in patterns)
+
+
+def test_challenge_urls_are_never_blocked():
+    for profile in PROFILES:
+        patterns = blocked_patterns(profile)
+        for url in CHALLENGE_URLS:
+            assert not blocks(url, patterns), (profile, url)
+
+
+def test_default_profile_blocks_heavy_and_tracking_resources():
+    patterns = blocked_patterns("default")
+    for url in ("https://cdn.example.com/logo.png?v=2", "https://www.googletagmanager.com/gtm.js?id=X",
+                "https://fonts.gstatic.com/s/roboto.woff2", "https://www.example.com/favicon.ico",
+                "https://googletagmanager.com/gtag/js"):
+        assert blocks(url, patterns), url
+    assert blocked_patterns("off") == []
+
+
+def test_patterns_end_on_the_extension_or_host():
+    patterns = blocked_patterns("default")
+    for url in ("https://icons.svgrepo.com/search.html", "https://www.example.com/icons.ico/list.js",
+                "https://www.example.com/jobs?ref=segment.com", "https://notclarity.ms/app.js",
+                "https://www.example.com/data.pngs.json"):
+        assert not blocks(url, patterns), url
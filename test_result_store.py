@@ -0,0 +1,47 @@
+"""
+Unit tests for the in-memory result store backend.
+"""
+
+import time
+
+from result_store import MemoryResultStore
+
+
+def test_results_are_scoped_to_their_owner():
+    store = MemoryResultStore()
+    search_id = store.save(1, [{"title": "Risk Analyst"}], "Risk")
+    assert store.get(1, search_id)["results"] == [{"title": "Risk Analyst"}]
+    assert store.get(1, search_id)["name"] == "Risk"
+    assert store.get(2, search_id) is None
+    assert store.get(1, "unknown") is None
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    store = MemoryResultStore(max_entries=2)
+    a = store.save(1, [{"n": 1}])
+    b = store.save(1, [{"n": 2}])
+    store.get(1, a)
+    store.save(1, [{"n": 3}])
+    assert store.get(1, b) is None and store.get(1, a) is not None
+
+    small = MemoryResultStore(max_bytes=300)
+    first = small.save(1, [{"description": "x" * 200}])
+    small.save(1, [{"description": "y" * 200}])
+    assert small.get(1, first) is None
+    assert small.stats()["entries"] == 1
+
+
+def test_expired_results_are_dropped():
+    store = MemoryResultStore(ttl_seconds=0.01)
+    search_id = store.save(1, [{"n": 1}])
+    time.sleep(0.02)
+    assert store.get(1, search_id) is None
+
+
+def test_search_job_state_keeps_the_newest_version():
+    store = MemoryResultStore()
+    store.save_search_job(1, "job", {"status": "running", "partial_count": 2}, version=2)
+    # A snapshot written late by another thread does not roll the state back
+    store.save_search_job(1, "job", {"status": "queued", "partial_count": 0}, version=1)
+    assert store.get_search_job(1, "job") == {"status": "running", "partial_count": 2}
+    assert store.get_search_job(2, "job") is None
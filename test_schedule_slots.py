@@ -0,0 +1,100 @@
+"""
+Unit tests for schedule_slots run-slot computation.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from schedule_slots import coalescing_horizon, due_groups, next_run_after, next_run_at, realigned_run_at, slot_offset
+
+
+def test_slots_are_stable_and_spread_over_window():
+    assert slot_offset(42, 4) == slot_offset(42, 4)
+    offsets = [slot_offset(search_id, 4) for search_id in range(1000)]
+    assert all(0 <= offset < 4 * 3600 for offset in offsets)
+    # Roughly uniform: every hour of the window gets a fair share
+    per_hour = [sum(1 for offset in offsets if hour * 3600 <= offset < (hour + 1) * 3600) for hour in range(4)]
+    assert min(per_hour) > 200
+
+
+def test_next_run_follows_schedule_and_window():
+    utc = timezone.utc
+    monday_noon = datetime(2025, 6, 2, 12, 0, tzinfo=utc)  # a Monday
+    daily = next_run_at(7, "daily", monday_noon, start_hour=5, window_hours=4)
+    assert daily.date() == datetime(2025, 6, 3).date() and 5 <= daily.hour < 9
+    assert daily.tzinfo is utc
+
+    weekly = next_run_at(7, "weekly", monday_noon, start_hour=5, window_hours=4)
+    assert weekly.weekday() == 0 and weekly.date() == datetime(2025, 6, 9).date()
+
+    monthly = next_run_at(7, "monthly", monday_noon, start_hour=5, window_hours=4)
+    assert monthly.day == 1 and monthly.month == 7
+
+    # Before today's slot, today's slot is next
+    early = datetime(2025, 6, 2, 0, 0, tzinfo=utc)
+    assert next_run_at(7, "daily", early, start_hour=5, window_hours=4).date() == early.date()
+    # Strictly after: a search that just ran moves on to tomorrow's slot
+    assert next_run_at(7, "daily", daily, start_hour=5, window_hours=4) == daily + timedelta(days=1)
+    assert next_run_at(7, "none", monday_noon) is None
+
+
+def test_coalesced_search_is_not_due_again_the_same_day():
+    utc = timezone.utc
+    day = datetime(2025, 6, 3, 0, 0, tzinfo=utc)
+    slot = next_run_at(7, "daily", day, start_hour=5, window_hours=4)
+    # Delivered early with a query group whose slot came up at the start of the window
+    ran_at = day.replace(hour=5)
+    assert ran_at < slot
+    assert next_run_at(7, "daily", ran_at, start_hour=5, window_hours=4) == slot  # the old double run
+    following = next_run_after(7, "daily", ran_at, slot, start_hour=5, window_hours=4)
+    assert following == slot + timedelta(days=1)
+    # A late run (slot in the past) also moves on to tomorrow
+    assert next_run_after(7, "daily", slot + timedelta(hours=2), slot, start_hour=5, window_hours=4) == following
+
+
+def test_realigned_user_searches_run_in_one_tick_without_chaining_users():
+    utc = timezone.utc
+    day = datetime(2025, 6, 3, 0, 0, tzinfo=utc)
+    # Searches 1 and 2 belong to user 5; under per-search slots they would run at different times
+    old_slots = [next_run_at(search_id, "daily", day, start_hour=5, window_hours=4) for search_id in (1, 2)]
+    assert old_slots[0] != old_slots[1]
+    user_slot = next_run_at(5, "daily", day, start_hour=5, window_hours=4)
+    # Stored per-search slots move onto the user's slot that same day, once
+    realigned = {realigned_run_at(5, "daily", slot, start_hour=5, window_hours=4) for slot in old_slots}
+    assert realigned == {user_slot}
+    assert realigned_run_at(5, "daily", user_slot, start_hour=5, window_hours=4) == user_slot
+    # Search 1 shares a query with user 9's search, due now; search 2 is a query of its own
+    mine = [{"id": 1, "user_id": 5, "next_run_at": user_slot}, {"id": 2, "user_id": 5, "next_run_at": user_slot}]
+    other = {"id": 3, "user_id": 9, "next_run_at": user_slot - timedelta(minutes=5)}
+    groups = [[mine[0], other], [mine[1]]]
+    now = other["next_run_at"]
+    # Only the group with a slot that has come up runs; user 5's other query is not chained in
+    assert due_groups(groups, now) == [groups[0]]
+    assert due_groups(groups, user_slot) == groups
+    # Delivered early with the shared query, neither comes due again that day
+    assert next_run_after(5, "daily", now, user_slot, start_hour=5, window_hours=4) == user_slot + timedelta(days=1)
+
+
+def test_shared_queries_spread_over_ticks():
+    utc = timezone.utc
+    day = datetime(2025, 6, 3, 0, 0, tzinfo=utc)
+    # 400 users, each subscribed to one of three popular queries
+    searches = [{"id": user_id, "user_id": user_id, "query": user_id % 3,
+                 "next_run_at": next_run_at(user_id, "daily", day, start_hour=5, window_hours=4)}
+                for user_id in range(400)]
+    per_tick, pending = [], list(searches)
+    now = day.replace(hour=5)
+    while pending:
+        horizon = coalescing_horizon(now, minutes=15)
+        groups = {}
+        for search in pending:
+            if search["next_run_at"] < horizon:
+                groups.setdefault(search["query"], []).append(search)
+        ran = [search for group in due_groups(list(groups.values()), now) for search in group]
+        pending = [search for search in pending if search not in ran]
+        per_tick.append(len(ran))
+        now += timedelta(minutes=5)
+    assert sum(per_tick) == 400 and len(per_tick) <= 4 * 12 + 1
+    # No tick runs much more than its own 5 minutes plus the 15 minute horizon of slots
+    assert max(per_tick) < 400 * 20 / 240 * 1.6
+    # The first hour of the window no longer takes everything with a subscriber due later
+    assert sum(per_tick[:12]) < 400 / 2 and sum(1 for count in per_tick if count) >= 16
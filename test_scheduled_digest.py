@@ -0,0 +1,37 @@
+"""
+Unit tests for scheduled_digest sheet naming, merging and collection.
+"""
+
+from scheduled_digest import DigestCollector, digest_mode, merge_sections, sheet_names
+
+
+def search(name, mode="sheets", user_id=1):
+    return {"name": name, "user_id": user_id, "user_email": f"u{user_id}@example.com", "email_digest": mode}
+
+
+def test_sheet_names_are_excel_safe_and_unique():
+    names = sheet_names(["Risk: London/NY", "risk  london ny", "A" * 40, "A" * 40, ""])
+    assert names[0] == "Risk  London NY"
+    assert names[1] == "risk  london ny (2)"
+    assert names[2] == "A" * 31 and names[3] == "A" * 27 + " (2)"
+    assert names[4] == "Search"
+
+
+def test_merge_drops_postings_found_by_several_searches():
+    a = {"link": "https://www.indeed.com/viewjob?jk=abc", "title": "Risk Manager", "company": "Acme", "location": "London"}
+    b = {"link": "https://efc.com/j/2", "title": "Quant", "company": "Beta", "location": "Paris"}
+    merged = merge_sections([(search("First"), [a, b]),
+                             (search("Second"), [dict(a, link="https://www.indeed.com/rc/clk?jk=abc")])])
+    assert [(job["title"], job["search"]) for job in merged] == [("Risk Manager", "First"), ("Quant", "First")]
+
+
+def test_collector_groups_by_user_and_ignores_unknown_modes():
+    digest = DigestCollector()
+    assert not digest.wants(search("x", mode="off")) and not digest.wants(search("x", mode="weekly"))
+    assert digest_mode(" Merged ") == "merged"
+    digest.add(search("One"), [{"title": "a"}])
+    digest.add(search("Two", user_id=2, mode="merged"), [{"title": "b"}])
+    digest.add(search("Three"), [{"title": "c"}])
+    users = {user["user_id"]: user for user in digest.users()}
+    assert [s["name"] for s, _ in users[1]["sections"]] == ["One", "Three"]
+    assert users[2]["mode"] == "merged" and users[2]["email"] == "u2@example.com"
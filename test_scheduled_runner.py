@@ -0,0 +1,55 @@
+"""
+Unit tests for scheduled_runner.run_batch (worker pool, per-source limits, retries).
+"""
+
+import threading
+import time
+
+from scheduled_runner import SourceLimiter, parse_limits, run_batch
+
+
+def test_parse_limits():
+    assert parse_limits("indeed=1, careerjet=4,bad,x=") == {"indeed": 1, "careerjet": 4}
+
+
+def test_per_source_limit_and_parallelism():
+    active, peak = {}, {}
+    lock = threading.Lock()
+
+    def task(item):
+        source = item["source"]
+        with lock:
+            active[source] = active.get(source, 0) + 1
+            peak[source] = max(peak.get(source, 0), active[source])
+        time.sleep(0.05)
+        with lock:
+            active[source] -= 1
+        return {"status": "sent"}
+
+    items = [{"name": f"s{i}", "source": "indeed" if i % 2 else "efc"} for i in range(8)]
+    started = time.monotonic()
+    report = run_batch(items, task, sources_for=lambda item: [item["source"]], label_for=lambda item: item["name"],
+                       workers=4, limiter=SourceLimiter({"indeed": 1}, default=3), backoff=0)
+    assert peak["indeed"] == 1 and peak["efc"] > 1
+    assert report["counts"] == {"sent": 8}
+    assert time.monotonic() - started < 0.35
+
+
+def test_retries_then_reports_failures_and_deferrals():
+    calls = {}
+
+    def task(item):
+        calls[item] = calls.get(item, 0) + 1
+        if item == "flaky" and calls[item] < 2:
+            raise RuntimeError("timeout")
+        if item == "broken":
+            raise RuntimeError("always")
+        return {"status": "no_new"}
+
+    report = run_batch(["flaky", "broken"], task, workers=2, max_attempts=3, backoff=0.01)
+    by_name = {entry["search"]: entry for entry in report["searches"]}
+    assert by_name["flaky"]["status"] == "no_new" and by_name["flaky"]["attempts"] == 2
+    assert by_name["broken"]["status"] == "failed" and by_name["broken"]["attempts"] == 3
+
+    report = run_batch(["late"], task, window=-1)
+    assert report["counts"] == {"deferred": 1}
@@ -0,0 +1,103 @@
+"""
+Unit tests for scrape_scheduler.ScrapeScheduler (no browsers involved).
+"""
+
+import threading
+import time
+
+import pytest
+
+from scrape_scheduler import INTERACTIVE, SCHEDULED, AdmissionRejected, ScrapeScheduler
+
+
+def test_concurrency_is_bounded():
+    scheduler = ScrapeScheduler(max_concurrent=2, memory_probe=lambda: None)
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def search():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+
+    threads = [threading.Thread(target=scheduler.run, args=(search,)) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2
+    assert scheduler.stats()["started"] == 6
+
+
+def test_interactive_jumps_ahead_of_scheduled_and_positions_reported():
+    scheduler = ScrapeScheduler(max_concurrent=1, memory_probe=lambda: None)
+    release = threading.Event()
+    order, positions = [], {}
+
+    def blocker():
+        release.wait(2)
+
+    def queued(name, priority):
+        scheduler.run(order.append, name, priority=priority,
+                      on_queue=lambda pos: positions.setdefault(name, []).append(pos))
+
+    first = threading.Thread(target=scheduler.run, args=(blocker,))
+    first.start()
+    time.sleep(0.05)
+    waiters = [threading.Thread(target=queued, args=("scheduled", SCHEDULED))]
+    waiters[0].start()
+    time.sleep(0.05)
+    waiters.append(threading.Thread(target=queued, args=("interactive", INTERACTIVE)))
+    waiters[1].start()
+    time.sleep(0.05)
+    release.set()
+    for t in [first] + waiters:
+        t.join()
+    assert order == ["interactive", "scheduled"]
+    assert positions["scheduled"] == [1, 2]
+    assert positions["interactive"] == [1]
+
+
+def test_rejects_when_memory_is_tight_or_queue_full():
+    scheduler = ScrapeScheduler(max_concurrent=2, min_free_mb=500, memory_probe=lambda: 100)
+    # Nothing running: memory pressure never starves the only search
+    assert scheduler.admission_error() is None
+    assert scheduler.run(lambda: "ran") == "ran"
+    release = threading.Event()
+    running = threading.Thread(target=scheduler.run, args=(release.wait, 2))
+    running.start()
+    time.sleep(0.05)
+    with pytest.raises(AdmissionRejected):
+        scheduler.run(lambda: None)
+    release.set()
+    running.join()
+
+    scheduler = ScrapeScheduler(max_concurrent=1, queue_limit=1, memory_probe=lambda: None)
+    release = threading.Event()
+    threading.Thread(target=scheduler.run, args=(release.wait, 2)).start()
+    time.sleep(0.05)
+    waiter = threading.Thread(target=scheduler.run, args=(lambda: None,))
+    waiter.start()
+    time.sleep(0.05)
+    with pytest.raises(AdmissionRejected):
+        scheduler.run(lambda: None)
+    release.set()
+    waiter.join()
+    assert scheduler.stats()["rejected"] == 1
+
+
+def test_slot_stays_taken_until_abandoned_work_finishes():
+    from concurrent.futures import ThreadPoolExecutor
+    scheduler = ScrapeScheduler(max_concurrent=1, memory_probe=lambda: None)
+    release = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1)
+    with scheduler.slot() as lingering:
+        lingering.append(executor.submit(release.wait, 2))
+    # The search returned, but its straggler still holds the browser
+    assert scheduler.stats()["running"] == 1
+    release.set()
+    executor.shutdown(wait=True)
+    assert scheduler.stats()["running"] == 0
@@ -0,0 +1,96 @@
+"""
+Unit tests for scraper_registry fan-out, using in-memory fake source modules.
+"""
+
+import sys
+import time
+import types
+
+import scraper_registry
+from scraper_registry import register_source, resolve_sources, search_sources, source_label
+
+
+def _fake_source(name, delay, jobs):
+    def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US"):
+        time.sleep(delay)
+        return [dict(job) for job in jobs]
+    module = types.ModuleType(name)
+    module.scrape_jobs = scrape_jobs
+    sys.modules[name] = module
+    register_source(name, name.upper(), name)
+
+
+def teardown_function():
+    for key in [k for k in scraper_registry.SOURCES if k.startswith("fake_")]:
+        scraper_registry.SOURCES.pop(key)
+        sys.modules.pop(key, None)
+
+
+def test_resolve_and_label():
+    assert resolve_sources("both") == ["efinancialcareers", "careerjet"]
+    assert resolve_sources("nonsense") == ["efinancialcareers"]
+    assert source_label("both") == "EFC + CareerJet"
+
+
+def test_fanout_costs_slowest_source_not_sum():
+    _fake_source("fake_a", 0.3, [{"title": "A", "link": "a"}])
+    _fake_source("fake_b", 0.3, [{"title": "B", "link": "b"}])
+    arrived = []
+    started = time.monotonic()
+    jobs, status = search_sources(["fake_a", "fake_b"], "t", "l", on_results=lambda key, js: arrived.append(key))
+    assert time.monotonic() - started < 0.55
+    assert {job["source"] for job in jobs} == {"FAKE_A", "FAKE_B"}
+    assert status == {"fake_a": "ok", "fake_b": "ok"}
+    assert sorted(arrived) == ["fake_a", "fake_b"]
+
+
+def test_deadline_skips_slow_source_and_errors_are_dropped():
+    _fake_source("fake_fast", 0, [{"title": "Fast", "link": "f"}])
+    _fake_source("fake_slow", 2, [{"title": "Slow", "link": "s"}])
+    _fake_source("fake_err", 0, [{"error_type": "general", "title": "Err", "description": "boom"}])
+    lingering = []
+    jobs, status = search_sources(["fake_fast", "fake_slow", "fake_err"], "t", "l", deadline=0.3,
+                                  lingering=lingering)
+    assert [job["title"] for job in jobs] == ["Fast"]
+    assert status == {"fake_fast": "ok", "fake_slow": "timeout", "fake_err": "error"}
+    # The abandoned source is handed back so its scheduler slot is kept until it ends
+    assert len(lingering) == 1 and not lingering[0].done()
+
+
+def test_all_sources_failing_returns_single_placeholder():
+    _fake_source("fake_err", 0, [{"error_type": "general", "title": "Err", "description": "boom"}])
+    jobs, status = search_sources(["fake_err"], "t", "l")
+    assert len(jobs) == 1 and jobs[0]["error_type"] == "general"
+
+
+def test_exclude_links_filters_sources_without_native_support():
+    _fake_source("fake_a", 0, [{"title": "Old", "link": "https://x.com/j/1?utm_source=a"},
+                               {"title": "New", "link": "https://x.com/j/2"}])
+    jobs = scraper_registry.scrape_source("fake_a", "t", "l", exclude_links={"https://x.com/j/1"})
+    assert [job["title"] for job in jobs] == ["New"]
+
+
+def test_shared_dedup_skips_other_sources_postings_before_fetching():
+    posting = {"title": "Risk Manager", "company": "Acme", "location": "London"}
+    _fake_source("fake_a", 0, [dict(posting, link="https://a.com/j/1")])
+    fetched = []
+
+    def scrape_jobs(title, location, max_jobs=10, seniority=None, region="US", dedup=None):
+        time.sleep(0.2)
+        jobs = []
+        quant = {"title": "Quant", "company": "Beta", "location": "Paris"}
+        for item in [dict(posting, link="https://b.com/j/9"), dict(quant, link="https://b.com/j/10"),
+                     dict(quant, link="https://b.com/j/11")]:
+            if dedup.add(item, source="fake_native") is None:
+                fetched.append(item["link"])
+                jobs.append(item)
+        return jobs
+    module = types.ModuleType("fake_native")
+    module.scrape_jobs = scrape_jobs
+    sys.modules["fake_native"] = module
+    register_source("fake_native", "NATIVE", "fake_native")
+
+    jobs, status = search_sources(["fake_a", "fake_native"], "t", "l")
+    # The repeat of fake_a's posting is never fetched; fake_native's own same-title openings both are
+    assert fetched == ["https://b.com/j/10", "https://b.com/j/11"]
+    assert sorted(job["link"] for job in jobs) == ["https://a.com/j/1", "https://b.com/j/10", "https://b.com/j/11"]
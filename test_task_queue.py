@@ -0,0 +1,55 @@
+"""
+Unit tests for the task_queue worker loop, using an in-memory stand-in for TaskQueue.
+"""
+
+from task_queue import run_once
+
+
+class FakeQueue:
+    lease_seconds = 60
+
+    def __init__(self, tasks, owned=True):
+        self.tasks = list(tasks)
+        self.owned = owned
+        self.completed, self.failed = [], []
+
+    def claim(self, worker_id, kinds):
+        for task in self.tasks:
+            if task["kind"] in kinds:
+                self.tasks.remove(task)
+                return dict(task, attempts=1, max_attempts=3)
+        return None
+
+    def heartbeat(self, task_id, worker_id):
+        return self.owned
+
+    def complete(self, task_id, worker_id, result=None):
+        if self.owned:
+            self.completed.append((task_id, result))
+        return self.owned
+
+    def fail(self, task_id, worker_id, error):
+        self.failed.append((task_id, str(error)))
+        return self.owned
+
+
+def test_run_once_completes_and_fails_tasks():
+    queue = FakeQueue([{"id": 1, "kind": "ok", "payload": {"n": 2}},
+                       {"id": 2, "kind": "boom", "payload": {}},
+                       {"id": 3, "kind": "other", "payload": {}}])
+
+    def boom(payload):
+        raise RuntimeError("scrape failed")
+
+    handlers = {"ok": lambda payload: {"double": payload["n"] * 2}, "boom": boom}
+    assert run_once(queue, handlers, "w1")
+    assert run_once(queue, handlers, "w1")
+    assert not run_once(queue, handlers, "w1")  # "other" has no handler here
+    assert queue.completed == [(1, {"double": 4})]
+    assert queue.failed == [(2, "scrape failed")]
+
+
+def test_result_discarded_after_lease_lost():
+    queue = FakeQueue([{"id": 1, "kind": "ok", "payload": {}}], owned=False)
+    assert run_once(queue, {"ok": lambda payload: "done"}, "w1")
+    assert queue.completed == []
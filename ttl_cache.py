@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe in-memory LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize=1000, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+
+class CoalescingTTLCache(TTLCache):
+    """TTLCache whose ``get_or_compute`` shares one in-flight computation per key.
+
+    Concurrent callers asking for the same missing key wait for the first
+    caller's result instead of each computing it. Exceptions are not cached;
+    they are re-raised to every waiter of that computation.
+    """
+
+    def __init__(self, maxsize=1000, ttl=3600):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._inflight = {}  # key -> {"event", "value", "error"}
+        self._inflight_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is not None:
+            with self._inflight_lock:
+                self.hits += 1
+            return value
+
+        with self._inflight_lock:
+            value = self.get(key)  # a leader may have finished since the first check
+            if value is not None:
+                self.hits += 1
+                return value
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = {"event": threading.Event(), "value": None, "error": None}
+                self._inflight[key] = call
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call["event"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["value"]
+
+        try:
+            call["value"] = compute()
+            self.set(key, call["value"])
+            return call["value"]
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            call["event"].set()
+
+    def stats(self):
+        with self._inflight_lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "size": len(self),
+                "in_flight": len(self._inflight),
+            }